@@ -0,0 +1,36 @@
+"""Add scans.updated_at and updated_at indexes for conditional GET
+
+Revision ID: 005
+Revises: 004
+Create Date: 2024-02-12
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = '005'
+down_revision: Union[str, None] = '004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Scans need a modification timestamp so list ETags change on status updates
+    op.add_column('scans', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute("UPDATE scans SET updated_at = COALESCE(completed_at, started_at)")
+    op.alter_column('scans', 'updated_at', nullable=False)
+
+    # max(updated_at) becomes an index-only lookup
+    op.create_index('ix_scans_updated_at', 'scans', ['updated_at'])
+    op.create_index('ix_exposures_updated_at', 'exposures', ['updated_at'])
+    op.create_index('ix_family_members_updated_at', 'family_members', ['updated_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_family_members_updated_at', table_name='family_members')
+    op.drop_index('ix_exposures_updated_at', table_name='exposures')
+    op.drop_index('ix_scans_updated_at', table_name='scans')
+    op.drop_column('scans', 'updated_at')
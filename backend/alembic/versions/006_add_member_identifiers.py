@@ -0,0 +1,78 @@
+"""Add normalized member identifier index
+
+Revision ID: 006
+Revises: 005
+Create Date: 2024-02-14
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = '006'
+down_revision: Union[str, None] = '005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'member_identifiers',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('family_member_id', sa.Integer(), nullable=False),
+        sa.Column(
+            'kind', sa.Enum('EMAIL', 'PHONE', 'ADDRESS', name='identifierkind'), nullable=False
+        ),
+        sa.Column('value', sa.String(length=500), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['family_member_id'], ['family_members.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'uq_member_identifiers_kind_value_member',
+        'member_identifiers',
+        ['kind', 'value', 'family_member_id'],
+        unique=True,
+    )
+    op.create_index(
+        'ix_member_identifiers_family_member_id', 'member_identifiers', ['family_member_id']
+    )
+
+    # Backfill from the JSON arrays and legacy single columns.
+    # Normalization mirrors app.services.identifiers.normalize_identifier:
+    # trim() only strips spaces, str.strip() also tabs and newlines, so edges
+    # are stripped with \s (emails) or collapsed to one space first (addresses).
+    op.execute("""
+        INSERT INTO member_identifiers (family_member_id, kind, value, created_at)
+        SELECT DISTINCT family_member_id, kind::identifierkind, value, now()
+        FROM (
+            SELECT id AS family_member_id, 'EMAIL' AS kind,
+                lower(regexp_replace(v, '^\\s+|\\s+$', '', 'g')) AS value
+            FROM family_members, json_array_elements_text(COALESCE(emails, '[]'::json)) AS v
+            UNION ALL
+            SELECT id, 'EMAIL', lower(regexp_replace(email, '^\\s+|\\s+$', '', 'g'))
+            FROM family_members WHERE email IS NOT NULL
+            UNION ALL
+            SELECT id, 'PHONE', regexp_replace(v, '[^0-9]', '', 'g')
+            FROM family_members, json_array_elements_text(COALESCE(phone_numbers, '[]'::json)) AS v
+            UNION ALL
+            SELECT id, 'PHONE', regexp_replace(phone, '[^0-9]', '', 'g')
+            FROM family_members WHERE phone IS NOT NULL
+            UNION ALL
+            SELECT id, 'ADDRESS', lower(trim(regexp_replace(v, '\\s+', ' ', 'g')))
+            FROM family_members, json_array_elements_text(COALESCE(addresses, '[]'::json)) AS v
+            UNION ALL
+            SELECT id, 'ADDRESS', lower(trim(regexp_replace(address, '\\s+', ' ', 'g')))
+            FROM family_members WHERE address IS NOT NULL
+        ) AS raw
+        WHERE value <> ''
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_member_identifiers_family_member_id', table_name='member_identifiers')
+    op.drop_index('uq_member_identifiers_kind_value_member', table_name='member_identifiers')
+    op.drop_table('member_identifiers')
+    op.execute("DROP TYPE IF EXISTS identifierkind")
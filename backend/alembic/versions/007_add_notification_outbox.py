@@ -0,0 +1,49 @@
+"""Add notification outbox
+
+Revision ID: 007
+Revises: 006
+Create Date: 2024-02-16
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = '007'
+down_revision: Union[str, None] = '006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'notification_outbox',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(length=50), nullable=False),
+        sa.Column('subject', sa.String(length=500), nullable=False),
+        sa.Column('body_text', sa.Text(), nullable=False),
+        sa.Column('body_html', sa.Text(), nullable=True),
+        sa.Column(
+            'status', sa.Enum('PENDING', 'SENT', 'FAILED', name='notificationstatus'),
+            nullable=False,
+        ),
+        sa.Column('attempts', sa.Integer(), nullable=False, default=0),
+        sa.Column('last_error', sa.String(length=500), nullable=True),
+        sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('sent_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_notification_outbox_status_next_attempt',
+        'notification_outbox',
+        ['status', 'next_attempt_at'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_notification_outbox_status_next_attempt', table_name='notification_outbox')
+    op.drop_table('notification_outbox')
+    op.execute("DROP TYPE IF EXISTS notificationstatus")
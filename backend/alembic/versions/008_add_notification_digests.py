@@ -0,0 +1,31 @@
+"""Add digest columns to notification outbox
+
+Revision ID: 008
+Revises: 007
+Create Date: 2024-02-19
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = '008'
+down_revision: Union[str, None] = '007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'notification_outbox', sa.Column('digest_key', sa.String(length=100), nullable=True)
+    )
+    op.add_column('notification_outbox', sa.Column('payload', sa.JSON(), nullable=True))
+    op.create_index('ix_notification_outbox_digest_key', 'notification_outbox', ['digest_key'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_notification_outbox_digest_key', table_name='notification_outbox')
+    op.drop_column('notification_outbox', 'payload')
+    op.drop_column('notification_outbox', 'digest_key')
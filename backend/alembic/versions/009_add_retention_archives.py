@@ -0,0 +1,83 @@
+"""Add archive tables for exposure and scan retention
+
+Revision ID: 009
+Revises: 008
+Create Date: 2024-02-20
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+revision: str = '009'
+down_revision: Union[str, None] = '008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Reuse the enum types created for the hot tables
+    exposure_source = postgresql.ENUM(name='exposuresource', create_type=False)
+    exposure_status = postgresql.ENUM(name='exposurestatus', create_type=False)
+    scan_type = postgresql.ENUM(name='scantype', create_type=False)
+    scan_status = postgresql.ENUM(name='scanstatus', create_type=False)
+
+    op.create_table(
+        'exposures_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('family_member_id', sa.Integer(), nullable=False),
+        sa.Column('source', exposure_source, nullable=False),
+        sa.Column('source_name', sa.String(length=255), nullable=False),
+        sa.Column('source_url', sa.String(length=500), nullable=True),
+        sa.Column('data_exposed', sa.Text(), nullable=True),
+        sa.Column('status', exposure_status, nullable=False),
+        sa.Column('incogni_request_id', sa.String(length=255), nullable=True),
+        sa.Column('detected_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('archived_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['family_member_id'], ['family_members.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_exposures_archive_family_member_id', 'exposures_archive', ['family_member_id']
+    )
+    op.create_index('ix_exposures_archive_updated_at', 'exposures_archive', ['updated_at'])
+
+    # Monthly partitions are created on demand by app.tasks.retention
+    op.create_table(
+        'scans_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=False),
+        sa.Column('scan_type', scan_type, nullable=False),
+        sa.Column('status', scan_status, nullable=False),
+        sa.Column('exposures_found', sa.Integer(), nullable=False),
+        sa.Column('error_message', sa.String(length=500), nullable=True),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('archived_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id', 'started_at'),
+        postgresql_partition_by='RANGE (started_at)',
+    )
+    op.create_index('ix_scans_archive_updated_at', 'scans_archive', ['updated_at'])
+
+    # Retention lookups on the hot tables
+    op.create_index(
+        'ix_exposures_removed_updated_at',
+        'exposures',
+        ['updated_at'],
+        postgresql_where=sa.text("status = 'REMOVED'"),
+    )
+    op.create_index('ix_scans_started_at', 'scans', ['started_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_scans_started_at', table_name='scans')
+    op.drop_index('ix_exposures_removed_updated_at', table_name='exposures')
+    op.drop_index('ix_scans_archive_updated_at', table_name='scans_archive')
+    op.drop_table('scans_archive')  # Drops its partitions too
+    op.drop_index('ix_exposures_archive_updated_at', table_name='exposures_archive')
+    op.drop_index('ix_exposures_archive_family_member_id', table_name='exposures_archive')
+    op.drop_table('exposures_archive')
@@ -0,0 +1,68 @@
+"""Add append-only exposure event log
+
+Revision ID: 010
+Revises: 009
+Create Date: 2024-02-22
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+revision: str = '010'
+down_revision: Union[str, None] = '009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    exposure_status = postgresql.ENUM(name='exposurestatus', create_type=False)
+
+    op.create_table(
+        'exposure_events',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('exposure_id', sa.Integer(), nullable=False),
+        sa.Column('family_member_id', sa.Integer(), nullable=False),
+        sa.Column(
+            'event_type',
+            sa.Enum('DETECTED', 'STATUS_CHANGED', 'DELETED', 'ARCHIVED', name='exposureeventtype'),
+            nullable=False,
+        ),
+        sa.Column('old_status', exposure_status, nullable=True),
+        sa.Column('new_status', exposure_status, nullable=True),
+        sa.Column('actor', sa.String(length=50), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['family_member_id'], ['family_members.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_exposure_events_exposure_id', 'exposure_events', ['exposure_id'])
+    op.create_index(
+        'ix_exposure_events_created_at_brin',
+        'exposure_events',
+        ['created_at'],
+        postgresql_using='brin',
+    )
+
+    # Seed the log with the detections we already know about, in time order so
+    # the BRIN ranges stay tight
+    op.execute("""
+        INSERT INTO exposure_events
+            (exposure_id, family_member_id, event_type, old_status, new_status, actor, created_at)
+        SELECT id, family_member_id, 'DETECTED', NULL, 'DETECTED', 'migration', detected_at
+        FROM (
+            SELECT id, family_member_id, detected_at FROM exposures
+            UNION ALL
+            SELECT id, family_member_id, detected_at FROM exposures_archive
+        ) AS known
+        ORDER BY detected_at, id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_exposure_events_created_at_brin', table_name='exposure_events')
+    op.drop_index('ix_exposure_events_exposure_id', table_name='exposure_events')
+    op.drop_table('exposure_events')
+    op.execute("DROP TYPE IF EXISTS exposureeventtype")
@@ -0,0 +1,28 @@
+"""Add per-scan timing profile
+
+Revision ID: 011
+Revises: 010
+Create Date: 2024-02-24
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = '011'
+down_revision: Union[str, None] = '010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('scans', sa.Column('timings', sa.JSON(), nullable=True))
+    # Added to the partitioned parent, so existing partitions get it too
+    op.add_column('scans_archive', sa.Column('timings', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('scans_archive', 'timings')
+    op.drop_column('scans', 'timings')
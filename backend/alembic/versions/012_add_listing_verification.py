@@ -0,0 +1,37 @@
+"""Add automatic listing verification to exposures
+
+Revision ID: 012
+Revises: 011
+Create Date: 2024-02-26
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+revision: str = '012'
+down_revision: Union[str, None] = '011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    listing_verification = postgresql.ENUM(
+        'CONFIRMED', 'ABSENT', 'UNKNOWN', name='listingverification'
+    )
+    listing_verification.create(op.get_bind(), checkfirst=True)
+    column_type = postgresql.ENUM(name='listingverification', create_type=False)
+
+    for table in ('exposures', 'exposures_archive'):
+        op.add_column(table, sa.Column('verification', column_type, nullable=True))
+        op.add_column(table, sa.Column('verified_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    for table in ('exposures_archive', 'exposures'):
+        op.drop_column(table, 'verified_at')
+        op.drop_column(table, 'verification')
+    op.execute("DROP TYPE IF EXISTS listingverification")
@@ -0,0 +1,61 @@
+"""Operational endpoints: on-demand profiling and the slow-query log."""
+
+import asyncio
+from datetime import datetime
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import FileResponse
+from pydantic import BaseModel, Field
+
+from app.core import profiling, slow_queries
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+class ProfilingRequest(BaseModel):
+    """How many upcoming API requests of this process to profile."""
+    requests: int = Field(1, ge=0, le=100)  # 0 disarms
+
+
+class ProfileInfo(BaseModel):
+    name: str
+    kind: str  # "request" or "task"
+    size: int
+    created_at: datetime
+
+
+@router.post("/profiling")
+async def arm_profiling(body: ProfilingRequest):
+    """
+    Profile the next N API requests handled by this process.
+
+    With several API processes, each one only sees its own share of the
+    traffic; use the X-Profile header to profile one specific request.
+    """
+    return {"armed": profiling.arm_requests(body.requests)}
+
+
+@router.get("/profiling")
+async def profiling_status():
+    return {"armed": profiling.armed_requests()}
+
+
+@router.get("/profiles", response_model=list[ProfileInfo])
+async def list_profiles():
+    """Saved request and task profiles, newest first."""
+    return profiling.list_profiles()
+
+
+@router.get("/profiles/{name}")
+async def download_profile(name: str):
+    """Download a profile (pstats format)."""
+    path = profiling.profile_file(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="application/octet-stream", filename=name)
+
+
+@router.get("/slow-queries")
+async def list_slow_queries(limit: int = Query(50, ge=1, le=500)):
+    """Recent slow statements, newest first, with their EXPLAIN plan when sampled."""
+    return await asyncio.to_thread(slow_queries.recent_slow_queries, limit)
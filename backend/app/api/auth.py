@@ -8,7 +8,6 @@ from sqlalchemy import select
 
 from app.core.database import async_session_maker
 from app.models.oauth_token import OAuthToken
-from app.models.app_settings import AppSettings
 from app.services.microsoft_oauth import (
     get_authorization_url,
     exchange_code_for_tokens,
@@ -16,6 +15,8 @@ from app.services.microsoft_oauth import (
     calculate_expiry,
     MicrosoftOAuthError,
 )
+from app.services.settings_store import SMTP_KEYS, settings_store
+from app.services.token_manager import microsoft_token_manager
 from app.core.config import settings
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -30,28 +31,6 @@ class SmtpSettings(BaseModel):
     notification_email: str  # Where to send alerts
 
 
-async def get_setting(db, key: str) -> str | None:
-    """Get a setting value from database."""
-    result = await db.execute(
-        select(AppSettings).where(AppSettings.key == key)
-    )
-    setting = result.scalar_one_or_none()
-    return setting.value if setting else None
-
-
-async def set_setting(db, key: str, value: str) -> None:
-    """Set a setting value in database."""
-    result = await db.execute(
-        select(AppSettings).where(AppSettings.key == key)
-    )
-    setting = result.scalar_one_or_none()
-    if setting:
-        setting.value = value
-    else:
-        setting = AppSettings(key=key, value=value)
-        db.add(setting)
-
-
 @router.get("/microsoft/connect")
 async def microsoft_connect():
     """
@@ -120,6 +99,7 @@ async def microsoft_callback(
             )
             db.add(oauth_token)
             await db.commit()
+        microsoft_token_manager.invalidate()
 
         # Redirect to frontend with success
         return RedirectResponse(
@@ -157,19 +137,15 @@ async def auth_status():
                 "expires_at": microsoft_token.expires_at.isoformat() if microsoft_token.expires_at else None,
             }
 
-        # Check for SMTP settings in database
-        smtp_user = await get_setting(db, "smtp_user")
-        smtp_password = await get_setting(db, "smtp_password")
-        notification_email = await get_setting(db, "notification_email")
+    # Check for SMTP settings (cached, no per-key queries)
+    smtp_config = await settings_store.asmtp_config()
 
-        smtp_configured = bool(smtp_user and smtp_password)
-
-        return {
-            "microsoft": microsoft_status,
-            "smtp_configured": smtp_configured,
-            "smtp_email": smtp_user if smtp_configured else None,
-            "notification_email": notification_email if smtp_configured else None,
-        }
+    return {
+        "microsoft": microsoft_status,
+        "smtp_configured": smtp_config is not None,
+        "smtp_email": smtp_config.user if smtp_config else None,
+        "notification_email": smtp_config.notification_email if smtp_config else None,
+    }
 
 
 @router.post("/smtp/configure")
@@ -179,13 +155,13 @@ async def configure_smtp(smtp_settings: SmtpSettings):
 
     For Gmail, use an App Password (not your regular password).
     """
-    async with async_session_maker() as db:
-        await set_setting(db, "smtp_host", smtp_settings.smtp_host)
-        await set_setting(db, "smtp_port", str(smtp_settings.smtp_port))
-        await set_setting(db, "smtp_user", smtp_settings.smtp_user)
-        await set_setting(db, "smtp_password", smtp_settings.smtp_password)
-        await set_setting(db, "notification_email", smtp_settings.notification_email)
-        await db.commit()
+    await settings_store.aset_many({
+        "smtp_host": smtp_settings.smtp_host,
+        "smtp_port": str(smtp_settings.smtp_port),
+        "smtp_user": smtp_settings.smtp_user,
+        "smtp_password": smtp_settings.smtp_password,
+        "notification_email": smtp_settings.notification_email,
+    })
 
     return {
         "status": "configured",
@@ -197,10 +173,10 @@ async def configure_smtp(smtp_settings: SmtpSettings):
 @router.post("/smtp/test")
 async def test_smtp():
     """Send a test email to verify SMTP configuration."""
-    from app.services.notifications import send_email, NotificationError
+    from app.services.notifications import send_email_async, NotificationError
 
     try:
-        result = send_email(
+        result = await send_email_async(
             subject="[Fibertap] Test Email",
             body_text="This is a test email from Fibertap. If you received this, your email notifications are working!",
             body_html="""
@@ -223,15 +199,7 @@ async def test_smtp():
 @router.delete("/smtp/disconnect")
 async def disconnect_smtp():
     """Remove SMTP configuration."""
-    async with async_session_maker() as db:
-        for key in ["smtp_host", "smtp_port", "smtp_user", "smtp_password", "notification_email"]:
-            result = await db.execute(
-                select(AppSettings).where(AppSettings.key == key)
-            )
-            setting = result.scalar_one_or_none()
-            if setting:
-                await db.delete(setting)
-        await db.commit()
+    await settings_store.adelete_many(SMTP_KEYS)
 
     return {"status": "disconnected"}
 
@@ -250,5 +218,6 @@ async def microsoft_disconnect():
         for token in result.scalars().all():
             await db.delete(token)
         await db.commit()
+    microsoft_token_manager.invalidate()
 
     return {"status": "disconnected"}
@@ -0,0 +1,104 @@
+"""Conditional GET support (ETag / Last-Modified) for polled list endpoints."""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def collection_validators(
+    db: AsyncSession,
+    model,
+    *criteria,
+    key: str = "",
+) -> tuple[str, datetime | None]:
+    """
+    Compute a weak ETag and Last-Modified for a (filtered) table listing.
+
+    Only ``count(*)`` and ``max(updated_at)`` are queried, so no rows are
+    loaded. Inserts and updates move ``max(updated_at)``; deletes move the count.
+
+    Args:
+        db: Database session
+        model: ORM model with an ``updated_at`` column
+        criteria: Filters applied to the listing
+        key: Extra discriminator (e.g. the query string) folded into the tag
+
+    Returns:
+        (etag, last_modified) tuple
+    """
+    result = await db.execute(
+        select(func.count(), func.max(model.updated_at)).where(*criteria)
+    )
+    count, last_modified = result.one()
+
+    stamp = last_modified.isoformat() if last_modified else ""
+    raw = f"{model.__tablename__}|{key}|{count}|{stamp}"
+    digest = hashlib.blake2b(raw.encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"', last_modified
+
+
+def merge_validators(*validators: tuple[str, datetime | None]) -> tuple[str, datetime | None]:
+    """Combine the validators of several listings (e.g. a table and its archive)."""
+    raw = "|".join(etag for etag, _ in validators)
+    digest = hashlib.blake2b(raw.encode(), digest_size=12).hexdigest()
+    stamps = [last_modified for _, last_modified in validators if last_modified]
+    return f'W/"{digest}"', max(stamps) if stamps else None
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against our ETag."""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        if candidate.strip().removeprefix("W/") == opaque:
+            return True
+    return False
+
+
+def _http_date(value: datetime) -> str:
+    """Format a naive UTC datetime as an HTTP date."""
+    return format_datetime(value.replace(tzinfo=timezone.utc), usegmt=True)
+
+
+def check_not_modified(
+    request: Request,
+    response: Response,
+    etag: str,
+    last_modified: datetime | None,
+) -> Response | None:
+    """
+    Set validator headers and short-circuit with 304 if the client is current.
+
+    ``If-None-Match`` takes precedence over ``If-Modified-Since`` (RFC 9110).
+
+    Returns:
+        A 304 response to return as-is, or None to continue with the full body
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified:
+        headers["Last-Modified"] = _http_date(last_modified)
+    response.headers.update(headers)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+        return None
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return None
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        if last_modified.replace(tzinfo=timezone.utc, microsecond=0) <= since:
+            return Response(status_code=304, headers=headers)
+
+    return None
@@ -0,0 +1,32 @@
+"""Bulk JSON serialization for list endpoints."""
+
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+
+def json_list_response(
+    adapter: TypeAdapter,
+    rows: Iterable[Any],
+    headers: Mapping[str, str] | None = None,
+) -> Response:
+    """
+    Validate and serialize a whole listing in a single pydantic-core call.
+
+    FastAPI's default path validates each ORM row into a model, converts the
+    result to Python primitives and re-encodes it with ``json.dumps``. Handing
+    the full list to a ``TypeAdapter`` keeps all of that in Rust.
+
+    Args:
+        adapter: ``TypeAdapter(list[SomeResponse])``
+        rows: ORM objects (read with ``from_attributes``)
+        headers: Headers to carry over, e.g. the ETag set on the sub-response
+
+    Returns:
+        A ready-to-send JSON response
+    """
+    content = adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+    extra = {k: v for k, v in (headers or {}).items() if k.lower() != "content-length"}
+    return Response(content=content, media_type="application/json", headers=extra)
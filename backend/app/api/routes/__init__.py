@@ -1,7 +1,7 @@
 from fastapi import APIRouter
 
 from app.api.routes import health, family_members, exposures, scans
-from app.api import auth
+from app.api import admin, auth
 
 router = APIRouter()
 
@@ -10,3 +10,4 @@ router.include_router(family_members.router, prefix="/family-members", tags=["fa
 router.include_router(exposures.router, prefix="/exposures", tags=["exposures"])
 router.include_router(scans.router, prefix="/scans", tags=["scans"])
 router.include_router(auth.router)
+router.include_router(admin.router)
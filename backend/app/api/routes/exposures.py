@@ -1,37 +1,224 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
+import csv
+import io
+from collections.abc import AsyncIterator
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy import Select, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.api.conditional import check_not_modified, collection_validators, merge_validators
+from app.api.responses import json_list_response
+from app.api.sse import relay_events, sse_response
+from app.core.database import get_db, get_read_db, read_session_maker
+from app.models.archive import ExposureArchive
 from app.models.exposure import Exposure, ExposureStatus
-from app.schemas.exposure import ExposureResponse, ExposureUpdate
+from app.models.exposure_event import ExposureEvent, ExposureEventType
+from app.schemas.exposure import (
+    ExportFormat,
+    ExposureEventResponse,
+    ExposureResponse,
+    ExposureUpdate,
+)
+from app.services.live_events import EXPOSURES_CHANNEL, subscription
 
 router = APIRouter()
 
+exposure_list_adapter = TypeAdapter(list[ExposureResponse])
+exposure_event_list_adapter = TypeAdapter(list[ExposureEventResponse])
+
+# Rows fetched per server-side cursor round-trip during export
+EXPORT_BATCH_SIZE = 500
+
+# Upper bound on events returned per /events request
+MAX_EVENTS_PER_PAGE = 5000
+EXPORT_FIELDS = list(ExposureResponse.model_fields)
+
+
+def _exposure_filters(
+    member_id: int | None,
+    status: ExposureStatus | None,
+    model=Exposure,
+) -> list:
+    """Build WHERE criteria shared by the listing and export endpoints."""
+    criteria = []
+    if member_id is not None:
+        criteria.append(model.family_member_id == member_id)
+    if status is not None:
+        criteria.append(model.status == status)
+    return criteria
+
 
 @router.get("/", response_model=list[ExposureResponse])
 async def list_exposures(
+    request: Request,
+    response: Response,
     member_id: int | None = None,
     status: ExposureStatus | None = None,
-    db: AsyncSession = Depends(get_db),
+    include_archived: bool = False,
+    db: AsyncSession = Depends(get_read_db),
 ):
-    """List all detected data exposures, optionally filtered by family member or status."""
-    query = select(Exposure).order_by(Exposure.detected_at.desc())
+    """
+    List all detected data exposures, optionally filtered by family member or status.
 
-    if member_id is not None:
-        query = query.where(Exposure.family_member_id == member_id)
-    if status is not None:
-        query = query.where(Exposure.status == status)
+    Exposures moved out by retention are only included with include_archived.
+    """
+    criteria = _exposure_filters(member_id, status)
+    archive_criteria = _exposure_filters(member_id, status, ExposureArchive)
 
+    # Answer polling clients from count/max(updated_at) before loading any rows
+    etag, last_modified = await collection_validators(
+        db, Exposure, *criteria, key=str(request.query_params)
+    )
+    if include_archived:
+        etag, last_modified = merge_validators(
+            (etag, last_modified),
+            await collection_validators(db, ExposureArchive, *archive_criteria),
+        )
+    not_modified = check_not_modified(request, response, etag, last_modified)
+    if not_modified:
+        return not_modified
+
+    query = select(Exposure).where(*criteria).order_by(Exposure.detected_at.desc())
     result = await db.execute(query)
-    return result.scalars().all()
+    exposures = list(result.scalars().all())
+
+    if include_archived:
+        archived = await db.execute(select(ExposureArchive).where(*archive_criteria))
+        exposures = sorted(
+            [*exposures, *archived.scalars().all()],
+            key=lambda exposure: exposure.detected_at,
+            reverse=True,
+        )
+
+    return json_list_response(exposure_list_adapter, exposures, response.headers)
+
+
+async def _stream_export(query: Select, export_format: ExportFormat) -> AsyncIterator[bytes]:
+    """
+    Stream exposures from a server-side cursor, one encoded batch at a time.
+
+    Uses its own session because the response body is produced after the
+    request-scoped dependency session may already be closed.
+    """
+    async with await read_session_maker() as db:
+        rows = await db.stream_scalars(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+
+        if export_format == ExportFormat.CSV:
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+            writer.writeheader()
+            yield buffer.getvalue().encode()
+
+            async for batch in rows.partitions():
+                buffer.seek(0)
+                buffer.truncate()
+                for item in exposure_list_adapter.validate_python(batch, from_attributes=True):
+                    writer.writerow(item.model_dump(mode="json"))
+                yield buffer.getvalue().encode()
+        else:
+            async for batch in rows.partitions():
+                items = exposure_list_adapter.validate_python(batch, from_attributes=True)
+                yield "".join(item.model_dump_json() + "\n" for item in items).encode()
+
+
+@router.get("/export")
+async def export_exposures(
+    export_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format"),
+    member_id: int | None = None,
+    status: ExposureStatus | None = None,
+):
+    """
+    Export exposures as NDJSON or CSV.
+
+    Rows are streamed in batches so memory use stays flat regardless of table size.
+    """
+    query = (
+        select(Exposure)
+        .where(*_exposure_filters(member_id, status))
+        .order_by(Exposure.detected_at.desc())
+    )
+    media_type = "text/csv" if export_format == ExportFormat.CSV else "application/x-ndjson"
+    return StreamingResponse(
+        _stream_export(query, export_format),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="exposures.{export_format.value}"',
+        },
+    )
+
+
+@router.get("/events", response_model=list[ExposureEventResponse])
+async def list_exposure_events(
+    since: datetime,
+    until: datetime | None = None,
+    member_id: int | None = None,
+    exposure_id: int | None = None,
+    event_type: ExposureEventType | None = None,
+    after_id: int | None = None,
+    limit: int = Query(1000, ge=1, le=MAX_EVENTS_PER_PAGE),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Exposure detections and status changes since a point in time, oldest first.
+
+    Served by a range scan on the BRIN-indexed created_at. To page through a
+    long range, pass the last event's created_at as since and its id as after_id.
+    """
+    query = select(ExposureEvent).where(ExposureEvent.created_at >= since)
+    if until is not None:
+        query = query.where(ExposureEvent.created_at < until)
+    if member_id is not None:
+        query = query.where(ExposureEvent.family_member_id == member_id)
+    if exposure_id is not None:
+        query = query.where(ExposureEvent.exposure_id == exposure_id)
+    if event_type is not None:
+        query = query.where(ExposureEvent.event_type == event_type)
+    if after_id is not None:
+        query = query.where(
+            (ExposureEvent.created_at > since) | (ExposureEvent.id > after_id)
+        )
+
+    result = await db.execute(
+        query.order_by(ExposureEvent.created_at, ExposureEvent.id).limit(limit)
+    )
+    return json_list_response(exposure_event_list_adapter, result.scalars().all())
+
+
+async def _exposure_change_stream(request: Request, member_id: int | None):
+    async with subscription(EXPOSURES_CHANNEL) as events:
+        async for chunk in relay_events(
+            request,
+            events,
+            accept=lambda event: member_id is None or event.get("family_member_id") == member_id,
+        ):
+            yield chunk
+
+
+@router.get("/stream")
+async def exposure_change_stream(request: Request, member_id: int | None = None):
+    """
+    Live exposure changes as Server-Sent Events.
+
+    Emits one event per detection, status change, deletion or archival as it
+    is committed (same shape as /exposures/events). Use /exposures/events to
+    catch up on anything missed while disconnected.
+    """
+    return sse_response(_exposure_change_stream(request, member_id))
 
 
 @router.get("/{exposure_id}", response_model=ExposureResponse)
-async def get_exposure(exposure_id: int, db: AsyncSession = Depends(get_db)):
-    """Get details for a specific exposure."""
-    result = await db.execute(select(Exposure).where(Exposure.id == exposure_id))
-    exposure = result.scalar_one_or_none()
+async def get_exposure(
+    exposure_id: int,
+    include_archived: bool = False,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Get details for a specific exposure (archived ones with include_archived)."""
+    exposure = await db.get(Exposure, exposure_id)
+    if not exposure and include_archived:
+        exposure = await db.get(ExposureArchive, exposure_id)
     if not exposure:
         raise HTTPException(status_code=404, detail="Exposure not found")
     return exposure
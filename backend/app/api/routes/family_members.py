@@ -1,23 +1,67 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
+import asyncio
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile
+from pydantic import TypeAdapter
+from sqlalchemy import insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.api.conditional import check_not_modified, collection_validators
+from app.api.responses import json_list_response
+from app.api.routes.scans import queue_scan
+from app.core.database import get_db, get_read_db
 from app.models.family_member import FamilyMember
+from app.models.member_identifier import IdentifierKind
+from app.models.scan import ScanType
 from app.schemas.family_member import (
     FamilyMemberCreate,
     FamilyMemberUpdate,
     FamilyMemberResponse,
+    FamilyMemberImportResult,
+    SharedIdentifier,
+)
+from app.services.identifiers import (
+    find_member_ids,
+    find_shared_identifiers,
+    member_identifiers,
+    replace_member_identifiers,
+)
+from app.services.member_import import (
+    ImportFormatError,
+    iter_csv_rows,
+    iter_ndjson_rows,
+    validate_chunks,
 )
 
 router = APIRouter()
 
+family_member_list_adapter = TypeAdapter(list[FamilyMemberResponse])
+
+# Cap on row-level errors echoed back by an import (the failed count stays exact)
+MAX_REPORTED_IMPORT_ERRORS = 1000
+
+
+def _member_values(member: FamilyMemberCreate) -> dict:
+    """Column values for a new family member, including the legacy name field."""
+    data = member.model_dump()
+    # Set legacy name field from first + last name
+    data["name"] = f"{data['first_name']} {data['last_name']}"
+    return data
+
 
 @router.get("/", response_model=list[FamilyMemberResponse])
-async def list_family_members(db: AsyncSession = Depends(get_db)):
+async def list_family_members(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
+):
     """List all family members being monitored."""
+    etag, last_modified = await collection_validators(db, FamilyMember)
+    not_modified = check_not_modified(request, response, etag, last_modified)
+    if not_modified:
+        return not_modified
+
     result = await db.execute(select(FamilyMember).order_by(FamilyMember.name))
-    return result.scalars().all()
+    return json_list_response(family_member_list_adapter, result.scalars().all(), response.headers)
 
 
 @router.post("/", response_model=FamilyMemberResponse, status_code=201)
@@ -26,18 +70,111 @@ async def create_family_member(
     db: AsyncSession = Depends(get_db),
 ):
     """Add a new family member to monitor."""
-    data = member.model_dump()
-    # Set legacy name field from first + last name
-    data["name"] = f"{data['first_name']} {data['last_name']}"
-    db_member = FamilyMember(**data)
+    db_member = FamilyMember(**_member_values(member))
     db.add(db_member)
+    await db.flush()
+    await replace_member_identifiers(
+        db, {db_member.id: member_identifiers(db_member)}, existing=False
+    )
     await db.commit()
     await db.refresh(db_member)
     return db_member
 
 
+@router.post("/import", response_model=FamilyMemberImportResult)
+async def import_family_members(
+    file: UploadFile = File(...),
+    scan: bool = Query(False, description="Queue one full scan for the imported members"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Bulk-import family members from a CSV or NDJSON upload.
+
+    CSV uploads need a header row; list columns (emails, phone_numbers,
+    addresses) take several values separated by ";". Rows are validated in
+    chunks and inserted with batched multi-row INSERTs in a single transaction.
+    Invalid rows are skipped and reported by row number.
+    """
+    filename = (file.filename or "").lower()
+    content_type = file.content_type or ""
+    if filename.endswith((".ndjson", ".jsonl", ".json")) or "json" in content_type:
+        rows = iter_ndjson_rows(file.file)
+    else:
+        rows = iter_csv_rows(file.file)
+
+    imported_ids: list[int] = []
+    errors: list[dict] = []
+    failed = 0
+
+    # Reading the (possibly spooled to disk) upload and validating are
+    # blocking; each chunk is done in a worker thread to keep the loop free
+    chunks = validate_chunks(rows)
+    try:
+        while chunk := await asyncio.to_thread(next, chunks, None):
+            members, chunk_errors = chunk
+            if members:
+                result = await db.execute(
+                    insert(FamilyMember).returning(
+                        FamilyMember.id, sort_by_parameter_order=True
+                    ),
+                    [_member_values(member) for member in members],
+                )
+                chunk_ids = result.scalars().all()
+                await replace_member_identifiers(
+                    db,
+                    {
+                        member_id: member_identifiers(member)
+                        for member_id, member in zip(chunk_ids, members)
+                    },
+                    existing=False,
+                )
+                imported_ids.extend(chunk_ids)
+
+            failed += len(chunk_errors)
+            errors.extend(chunk_errors[:MAX_REPORTED_IMPORT_ERRORS - len(errors)])
+    except ImportFormatError as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+
+    await db.commit()
+
+    scan_id = None
+    if scan and imported_ids:
+        queued = await queue_scan(db, ScanType.FULL, imported_ids)
+        scan_id = queued.id
+
+    return {
+        "imported": len(imported_ids),
+        "failed": failed,
+        "errors": errors,
+        "scan_id": scan_id,
+    }
+
+
+@router.get("/lookup", response_model=list[FamilyMemberResponse])
+async def lookup_family_members(
+    kind: IdentifierKind,
+    value: str,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Find the family members that own an email, phone number or address."""
+    member_ids = await find_member_ids(db, kind, value)
+    if not member_ids:
+        return []
+    result = await db.execute(
+        select(FamilyMember).where(FamilyMember.id.in_(member_ids)).order_by(FamilyMember.name)
+    )
+    return result.scalars().all()
+
+
+@router.get("/duplicates", response_model=list[SharedIdentifier])
+async def list_shared_identifiers(db: AsyncSession = Depends(get_read_db)):
+    """List emails, phones and addresses shared by more than one family member."""
+    return await find_shared_identifiers(db)
+
+
 @router.get("/{member_id}", response_model=FamilyMemberResponse)
-async def get_family_member(member_id: int, db: AsyncSession = Depends(get_db)):
+async def get_family_member(member_id: int, db: AsyncSession = Depends(get_read_db)):
     """Get details for a specific family member."""
     result = await db.execute(select(FamilyMember).where(FamilyMember.id == member_id))
     member = result.scalar_one_or_none()
@@ -66,6 +203,10 @@ async def update_family_member(
     if "first_name" in update_data or "last_name" in update_data:
         member.name = f"{member.first_name} {member.last_name}"
 
+    # Keep the identifier index in sync with the contact fields
+    if update_data.keys() & {"emails", "phone_numbers", "addresses"}:
+        await replace_member_identifiers(db, {member.id: member_identifiers(member)})
+
     await db.commit()
     await db.refresh(member)
     return member
@@ -1,8 +1,16 @@
 from fastapi import APIRouter
 
+from app.core.database import pool_stats
+
 router = APIRouter()
 
 
 @router.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+
+@router.get("/health/db")
+async def database_pool_health():
+    """Connection pool usage of this API process (checkouts, waits, timeouts)."""
+    return {"pools": pool_stats()}
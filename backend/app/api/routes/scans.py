@@ -1,31 +1,43 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from pydantic import TypeAdapter
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.api.conditional import check_not_modified, collection_validators, merge_validators
+from app.api.responses import json_list_response
+from app.api.sse import format_sse, relay_events, sse_response
+from app.core import task_client
+from app.core.database import async_session_maker, get_db, get_read_db
+from app.models.archive import ScanArchive
 from app.models.scan import Scan, ScanStatus, ScanType
 from app.schemas.scan import ScanResponse, ScanCreate
-from app.tasks.scanning import run_breach_scan, run_data_broker_scan, run_full_scan
+from app.services.live_events import SCAN_FINISHED, scan_channel, subscription
 
 router = APIRouter()
 
+scan_list_adapter = TypeAdapter(list[ScanResponse])
 
-@router.get("/", response_model=list[ScanResponse])
-async def list_scans(db: AsyncSession = Depends(get_db)):
-    """List all scan history."""
-    result = await db.execute(select(Scan).order_by(Scan.started_at.desc()))
-    return result.scalars().all()
+# Celery tasks that publish progress for each scan type
+SCAN_TASKS = {
+    ScanType.BREACH: {"breach"},
+    ScanType.DATA_BROKER: {"data_broker"},
+    ScanType.FULL: {"breach", "data_broker"},
+}
 
+# While no events arrive, re-read the scan this often (seconds) to notice ended tasks
+SCAN_RECHECK_SECONDS = 5
 
-@router.post("/", response_model=ScanResponse, status_code=201)
-async def trigger_scan(
-    scan: ScanCreate,
-    db: AsyncSession = Depends(get_db),
-):
-    """Trigger a new scan for exposures."""
+
+async def queue_scan(
+    db: AsyncSession,
+    scan_type: ScanType,
+    family_member_ids: list[int] | None = None,
+    profile: bool = False,
+) -> Scan:
+    """Create a scan record and queue the Celery task(s) for it."""
     # Create scan record
     db_scan = Scan(
-        scan_type=scan.scan_type,
+        scan_type=scan_type,
         status=ScanStatus.PENDING,
     )
     db.add(db_scan)
@@ -33,22 +45,143 @@ async def trigger_scan(
     await db.refresh(db_scan)
 
     # Queue the appropriate Celery task
-    if scan.scan_type == ScanType.BREACH:
-        run_breach_scan.delay(scan.family_member_ids, db_scan.id)
-    elif scan.scan_type == ScanType.DATA_BROKER:
-        run_data_broker_scan.delay(scan.family_member_ids, db_scan.id)
-    elif scan.scan_type == ScanType.FULL:
-        run_breach_scan.delay(scan.family_member_ids, db_scan.id)
-        run_data_broker_scan.delay(scan.family_member_ids, db_scan.id)
+    args = (family_member_ids, db_scan.id)
+    if scan_type in (ScanType.BREACH, ScanType.FULL):
+        task_client.send_task(task_client.RUN_BREACH_SCAN, args, profile=profile)
+    if scan_type in (ScanType.DATA_BROKER, ScanType.FULL):
+        task_client.send_task(task_client.RUN_DATA_BROKER_SCAN, args, profile=profile)
 
     return db_scan
 
 
+@router.get("/", response_model=list[ScanResponse])
+async def list_scans(
+    request: Request,
+    response: Response,
+    include_archived: bool = False,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """List scan history (older scans moved out by retention with include_archived)."""
+    etag, last_modified = await collection_validators(db, Scan)
+    if include_archived:
+        etag, last_modified = merge_validators(
+            (etag, last_modified), await collection_validators(db, ScanArchive)
+        )
+    not_modified = check_not_modified(request, response, etag, last_modified)
+    if not_modified:
+        return not_modified
+
+    result = await db.execute(select(Scan).order_by(Scan.started_at.desc()))
+    scans = list(result.scalars().all())
+
+    if include_archived:
+        # Archived scans all started before the oldest scan still in the hot table
+        archived = await db.execute(select(ScanArchive).order_by(ScanArchive.started_at.desc()))
+        scans.extend(archived.scalars().all())
+
+    return json_list_response(scan_list_adapter, scans, response.headers)
+
+
+@router.post("/", response_model=ScanResponse, status_code=201)
+async def trigger_scan(
+    scan: ScanCreate,
+    db: AsyncSession = Depends(get_db),
+):
+    """Trigger a new scan for exposures."""
+    return await queue_scan(db, scan.scan_type, scan.family_member_ids, profile=scan.profile)
+
+
 @router.get("/{scan_id}", response_model=ScanResponse)
-async def get_scan(scan_id: int, db: AsyncSession = Depends(get_db)):
-    """Get details and results of a specific scan."""
-    result = await db.execute(select(Scan).where(Scan.id == scan_id))
-    scan = result.scalar_one_or_none()
+async def get_scan(
+    scan_id: int,
+    include_archived: bool = False,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Get details and results of a specific scan (archived ones with include_archived)."""
+    scan = await db.get(Scan, scan_id)
+    if not scan and include_archived:
+        result = await db.execute(select(ScanArchive).where(ScanArchive.id == scan_id))
+        scan = result.scalars().first()
     if not scan:
         raise HTTPException(status_code=404, detail="Scan not found")
     return scan
+
+
+async def _load_scan(scan_id: int) -> Scan | None:
+    async with async_session_maker() as db:
+        return await db.get(Scan, scan_id)
+
+
+def _snapshot(scan: Scan) -> bytes:
+    return format_sse(ScanResponse.model_validate(scan).model_dump(mode="json"), "snapshot")
+
+
+def _running_tasks(scan: Scan | None) -> set[str]:
+    """Tasks of the scan that haven't ended; each adds its scan.timings entry when it ends."""
+    if scan is None:
+        return set()
+    return SCAN_TASKS[scan.scan_type] - set(scan.timings or {})
+
+
+async def _recheck_when_idle(events, scan_id: int, running: set[str]):
+    """
+    Pass events through, re-reading the scan every SCAN_RECHECK_SECONDS idle seconds.
+
+    Stops once no task is running, for a "finished" event that never came
+    (e.g. published while Redis was unreachable).
+    """
+    idle = 0
+    async for event in events:
+        if event is None:
+            idle += 1
+            if idle % SCAN_RECHECK_SECONDS == 0:
+                running.intersection_update(_running_tasks(await _load_scan(scan_id)))
+                if not running:
+                    return
+        else:
+            idle = 0
+        yield event
+
+
+async def _scan_event_stream(request: Request, scan_id: int):
+    async with subscription(scan_channel(scan_id)) as events:
+        # Read the current state only once subscribed, so nothing falls in between
+        scan = await _load_scan(scan_id)
+        yield _snapshot(scan)
+
+        # Not scan.status: the first task of a FULL scan to finish already sets it
+        running = _running_tasks(scan)
+        if not running:
+            return
+
+        def last_task_finished(event: dict) -> bool:
+            if event.get("type") == SCAN_FINISHED:
+                running.discard(event.get("task"))
+            return not running
+
+        async for chunk in relay_events(
+            request, _recheck_when_idle(events, scan_id, running), until=last_task_finished
+        ):
+            yield chunk
+
+        if not running:  # Rather than the client going away
+            scan = await _load_scan(scan_id)
+            if scan:
+                yield _snapshot(scan)
+
+
+@router.get("/{scan_id}/events")
+async def scan_events(scan_id: int, request: Request):
+    """
+    Live progress of a scan as Server-Sent Events.
+
+    Starts with a "snapshot" event holding the scan record, followed by
+    "started", "progress", "error" and "finished" events from the scan tasks
+    (members done, emails checked, new exposures, errors). Once every task
+    of the scan has ended, a final "snapshot" is sent and the stream ends.
+
+    Holds no database session while open; the scan is re-read in short ones.
+    """
+    if not await _load_scan(scan_id):
+        raise HTTPException(status_code=404, detail="Scan not found")
+    return sse_response(_scan_event_stream(request, scan_id))
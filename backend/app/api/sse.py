@@ -0,0 +1,59 @@
+"""Server-Sent Events (SSE) helpers for live endpoints."""
+
+import json
+from collections.abc import AsyncIterator, Callable
+from typing import Any
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+# Send a comment line after this many idle seconds so proxies keep the stream open
+KEEPALIVE_SECONDS = 15
+
+
+def format_sse(data: dict[str, Any], event: str | None = None) -> bytes:
+    """Encode one SSE message."""
+    lines = [f"event: {event}"] if event else []
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return ("\n".join(lines) + "\n\n").encode()
+
+
+async def relay_events(
+    request: Request,
+    events: AsyncIterator[dict[str, Any] | None],
+    accept: Callable[[dict[str, Any]], bool] | None = None,
+    until: Callable[[dict[str, Any]], bool] | None = None,
+) -> AsyncIterator[bytes]:
+    """
+    Forward subscription events as SSE messages until the client goes away.
+
+    Args:
+        request: Used to notice client disconnects
+        events: From live_events.subscription (None means "nothing this second")
+        accept: Optional filter for which events to forward
+        until: Optional predicate; the stream ends after the first matching event
+    """
+    idle = 0
+    async for event in events:
+        if await request.is_disconnected():
+            return
+        if event is None:
+            idle += 1
+            if idle >= KEEPALIVE_SECONDS:
+                idle = 0
+                yield b": keepalive\n\n"
+            continue
+        idle = 0
+        if accept and not accept(event):
+            continue
+        yield format_sse(event, event.get("type") or event.get("event_type"))
+        if until and until(event):
+            return
+
+
+def sse_response(stream: AsyncIterator[bytes]) -> StreamingResponse:
+    return StreamingResponse(
+        stream,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
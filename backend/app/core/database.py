@@ -1,16 +1,239 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import DeclarativeBase
+"""Database engines and sessions.
+
+Engines are created lazily, once per process: the API gets an asyncpg engine,
+Celery workers and other sync code a psycopg2 engine. Both are built from the
+same pool settings, and a process forked after an engine was created (Celery
+prefork) builds its own instead of sharing the parent's connections.
+
+If DATABASE_REPLICA_URL is set, read-only routes use get_read_db, which
+reads from the replica unless it is unreachable or lagging.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+from uuid import uuid4
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 from app.core.config import settings
+from app.core.instrumentation import instrument_engine
 
-# Async engine for FastAPI
-engine = create_async_engine(settings.database_url, echo=settings.debug)
-async_session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+logger = logging.getLogger(__name__)
 
-# Sync engine for Celery tasks and synchronous code
+# Sync URL for Celery tasks and synchronous code
 sync_database_url = settings.database_url.replace("+asyncpg", "+psycopg2").replace("postgresql+psycopg2", "postgresql")
-sync_engine = create_engine(sync_database_url)
+
+
+class PoolStatsMixin:
+    """Counts checkouts and time spent waiting for a free connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "overflow": self.overflow(),
+            "checked_in": self.checkedin(),
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_seconds_total": round(self.wait_seconds_total, 6),
+            "wait_seconds_max": round(self.wait_seconds_max, 6),
+        }
+
+
+class TimedQueuePool(PoolStatsMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(PoolStatsMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def _pool_options() -> dict:
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+
+def _asyncpg_connect_args() -> dict:
+    if settings.db_pgbouncer:
+        # PgBouncer in transaction mode may hand each transaction a different
+        # server connection, so prepared statements can't be cached or reused
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    return {"prepared_statement_cache_size": settings.db_statement_cache_size}
+
+
+def create_async_db_engine(url: str | None = None) -> AsyncEngine:
+    """Build an async engine with the configured pool."""
+    engine = create_async_engine(
+        url or settings.database_url,
+        echo=settings.debug,
+        poolclass=TimedAsyncQueuePool,
+        connect_args=_asyncpg_connect_args(),
+        **_pool_options(),
+    )
+    instrument_engine(engine.sync_engine)
+    return engine
+
+
+def create_sync_db_engine(url: str | None = None) -> Engine:
+    """Build a sync engine with the configured pool."""
+    engine = create_engine(url or sync_database_url, poolclass=TimedQueuePool, **_pool_options())
+    instrument_engine(engine)
+    return engine
+
+
+_engine_lock = threading.Lock()
+# name -> (pid that created it, engine)
+_engines: dict[str, tuple[int, AsyncEngine | Engine]] = {}
+
+
+def _process_engine(name: str, factory: Callable[[], AsyncEngine | Engine]):
+    """Return the named engine of the current process, creating it on first use."""
+    pid = os.getpid()
+    entry = _engines.get(name)
+    if entry is None or entry[0] != pid:
+        with _engine_lock:
+            entry = _engines.get(name)
+            if entry is None or entry[0] != pid:
+                if entry is not None:
+                    # Inherited from the parent: drop its connections without closing them
+                    inherited = entry[1]
+                    if isinstance(inherited, AsyncEngine):
+                        inherited = inherited.sync_engine
+                    inherited.dispose(close=False)
+                entry = (pid, factory())
+                _engines[name] = entry
+    return entry[1]
+
+
+def get_async_engine() -> AsyncEngine:
+    """The async engine of the current process."""
+    return _process_engine("async", create_async_db_engine)
+
+
+def get_sync_engine() -> Engine:
+    """The sync engine of the current process."""
+    return _process_engine("sync", create_sync_db_engine)
+
+
+def get_replica_engine() -> AsyncEngine | None:
+    """The async read-replica engine of the current process, if one is configured."""
+    if not settings.database_replica_url:
+        return None
+    return _process_engine(
+        "replica", lambda: create_async_db_engine(settings.database_replica_url)
+    )
+
+
+def async_session_maker() -> AsyncSession:
+    """New async session on the process engine (use as ``async with``)."""
+    return AsyncSession(get_async_engine(), expire_on_commit=False)
+
+
+def get_sync_db() -> Session:
+    """Get a synchronous database session for Celery tasks."""
+    return Session(get_sync_engine())
+
+
+# How far behind the primary the replica is, in seconds. An idle primary
+# writes no WAL, so a replica that has replayed everything it received counts
+# as current however old its last replayed transaction is.
+REPLICA_LAG_QUERY = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+# (time.monotonic() of the last check, whether the replica was usable)
+_replica_state: tuple[float, bool] | None = None
+
+
+async def replica_is_usable() -> bool:
+    """
+    Whether reads may go to the replica.
+
+    The lag is checked at most every db_replica_check_seconds per process; an
+    unreachable replica or one lagging more than db_replica_max_lag_seconds
+    sends reads to the primary until the next check.
+    """
+    global _replica_state
+    replica = get_replica_engine()
+    if replica is None:
+        return False
+
+    now = time.monotonic()
+    if _replica_state and now - _replica_state[0] < settings.db_replica_check_seconds:
+        return _replica_state[1]
+
+    try:
+        async with asyncio.timeout(settings.db_replica_check_timeout):
+            async with replica.connect() as conn:
+                lag = float(await conn.scalar(REPLICA_LAG_QUERY))
+        usable = lag <= settings.db_replica_max_lag_seconds
+        if not usable:
+            logger.warning("Replica is %.1fs behind, reading from the primary", lag)
+    except Exception as e:
+        logger.warning("Replica unavailable, reading from the primary: %s", e)
+        usable = False
+
+    _replica_state = (time.monotonic(), usable)
+    return usable
+
+
+async def read_session_maker() -> AsyncSession:
+    """New async session for read-only work: the replica when usable, else the primary."""
+    if await replica_is_usable():
+        return AsyncSession(get_replica_engine(), expire_on_commit=False)
+    return async_session_maker()
+
+
+def pool_stats() -> dict:
+    """Pool usage of the engines created in this process."""
+    pid = os.getpid()
+    return {
+        name: (engine.pool if isinstance(engine, Engine) else engine.sync_engine.pool).stats()
+        for name, (engine_pid, engine) in _engines.items()
+        if engine_pid == pid
+    }
 
 
 class Base(DeclarativeBase):
@@ -20,3 +243,9 @@ class Base(DeclarativeBase):
 async def get_db() -> AsyncSession:
     async with async_session_maker() as session:
         yield session
+
+
+async def get_read_db() -> AsyncSession:
+    """Session for read-only routes; may lag the primary by db_replica_max_lag_seconds."""
+    async with await read_session_maker() as session:
+        yield session
@@ -0,0 +1,174 @@
+"""SQL statement counting.
+
+Every engine built by app.core.database reports its statements here.
+Code that wants to know how many statements a unit of work ran (and how
+long they took) wraps it in track_statements(); trackers nest, so a scan
+phase can be counted inside a task that is counted as a whole.
+
+Each API request and Celery task is tracked: the totals are logged (as a
+warning above DB_STATEMENT_LOG_THRESHOLD), a statement repeated
+DB_REPEATED_STATEMENT_THRESHOLD times is reported as a likely N+1 loop, and
+in debug mode responses carry X-DB-Statements / X-DB-Time-Ms headers.
+Tests can hold routes and tasks to a budget with the statement_budget
+fixture (tests/conftest.py). Slow statements are handed to
+app.core.slow_queries.
+"""
+
+import logging
+import time
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.slow_queries import record_slow_query
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StatementStats:
+    count: int = 0
+    seconds: float = 0.0
+    # Executions per SQL string, to spot per-row query loops
+    by_statement: Counter[str] = field(default_factory=Counter)
+
+    def most_repeated(self) -> tuple[str, int] | None:
+        top = self.by_statement.most_common(1)
+        return top[0] if top else None
+
+
+# Trackers active in the current context, innermost last
+_trackers: ContextVar[tuple[StatementStats, ...]] = ContextVar("statement_trackers", default=())
+
+# Describes the request or task running the statements ("GET /api/scans/", ...)
+_source: ContextVar[Callable[[], str] | None] = ContextVar("statement_source", default=None)
+
+
+@contextmanager
+def track_statements() -> Iterator[StatementStats]:
+    """Count the statements executed (in this context) during the block."""
+    stats = StatementStats()
+    token = _trackers.set(_trackers.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _trackers.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _trackers.get() or settings.slow_query_threshold_ms:
+        conn.info.setdefault("statement_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("statement_started")
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+
+    threshold = settings.slow_query_threshold_ms
+    if threshold and elapsed * 1000 >= threshold:
+        source = _source.get()
+        try:
+            record_slow_query(
+                conn, statement, parameters, executemany, elapsed, source() if source else None
+            )
+        except Exception:
+            logger.exception("Could not record a slow query")
+
+    for stats in _trackers.get():
+        stats.count += 1
+        stats.seconds += elapsed
+        stats.by_statement[statement] += 1
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Report the statements of a (sync, or an async engine's sync_engine) engine."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def report(label: str, stats: StatementStats) -> None:
+    """Log the statement totals of a request or task, flagging likely N+1 loops."""
+    repeated = stats.most_repeated()
+    threshold = settings.db_repeated_statement_threshold
+    if repeated and threshold and repeated[1] >= threshold:
+        statement = " ".join(repeated[0].split())
+        logger.warning(
+            "%s ran the same statement %d times (N+1?): %.200s", label, repeated[1], statement
+        )
+
+    threshold = settings.db_statement_log_threshold
+    too_many = threshold and stats.count > threshold
+    logger.log(
+        logging.WARNING if too_many else logging.DEBUG,
+        "%s: %d statements, %.1f ms in the database",
+        label, stats.count, stats.seconds * 1000,
+    )
+
+
+class StatementCountMiddleware:
+    """Tracks the statements of each API request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        def source() -> str:
+            route = scope.get("route")
+            return f'{scope["method"]} {getattr(route, "path", scope["path"])}'
+
+        source_token = _source.set(source)
+        with track_statements() as stats:
+            async def send_with_counts(message):
+                # Streaming responses send headers first: counts up to that point
+                if message["type"] == "http.response.start" and settings.debug:
+                    message["headers"] = [
+                        *message.get("headers", []),
+                        (b"x-db-statements", str(stats.count).encode()),
+                        (b"x-db-time-ms", f"{stats.seconds * 1000:.1f}".encode()),
+                    ]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_counts)
+            finally:
+                _source.reset(source_token)
+
+        report(source(), stats)
+
+
+# task_id -> (stats, tracker token, source token) of Celery tasks running in this process
+_task_trackers: dict[str, tuple[StatementStats, Token, Token]] = {}
+
+
+def start_task_tracking(task_id: str, task_name: str) -> None:
+    """Track a Celery task's statements (task_prerun)."""
+    stats = StatementStats()
+    label = f"Task {task_name}"
+    _task_trackers[task_id] = (
+        stats,
+        _trackers.set(_trackers.get() + (stats,)),
+        _source.set(lambda: label),
+    )
+
+
+def finish_task_tracking(task_id: str, task_name: str) -> None:
+    """Stop tracking a task and log its totals (task_postrun)."""
+    entry = _task_trackers.pop(task_id, None)
+    if entry is None:
+        return
+    stats, trackers_token, source_token = entry
+    _source.reset(source_token)
+    _trackers.reset(trackers_token)
+    report(f"Task {task_name}", stats)
@@ -0,0 +1,310 @@
+"""Prometheus metrics for the API and Celery workers.
+
+The API serves them at GET /metrics. Celery workers serve theirs over HTTP
+on METRICS_WORKER_PORT, started from the main worker process.
+
+With more than one process per container (uvicorn --workers, Celery
+prefork), set PROMETHEUS_MULTIPROC_DIR to a writable directory: every
+process then writes its samples there and the exporter adds them up.
+Without it, a prefork worker's exporter only sees the main process.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+import redis
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from app.core.config import settings
+from app.core.instrumentation import StatementStats
+from app.core.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+MULTIPROC_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+# Celery queues whose backlog is reported (LLEN of the Redis list)
+CELERY_QUEUES = ("celery",)
+
+# External calls: mostly sub-second, HIBP and Graph can stall for the full timeout
+EXTERNAL_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Scan phases run from milliseconds (small families) to many minutes
+SCAN_BUCKETS = (0.1, 0.5, 1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0)
+
+# How often each worker process samples its connection pools
+POOL_SAMPLE_SECONDS = 5.0
+
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "fibertap_http_request_duration_seconds",
+    "API request latency by route template (streams: until the response starts)",
+    ["method", "route", "status"],
+)
+HIBP_REQUEST_SECONDS = Histogram(
+    "fibertap_hibp_request_duration_seconds",
+    "HIBP breached-account lookups",
+    ["outcome"],
+    buckets=EXTERNAL_BUCKETS,
+)
+EMAIL_SEND_SECONDS = Histogram(
+    "fibertap_email_send_duration_seconds",
+    "Email sends; a Graph $batch request counts once",
+    ["transport", "outcome"],
+    buckets=EXTERNAL_BUCKETS,
+)
+SCAN_PHASE_SECONDS = Histogram(
+    "fibertap_scan_phase_duration_seconds",
+    "Time one scan task spent per phase",
+    ["task", "phase"],
+    buckets=SCAN_BUCKETS,
+)
+EXPOSURES_CREATED = Counter(
+    "fibertap_exposures_created",
+    "Exposures recorded by scans",
+    ["source"],
+)
+CACHE_LOOKUPS = Counter(
+    "fibertap_cache_lookups",
+    "In-process cache lookups",
+    ["cache", "result"],
+)
+
+# Pool usage of Celery worker processes, sampled by record_worker_pool_usage.
+# Unlike PoolCollector these go through the multiprocess directory, so a
+# prefork worker's exporter adds up all of its children.
+WORKER_POOL_CHECKED_OUT = Gauge(
+    "fibertap_worker_db_pool_checked_out",
+    "Connections in use by worker processes",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+WORKER_POOL_SIZE = Gauge(
+    "fibertap_worker_db_pool_size",
+    "Connections kept open by worker processes",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+WORKER_POOL_TIMEOUTS = Counter(
+    "fibertap_worker_db_pool_timeouts",
+    "Worker checkouts that timed out waiting",
+    ["engine"],
+)
+WORKER_POOL_WAIT_SECONDS = Counter(
+    "fibertap_worker_db_pool_wait_seconds",
+    "Time worker processes spent waiting for a connection",
+    ["engine"],
+)
+
+
+@contextmanager
+def timed(histogram: Histogram, **labels: str) -> Iterator[dict[str, str]]:
+    """
+    Observe the duration of the block.
+
+    Yields the label dict, so the block can set labels that are only known
+    at the end (e.g. ``labels["outcome"] = "ok"``).
+    """
+    start = time.perf_counter()
+    try:
+        yield labels
+    finally:
+        histogram.labels(**labels).observe(time.perf_counter() - start)
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    CACHE_LOOKUPS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+class PhaseTimer:
+    """
+    Adds up the time one scan task spends per phase, plus event counts.
+
+    Phases may be entered many times (e.g. once per member); observe()
+    records one total per phase, plus the task's overall duration. Each
+    entry into a phase is also a trace span (scan.<phase>). profile() is
+    the same breakdown as stored on the scan record.
+    """
+
+    def __init__(self, task: str):
+        self.task = task
+        self.seconds: dict[str, float] = defaultdict(float)
+        self.counts: dict[str, int] = defaultdict(int)
+        self.queue_wait: float | None = None
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            with tracer.start_as_current_span(f"scan.{name}"):
+                yield
+        finally:
+            self.seconds[name] += time.perf_counter() - start
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counts[name] += n
+
+    def observe(self) -> None:
+        for name, seconds in self.seconds.items():
+            SCAN_PHASE_SECONDS.labels(task=self.task, phase=name).observe(seconds)
+        SCAN_PHASE_SECONDS.labels(task=self.task, phase="total").observe(
+            time.perf_counter() - self._started
+        )
+        if self.queue_wait is not None:
+            SCAN_PHASE_SECONDS.labels(task=self.task, phase="queue_wait").observe(self.queue_wait)
+
+    def profile(self, statements: StatementStats | None = None) -> dict:
+        """JSON-ready breakdown: seconds per phase, counts, and DB statements if tracked."""
+        counts = dict(self.counts)
+        profile = {
+            "total_seconds": round(time.perf_counter() - self._started, 4),
+            "queue_wait_seconds": (
+                round(self.queue_wait, 4) if self.queue_wait is not None else None
+            ),
+            "phases": {name: round(seconds, 4) for name, seconds in self.seconds.items()},
+            "counts": counts,
+        }
+        if statements is not None:
+            counts["db_statements"] = statements.count
+            profile["db_seconds"] = round(statements.seconds, 4)
+        return profile
+
+
+class PoolCollector:
+    """Connection pool usage of the engines in the serving process (the API's)."""
+
+    def collect(self):
+        from app.core.database import pool_stats
+
+        checked_out = GaugeMetricFamily(
+            "fibertap_db_pool_checked_out", "Connections in use", labels=["engine"]
+        )
+        size = GaugeMetricFamily(
+            "fibertap_db_pool_size", "Connections kept open", labels=["engine"]
+        )
+        timeouts = CounterMetricFamily(
+            "fibertap_db_pool_timeouts", "Checkouts that timed out waiting", labels=["engine"]
+        )
+        wait = CounterMetricFamily(
+            "fibertap_db_pool_wait_seconds",
+            "Time spent waiting for a connection",
+            labels=["engine"],
+        )
+        for engine, stats in pool_stats().items():
+            checked_out.add_metric([engine], stats["checked_out"])
+            size.add_metric([engine], stats["size"])
+            timeouts.add_metric([engine], stats["timeouts"])
+            wait.add_metric([engine], stats["wait_seconds_total"])
+        yield from (checked_out, size, timeouts, wait)
+
+
+# engine -> (timeouts, wait seconds) at the last sample, to count the increase
+_pool_totals: dict[str, tuple[int, float]] = {}
+
+
+def record_worker_pool_usage() -> None:
+    """Copy pool_stats() of the current process into the WORKER_POOL_* metrics."""
+    from app.core.database import pool_stats
+
+    for engine, stats in pool_stats().items():
+        WORKER_POOL_CHECKED_OUT.labels(engine=engine).set(stats["checked_out"])
+        WORKER_POOL_SIZE.labels(engine=engine).set(stats["size"])
+        timeouts, wait_seconds = _pool_totals.get(engine, (0, 0.0))
+        # A new engine (e.g. after fork) starts again from zero
+        WORKER_POOL_TIMEOUTS.labels(engine=engine).inc(max(stats["timeouts"] - timeouts, 0))
+        WORKER_POOL_WAIT_SECONDS.labels(engine=engine).inc(
+            max(stats["wait_seconds_total"] - wait_seconds, 0)
+        )
+        _pool_totals[engine] = (stats["timeouts"], stats["wait_seconds_total"])
+
+
+def start_pool_sampler(interval: float = POOL_SAMPLE_SECONDS) -> None:
+    """Sample the process's pools every interval seconds, in a daemon thread."""
+    _pool_totals.clear()  # Inherited from the parent process
+
+    def sample():
+        while True:
+            try:
+                record_worker_pool_usage()
+            except Exception:
+                logger.exception("Could not sample the connection pools")
+            time.sleep(interval)
+
+    threading.Thread(target=sample, name="pool-metrics", daemon=True).start()
+
+
+class CeleryQueueCollector:
+    """Tasks waiting in the Celery broker queues."""
+
+    def __init__(self):
+        self._redis: redis.Redis | None = None
+
+    def collect(self):
+        depth = GaugeMetricFamily(
+            "fibertap_celery_queue_length", "Tasks waiting in the broker", labels=["queue"]
+        )
+        try:
+            if self._redis is None:
+                self._redis = redis.Redis.from_url(
+                    settings.redis_url, socket_timeout=0.5, socket_connect_timeout=0.5
+                )
+            pipe = self._redis.pipeline(transaction=False)
+            for queue in CELERY_QUEUES:
+                pipe.llen(queue)
+            for queue, length in zip(CELERY_QUEUES, pipe.execute()):
+                depth.add_metric([queue], length)
+        except redis.RedisError as e:
+            logger.warning("Could not read Celery queue lengths: %s", e)
+        yield depth
+
+
+# Gauges read at scrape time by the API only (workers would report the same queues)
+_api_registry = CollectorRegistry(auto_describe=False)
+_api_registry.register(PoolCollector())
+_api_registry.register(CeleryQueueCollector())
+
+
+def _process_registry() -> CollectorRegistry:
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def render_api_metrics() -> bytes:
+    """Text exposition for GET /metrics."""
+    return generate_latest(_process_registry()) + generate_latest(_api_registry)
+
+
+def start_worker_exporter(port: int) -> None:
+    """Serve the worker's metrics over HTTP (call once, in the main worker process)."""
+    if MULTIPROC_DIR:
+        # Samples of a previous run would be added to this one's
+        os.makedirs(MULTIPROC_DIR, exist_ok=True)
+        for name in os.listdir(MULTIPROC_DIR):
+            if name.endswith(".db"):
+                os.remove(os.path.join(MULTIPROC_DIR, name))
+    start_http_server(port, registry=_process_registry())
+    logger.info("Serving worker metrics on port %d", port)
+
+
+def mark_process_dead(pid: int) -> None:
+    """Drop the live gauges of a finished worker process (multiprocess mode)."""
+    if MULTIPROC_DIR:
+        multiprocess.mark_process_dead(pid)
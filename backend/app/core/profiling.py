@@ -0,0 +1,178 @@
+"""On-demand cProfile profiles of single API requests and Celery tasks.
+
+Nothing is profiled unless asked for:
+
+- POST /api/admin/profiling arms the next N API requests of that process
+- a request with ``X-Profile: <PROFILING_TOKEN>`` is profiled (ignored
+  while no token is configured)
+- a scan queued with ``"profile": true`` profiles its Celery task(s)
+
+Profiles are pstats files in PROFILING_DIR (open them with snakeviz or
+``python -m pstats``, or convert them for speedscope) and are listed at
+GET /api/admin/profiles. Only one profile runs at a time per process; a
+request or task that would overlap another one runs unprofiled.
+"""
+
+import cProfile
+import hmac
+import logging
+import re
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Celery message header that asks for the task to be profiled
+TASK_PROFILE_HEADER = "fibertap_profile"
+
+REQUEST_HEADER = b"x-profile"
+
+PROFILE_NAME = re.compile(r"^[\w.-]+\.prof$")
+
+# Admin endpoints are never profiled by armed requests (they would use them up)
+UNPROFILED_PREFIX = "/api/admin/"
+
+_active = threading.Lock()
+_armed = 0
+_armed_lock = threading.Lock()
+# task_id -> profiler of Celery tasks running in this process
+_task_profilers: dict[str, cProfile.Profile] = {}
+
+
+def profiles_dir() -> Path:
+    path = Path(settings.profiling_dir)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _save(profiler: cProfile.Profile, kind: str, label: str) -> Path:
+    slug = re.sub(r"[^\w.-]+", "_", label).strip("_")[:80]
+    path = profiles_dir() / f"{kind}-{datetime.utcnow():%Y%m%dT%H%M%S%f}-{slug}.prof"
+    profiler.dump_stats(path)
+    logger.info("Saved profile %s", path)
+
+    # Keep the newest profiling_keep files
+    profiles = sorted(profiles_dir().glob("*.prof"), key=lambda p: p.stat().st_mtime)
+    for old in profiles[:-settings.profiling_keep]:
+        old.unlink(missing_ok=True)
+    return path
+
+
+@contextmanager
+def profiled(kind: str, label: str) -> Iterator[bool]:
+    """Profile the block; yields False (and doesn't profile) if another profile is running."""
+    if not _active.acquire(blocking=False):
+        yield False
+        return
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+        try:
+            yield True
+        finally:
+            profiler.disable()
+            _save(profiler, kind, label)
+    finally:
+        _active.release()
+
+
+def arm_requests(count: int) -> int:
+    """Profile the next count API requests of this process; returns how many are armed."""
+    global _armed
+    with _armed_lock:
+        _armed = max(count, 0)
+        return _armed
+
+
+def armed_requests() -> int:
+    return _armed
+
+
+def _take_armed() -> bool:
+    global _armed
+    if not _armed:
+        return False
+    with _armed_lock:
+        if not _armed:
+            return False
+        _armed -= 1
+        return True
+
+
+def _wants_profile(scope) -> bool:
+    if settings.profiling_token:
+        for name, value in scope["headers"]:
+            if name == REQUEST_HEADER:
+                return hmac.compare_digest(value, settings.profiling_token.encode())
+    return bool(_armed) and not scope["path"].startswith(UNPROFILED_PREFIX) and _take_armed()
+
+
+class ProfilingMiddleware:
+    """
+    Profiles requests that ask for it.
+
+    Async code shares the thread with every other request on the event loop,
+    so a profile also contains whatever ran concurrently; arm it on a quiet
+    process for clean numbers.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+        with profiled("request", f'{scope["method"]} {scope["path"]}'):
+            await self.app(scope, receive, send)
+
+
+def start_task_profile(task_id: str, request) -> None:
+    """Start profiling a Celery task whose message asked for it (task_prerun)."""
+    if not getattr(request, TASK_PROFILE_HEADER, False):
+        return
+    if not _active.acquire(blocking=False):
+        logger.warning("Not profiling task %s: another profile is running", task_id)
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    _task_profilers[task_id] = profiler
+
+
+def finish_task_profile(task_id: str, task_name: str) -> None:
+    """Stop and save the profile of a task (task_postrun)."""
+    profiler = _task_profilers.pop(task_id, None)
+    if profiler is None:
+        return
+    try:
+        profiler.disable()
+        _save(profiler, "task", task_name.rsplit(".", 1)[-1])
+    finally:
+        _active.release()
+
+
+def list_profiles() -> list[dict]:
+    """Saved profiles, newest first."""
+    files = sorted(profiles_dir().glob("*.prof"), key=lambda p: p.stat().st_mtime, reverse=True)
+    return [
+        {
+            "name": path.name,
+            "kind": path.name.split("-", 1)[0],
+            "size": path.stat().st_size,
+            "created_at": datetime.utcfromtimestamp(path.stat().st_mtime),
+        }
+        for path in files
+    ]
+
+
+def profile_file(name: str) -> Path | None:
+    """Path of a saved profile, or None if there is no such profile."""
+    if not PROFILE_NAME.match(name):
+        return None
+    path = profiles_dir() / name
+    return path if path.is_file() else None
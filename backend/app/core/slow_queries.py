@@ -0,0 +1,181 @@
+"""Slow-query log with sampled EXPLAIN plans.
+
+Statements that take longer than SLOW_QUERY_THRESHOLD_MS on any engine
+built by app.core.database are logged with their duration, the shape of
+their parameters (types only, never values) and the route or task that
+ran them. A sample of slow SELECTs (not locking ones) is re-run under
+``EXPLAIN (ANALYZE, BUFFERS)`` on a separate connection, in a background
+thread, so the request or task that hit the slow query doesn't wait.
+
+Entries go to a ring buffer in Redis shared by the API and the workers
+(scan dedup queries run in Celery), listed at GET /api/admin/slow-queries.
+While Redis is unreachable each process keeps its own entries.
+"""
+
+import json
+import logging
+import os
+import random
+import re
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any
+
+import redis
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY = "fibertap:slow_queries"
+
+# Statements are stored and logged up to this many characters
+MAX_STATEMENT_LENGTH = 2000
+
+_ASYNCPG_PARAM = re.compile(r"\$(\d+)")
+
+# Row-locking clauses: FOR UPDATE, FOR NO KEY UPDATE, FOR SHARE, FOR KEY SHARE
+_LOCKING_CLAUSE = re.compile(
+    r"\bFOR\s+(NO\s+KEY\s+UPDATE|UPDATE|KEY\s+SHARE|SHARE)\b", re.IGNORECASE
+)
+
+_local: deque[dict[str, Any]] = deque(maxlen=settings.slow_query_log_size)
+_redis: redis.Redis | None = None
+# (pid, executor): a thread pool doesn't survive a fork
+_executor: tuple[int, ThreadPoolExecutor] | None = None
+_executor_lock = threading.Lock()
+# Sync URL -> engine used for EXPLAIN (no pooling: plans are rare)
+_explain_engines: dict[str, Engine] = {}
+
+
+def _parameter_shape(parameters: Any) -> Any:
+    if isinstance(parameters, dict):
+        return {name: type(value).__name__ for name, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def _explainable(statement: str) -> bool:
+    """
+    Whether EXPLAIN ANALYZE may re-run the statement on another connection.
+
+    Only plain SELECTs: a locking SELECT would wait for the locks its own
+    transaction still holds, or take locks that make other workers skip rows.
+    """
+    return (
+        statement.lstrip().upper().startswith("SELECT")
+        and not _LOCKING_CLAUSE.search(statement)
+    )
+
+
+def _sync_redis() -> redis.Redis:
+    global _redis
+    if _redis is None:
+        _redis = redis.Redis.from_url(
+            settings.redis_url, socket_timeout=0.5, socket_connect_timeout=0.5
+        )
+    return _redis
+
+
+def _explain_engine(conn: Connection) -> Engine:
+    url = conn.engine.url.set(drivername="postgresql+psycopg2")
+    key = url.render_as_string(hide_password=False)
+    if key not in _explain_engines:
+        _explain_engines[key] = create_engine(url, poolclass=NullPool)
+    return _explain_engines[key]
+
+
+def _explain(engine: Engine, statement: str, parameters: Any, asyncpg: bool) -> str:
+    if asyncpg and parameters:
+        # asyncpg numbers its parameters ($1, $2); psycopg2 takes positional %s
+        statement = _ASYNCPG_PARAM.sub("%s", statement.replace("%", "%%"))
+        parameters = tuple(parameters)
+    timeout_ms = int(settings.slow_query_explain_timeout_seconds * 1000)
+    with engine.connect() as conn:
+        conn.execute(text(f"SET LOCAL statement_timeout = {timeout_ms}"))
+        rows = conn.exec_driver_sql(
+            f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters or None
+        ).all()
+        conn.rollback()  # ANALYZE really runs the statement
+    return "\n".join(row[0] for row in rows)
+
+
+def _store(entry: dict[str, Any]) -> None:
+    _local.appendleft(entry)
+    try:
+        pipe = _sync_redis().pipeline(transaction=False)
+        pipe.lpush(REDIS_KEY, json.dumps(entry, default=str))
+        pipe.ltrim(REDIS_KEY, 0, settings.slow_query_log_size - 1)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.debug("Slow query kept locally only: %s", e)
+
+
+def _finish(entry: dict[str, Any], explain: tuple | None) -> None:
+    """Background thread: capture the plan (if sampled) and store the entry."""
+    if explain:
+        try:
+            entry["plan"] = _explain(*explain)
+        except Exception as e:
+            entry["plan_error"] = str(e)
+    _store(entry)
+
+
+def _background() -> ThreadPoolExecutor:
+    global _executor
+    pid = os.getpid()
+    if _executor is None or _executor[0] != pid:
+        with _executor_lock:
+            if _executor is None or _executor[0] != pid:
+                _executor = (
+                    pid, ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query")
+                )
+    return _executor[1]
+
+
+def record_slow_query(
+    conn: Connection,
+    statement: str,
+    parameters: Any,
+    executemany: bool,
+    seconds: float,
+    source: str | None,
+) -> None:
+    """Log a slow statement and queue it for storage (and maybe EXPLAIN)."""
+    logger.warning(
+        "Slow query (%.0f ms) in %s: %.200s",
+        seconds * 1000, source or "unknown", " ".join(statement.split()),
+    )
+    entry = {
+        "at": datetime.utcnow().isoformat(),
+        "duration_ms": round(seconds * 1000, 1),
+        "source": source,
+        "statement": statement[:MAX_STATEMENT_LENGTH],
+        "parameters": _parameter_shape(parameters[0] if executemany and parameters else parameters),
+        "executemany": executemany,
+        "plan": None,
+    }
+
+    explain = None
+    if (
+        conn.dialect.name == "postgresql"
+        and not executemany
+        and _explainable(statement)
+        and random.random() < settings.slow_query_explain_sample_rate
+    ):
+        explain = (_explain_engine(conn), statement, parameters, conn.dialect.driver == "asyncpg")
+    _background().submit(_finish, entry, explain)
+
+
+def recent_slow_queries(limit: int = 50) -> list[dict[str, Any]]:
+    """Newest entries first: from Redis (all processes), else this process's own."""
+    try:
+        return [json.loads(raw) for raw in _sync_redis().lrange(REDIS_KEY, 0, limit - 1)]
+    except redis.RedisError:
+        return list(_local)[:limit]
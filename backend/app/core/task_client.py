@@ -0,0 +1,50 @@
+"""Publishing Celery tasks from the API.
+
+The API only sends task messages; it never runs tasks. Sending them by
+name keeps the task modules (and Celery's worker side: the task registry,
+the sync engine users, notification transports) out of the API process,
+so it starts faster. Celery itself is imported on the first send.
+
+The message carries the same headers the worker expects from
+apply_async: the trace context and publish time (app.core.tracing) and,
+if requested, the profiling flag (app.core.profiling).
+"""
+
+import threading
+from typing import Any
+
+from app.core import tracing
+from app.core.config import settings
+from app.core.profiling import TASK_PROFILE_HEADER
+
+# Registered names of the tasks the API queues (see app.tasks)
+RUN_BREACH_SCAN = "app.tasks.scanning.run_breach_scan"
+RUN_DATA_BROKER_SCAN = "app.tasks.scanning.run_data_broker_scan"
+
+_celery = None
+_lock = threading.Lock()
+
+
+def _client():
+    global _celery
+    if _celery is None:
+        with _lock:
+            if _celery is None:
+                from celery import Celery
+
+                celery = Celery("fibertap", broker=settings.redis_url, backend=settings.redis_url)
+                celery.conf.update(
+                    task_serializer="json",
+                    accept_content=["json"],
+                    result_serializer="json",
+                )
+                _celery = celery
+    return _celery
+
+
+def send_task(name: str, args: tuple | list = (), profile: bool = False) -> Any:
+    """Queue the task registered as name; returns its AsyncResult."""
+    headers: dict[str, Any] = {TASK_PROFILE_HEADER: True} if profile else {}
+    # app.tasks does this in before_task_publish for tasks queued by workers
+    tracing.inject_task_headers(headers)
+    return _client().send_task(name, args=args, headers=headers)
@@ -0,0 +1,155 @@
+"""OpenTelemetry tracing for the API and Celery workers.
+
+Tracing is off unless TRACING_EXPORTER is set; until then every span is a
+no-op. Exporters:
+
+- ``console``: spans printed to stdout
+- ``file``: one JSON span per line, appended to TRACING_FILE (works offline)
+- ``otlp``: OTLP/HTTP, needs the opentelemetry-exporter-otlp-proto-http package
+- ``package.module:factory``: any callable returning a SpanExporter
+
+Trace context travels from the API into Celery tasks in the task message
+headers, so a scan triggered by POST /scans is one trace from the request
+through queue wait, the scan phases and outbound HIBP/email calls.
+"""
+
+import importlib
+import logging
+import sys
+import time
+from typing import Any
+
+from opentelemetry import context, propagate, trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor,
+    ConsoleSpanExporter,
+    SimpleSpanProcessor,
+    SpanExporter,
+)
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+tracer = trace.get_tracer("fibertap")
+
+# Message header with the publish time, to measure how long a task sat in the queue
+PUBLISHED_AT_HEADER = "fibertap_published_at"
+
+# task_id -> (span, context token) of Celery tasks running in this process
+_task_spans: dict[str, tuple[trace.Span, object]] = {}
+
+
+def _json_lines_exporter() -> SpanExporter:
+    return ConsoleSpanExporter(
+        out=open(settings.tracing_file, "a"),
+        formatter=lambda span: span.to_json(indent=None) + "\n",
+    )
+
+
+def _otlp_exporter() -> SpanExporter:
+    try:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    except ImportError:
+        raise RuntimeError(
+            "TRACING_EXPORTER=otlp needs the opentelemetry-exporter-otlp-proto-http package"
+        )
+    return OTLPSpanExporter()  # Endpoint from OTEL_EXPORTER_OTLP_* variables
+
+
+def build_exporter(name: str) -> SpanExporter:
+    """Exporter for a TRACING_EXPORTER value."""
+    if name == "console":
+        return ConsoleSpanExporter(out=sys.stdout)
+    if name == "file":
+        return _json_lines_exporter()
+    if name == "otlp":
+        return _otlp_exporter()
+    if ":" in name:
+        module_name, _, attr = name.partition(":")
+        return getattr(importlib.import_module(module_name), attr)()
+    raise ValueError(f"Unknown tracing exporter: {name}")
+
+
+def configure_tracing(service_name: str, exporter: SpanExporter | None = None) -> bool:
+    """
+    Install the tracer provider for this process.
+
+    Call once per process (in Celery: per forked worker process, since the
+    export thread doesn't survive a fork). Returns False if tracing is off.
+    """
+    if exporter is None:
+        if settings.tracing_exporter in ("", "none"):
+            return False
+        exporter = build_exporter(settings.tracing_exporter)
+
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": service_name}),
+        sampler=ParentBased(TraceIdRatioBased(settings.tracing_sample_ratio)),
+    )
+    # Console/file output is for local debugging: write spans as they end
+    console = isinstance(exporter, ConsoleSpanExporter)
+    processor = SimpleSpanProcessor if console else BatchSpanProcessor
+    provider.add_span_processor(processor(exporter))
+    trace.set_tracer_provider(provider)
+    logger.info("Tracing enabled for %s (%s)", service_name, type(exporter).__name__)
+    return True
+
+
+# --- Celery propagation --------------------------------------------------------
+
+
+class _RequestGetter:
+    """Reads propagation headers from a Celery task request."""
+
+    def get(self, carrier, key: str) -> list[str] | None:
+        value = getattr(carrier, key, None)
+        return [value] if isinstance(value, str) else None
+
+    def keys(self, carrier) -> list[str]:
+        return []
+
+
+def inject_task_headers(headers: dict[str, Any]) -> None:
+    """Add the current trace context to an outgoing task message (before_task_publish)."""
+    propagate.inject(headers)
+    headers[PUBLISHED_AT_HEADER] = time.time()
+
+
+def queue_wait_seconds(request) -> float | None:
+    """How long a task's message waited in the queue, if the publisher stamped it."""
+    published_at = getattr(request, PUBLISHED_AT_HEADER, None)
+    if not isinstance(published_at, (int, float)):
+        return None
+    return max(time.time() - published_at, 0.0)
+
+
+def start_task_span(task_id: str, task_name: str, request) -> None:
+    """Start the span of a task, continuing the publisher's trace (task_prerun)."""
+    parent = propagate.extract(request, getter=_RequestGetter())
+    span = tracer.start_span(
+        f"celery.task {task_name}", context=parent, kind=trace.SpanKind.CONSUMER
+    )
+    span.set_attribute("celery.task_id", task_id)
+    queue_wait = queue_wait_seconds(request)
+    if queue_wait is not None:
+        span.set_attribute("celery.queue_wait_seconds", queue_wait)
+    token = context.attach(trace.set_span_in_context(span))
+    _task_spans[task_id] = (span, token)
+
+
+def end_task_span(task_id: str, state: str | None) -> None:
+    """End the span started by start_task_span (task_postrun)."""
+    entry = _task_spans.pop(task_id, None)
+    if entry is None:
+        return
+    span, token = entry
+    if state:
+        span.set_attribute("celery.state", state)
+        if state == "FAILURE":
+            span.set_status(trace.StatusCode.ERROR)
+    span.end()
+    context.detach(token)
@@ -1,8 +1,18 @@
-from fastapi import FastAPI
+import time
+
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from opentelemetry import propagate, trace
+from prometheus_client import CONTENT_TYPE_LATEST
 
 from app.api.routes import router as api_router
 from app.core.config import settings
+from app.core.instrumentation import StatementCountMiddleware
+from app.core.metrics import HTTP_REQUEST_SECONDS, render_api_metrics
+from app.core.profiling import ProfilingMiddleware
+from app.core.tracing import configure_tracing, tracer
+
+configure_tracing("fibertap-api")
 
 app = FastAPI(
     title="Fibertap API",
@@ -10,6 +20,8 @@ app = FastAPI(
     version="0.1.0",
 )
 
+app.add_middleware(StatementCountMiddleware)
+app.add_middleware(ProfilingMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins,
@@ -21,6 +33,46 @@ app.add_middleware(
 app.include_router(api_router, prefix="/api")
 
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Label by route template (/api/exposures/{exposure_id}), not the raw path
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.labels(
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=str(status),
+        ).observe(time.perf_counter() - start)
+
+
+@app.middleware("http")
+async def trace_request(request: Request, call_next):
+    with tracer.start_as_current_span(
+        f"{request.method} {request.url.path}",
+        context=propagate.extract(request.headers),
+        kind=trace.SpanKind.SERVER,
+    ) as span:
+        response = await call_next(request)
+        route = request.scope.get("route")
+        if route is not None:
+            span.update_name(f"{request.method} {route.path}")
+            span.set_attribute("http.route", route.path)
+        span.set_attribute("http.response.status_code", response.status_code)
+        return response
+
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics of this API process (or all of them, in multiprocess mode)."""
+    return Response(render_api_metrics(), media_type=CONTENT_TYPE_LATEST)
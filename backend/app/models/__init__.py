@@ -3,5 +3,23 @@ from app.models.exposure import Exposure
 from app.models.scan import Scan
 from app.models.oauth_token import OAuthToken
 from app.models.app_settings import AppSettings
+from app.models.member_identifier import MemberIdentifier, IdentifierKind
+from app.models.notification import NotificationOutbox, NotificationStatus
+from app.models.archive import ExposureArchive, ScanArchive
+from app.models.exposure_event import ExposureEvent, ExposureEventType
 
-__all__ = ["FamilyMember", "Exposure", "Scan", "OAuthToken", "AppSettings"]
+__all__ = [
+    "FamilyMember",
+    "Exposure",
+    "Scan",
+    "OAuthToken",
+    "AppSettings",
+    "MemberIdentifier",
+    "IdentifierKind",
+    "NotificationOutbox",
+    "NotificationStatus",
+    "ExposureArchive",
+    "ScanArchive",
+    "ExposureEvent",
+    "ExposureEventType",
+]
@@ -0,0 +1,64 @@
+from datetime import datetime
+
+from sqlalchemy import JSON, DateTime, Enum, ForeignKey, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+from app.models.exposure import ExposureSource, ExposureStatus, ListingVerification
+from app.models.scan import ScanStatus, ScanType
+
+
+class ExposureArchive(Base):
+    """Exposure moved out of the hot table by retention; keeps its original id."""
+
+    __tablename__ = "exposures_archive"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    family_member_id: Mapped[int] = mapped_column(
+        ForeignKey("family_members.id", ondelete="CASCADE"), index=True
+    )
+
+    source: Mapped[ExposureSource] = mapped_column(Enum(ExposureSource))
+    source_name: Mapped[str] = mapped_column(String(255))
+    source_url: Mapped[str | None] = mapped_column(String(500), nullable=True)
+
+    data_exposed: Mapped[str | None] = mapped_column(Text, nullable=True)
+    status: Mapped[ExposureStatus] = mapped_column(Enum(ExposureStatus))
+
+    incogni_request_id: Mapped[str | None] = mapped_column(String(255), nullable=True)
+
+    verification: Mapped[ListingVerification | None] = mapped_column(
+        Enum(ListingVerification), nullable=True
+    )
+    verified_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+    detected_at: Mapped[datetime] = mapped_column(DateTime)
+    updated_at: Mapped[datetime] = mapped_column(DateTime)
+    archived_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+class ScanArchive(Base):
+    """
+    Scan moved out of the hot table by retention.
+
+    Range-partitioned by month of started_at (partitions are created by the
+    retention task), so old history can be dropped a partition at a time.
+    """
+
+    __tablename__ = "scans_archive"
+    __table_args__ = {"postgresql_partition_by": "RANGE (started_at)"}
+
+    # The partition key has to be part of the primary key
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    started_at: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+
+    scan_type: Mapped[ScanType] = mapped_column(Enum(ScanType))
+    status: Mapped[ScanStatus] = mapped_column(Enum(ScanStatus))
+
+    exposures_found: Mapped[int] = mapped_column(Integer, default=0)
+    error_message: Mapped[str | None] = mapped_column(String(500), nullable=True)
+    timings: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+
+    completed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime)
+    archived_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
@@ -22,6 +22,13 @@ class ExposureSource(enum.Enum):
     OTHER = "other"
 
 
+class ListingVerification(enum.Enum):
+    """Whether a people-search result page lists the member (see app.services.broker_crawler)."""
+    CONFIRMED = "confirmed"
+    ABSENT = "absent"
+    UNKNOWN = "unknown"  # Blocked, captcha, robots.txt or a page we can't read
+
+
 class Exposure(Base):
     __tablename__ = "exposures"
 
@@ -39,6 +46,12 @@ class Exposure(Base):
 
     incogni_request_id: Mapped[str | None] = mapped_column(String(255), nullable=True)
 
+    # People-search results only; None until the listing has been checked
+    verification: Mapped[ListingVerification | None] = mapped_column(
+        Enum(ListingVerification), nullable=True
+    )
+    verified_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
     detected_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
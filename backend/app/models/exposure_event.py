@@ -0,0 +1,115 @@
+import enum
+from datetime import datetime
+
+from sqlalchemy import DateTime, Enum, ForeignKey, Index, String, event, insert, inspect
+from sqlalchemy.orm import Mapped, Session, mapped_column
+
+from app.core.database import Base
+from app.models.exposure import Exposure, ExposureStatus
+
+
+class ExposureEventType(enum.Enum):
+    DETECTED = "detected"
+    STATUS_CHANGED = "status_changed"
+    DELETED = "deleted"
+    ARCHIVED = "archived"
+
+
+class ExposureEvent(Base):
+    """Append-only history of exposure detections and status transitions."""
+
+    __tablename__ = "exposure_events"
+    __table_args__ = (
+        # Rows arrive in created_at order, so a BRIN index stays tiny and
+        # still turns "since X" into a range scan
+        Index("ix_exposure_events_created_at_brin", "created_at", postgresql_using="brin"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    # No foreign key: events outlive exposures that are deleted or archived
+    exposure_id: Mapped[int] = mapped_column(index=True)
+    family_member_id: Mapped[int] = mapped_column(
+        ForeignKey("family_members.id", ondelete="CASCADE")
+    )
+
+    event_type: Mapped[ExposureEventType] = mapped_column(Enum(ExposureEventType))
+    old_status: Mapped[ExposureStatus | None] = mapped_column(Enum(ExposureStatus), nullable=True)
+    new_status: Mapped[ExposureStatus | None] = mapped_column(Enum(ExposureStatus), nullable=True)
+
+    actor: Mapped[str] = mapped_column(String(50))  # "api", "scan", "retention", ...
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+# Default actor for sessions that don't set session.info["event_actor"]
+DEFAULT_EVENT_ACTOR = "api"
+
+
+@event.listens_for(Session, "after_flush")
+def record_exposure_events(session: Session, flush_context) -> None:
+    """
+    Write exposure events for every ORM flush that creates, changes or deletes exposures.
+
+    Registered on Session, so it covers API routes (AsyncSession flushes
+    through a Session too) and Celery tasks alike. Core-level bulk statements
+    bypass the ORM and write their own events (see app.tasks.retention).
+    """
+    now = datetime.utcnow()
+    actor = session.info.get("event_actor", DEFAULT_EVENT_ACTOR)
+    rows = []
+
+    for obj in session.new:
+        if isinstance(obj, Exposure):
+            rows.append({
+                "exposure_id": obj.id,
+                "family_member_id": obj.family_member_id,
+                "event_type": ExposureEventType.DETECTED,
+                "old_status": None,
+                "new_status": obj.status,
+            })
+
+    for obj in session.dirty:
+        if isinstance(obj, Exposure):
+            history = inspect(obj).attrs.status.history
+            if not history.added:
+                continue
+            old_status = history.deleted[0] if history.deleted else None
+            if old_status != obj.status:
+                rows.append({
+                    "exposure_id": obj.id,
+                    "family_member_id": obj.family_member_id,
+                    "event_type": ExposureEventType.STATUS_CHANGED,
+                    "old_status": old_status,
+                    "new_status": obj.status,
+                })
+
+    for obj in session.deleted:
+        if isinstance(obj, Exposure):
+            rows.append({
+                "exposure_id": obj.id,
+                "family_member_id": obj.family_member_id,
+                "event_type": ExposureEventType.DELETED,
+                "old_status": obj.status,
+                "new_status": None,
+            })
+
+    if rows:
+        for row in rows:
+            row.update(actor=actor, created_at=now)
+        session.connection().execute(insert(ExposureEvent), rows)
+        # Published to live subscribers once the transaction commits
+        session.info.setdefault("unpublished_exposure_events", []).extend(rows)
+
+
+@event.listens_for(Session, "after_commit")
+def publish_exposure_events(session: Session) -> None:
+    rows = session.info.pop("unpublished_exposure_events", None)
+    if rows:
+        from app.services.live_events import publish_exposure_events
+
+        # Inside an AsyncSession commit this only schedules the publish on the event loop
+        publish_exposure_events(rows)
+
+
+@event.listens_for(Session, "after_rollback")
+def discard_exposure_events(session: Session) -> None:
+    session.info.pop("unpublished_exposure_events", None)
@@ -0,0 +1,38 @@
+import enum
+from datetime import datetime
+
+from sqlalchemy import DateTime, Enum, ForeignKey, Index, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class IdentifierKind(enum.Enum):
+    EMAIL = "email"
+    PHONE = "phone"
+    ADDRESS = "address"
+
+
+class MemberIdentifier(Base):
+    """Normalized email/phone/address of a family member, for indexed lookups."""
+
+    __tablename__ = "member_identifiers"
+    __table_args__ = (
+        Index(
+            "uq_member_identifiers_kind_value_member",
+            "kind",
+            "value",
+            "family_member_id",
+            unique=True,
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    family_member_id: Mapped[int] = mapped_column(
+        ForeignKey("family_members.id", ondelete="CASCADE"), index=True
+    )
+
+    kind: Mapped[IdentifierKind] = mapped_column(Enum(IdentifierKind))
+    value: Mapped[str] = mapped_column(String(500))  # Normalized, see app.services.identifiers
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import String, DateTime, Enum, Integer
+from sqlalchemy import String, DateTime, Enum, Integer, JSON
 from sqlalchemy.orm import Mapped, mapped_column
 import enum
 
@@ -28,6 +28,11 @@ class Scan(Base):
 
     exposures_found: Mapped[int] = mapped_column(Integer, default=0)
     error_message: Mapped[str | None] = mapped_column(String(500), nullable=True)
+    # Per-task timing profile: {"breach": {"phases": {...}, "counts": {...}, ...}, ...}
+    timings: Mapped[dict | None] = mapped_column(JSON, nullable=True)
 
     started_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     completed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
@@ -1,13 +1,30 @@
-from app.schemas.family_member import FamilyMemberCreate, FamilyMemberUpdate, FamilyMemberResponse
-from app.schemas.exposure import ExposureResponse, ExposureUpdate
+from app.schemas.family_member import (
+    FamilyMemberCreate,
+    FamilyMemberUpdate,
+    FamilyMemberResponse,
+    FamilyMemberImportError,
+    FamilyMemberImportResult,
+    SharedIdentifier,
+)
+from app.schemas.exposure import (
+    ExposureResponse,
+    ExposureUpdate,
+    ExposureEventResponse,
+    ExportFormat,
+)
 from app.schemas.scan import ScanCreate, ScanResponse
 
 __all__ = [
     "FamilyMemberCreate",
     "FamilyMemberUpdate",
     "FamilyMemberResponse",
+    "FamilyMemberImportError",
+    "FamilyMemberImportResult",
+    "SharedIdentifier",
     "ExposureResponse",
     "ExposureUpdate",
+    "ExposureEventResponse",
+    "ExportFormat",
     "ScanCreate",
     "ScanResponse",
 ]
@@ -1,7 +1,9 @@
+import enum
 from datetime import datetime
 from pydantic import BaseModel
 
-from app.models.exposure import ExposureStatus, ExposureSource
+from app.models.exposure import ExposureStatus, ExposureSource, ListingVerification
+from app.models.exposure_event import ExposureEventType
 
 
 class ExposureResponse(BaseModel):
@@ -13,8 +15,11 @@ class ExposureResponse(BaseModel):
     data_exposed: str | None
     status: ExposureStatus
     incogni_request_id: str | None
+    verification: ListingVerification | None = None  # People-search results, once checked
+    verified_at: datetime | None = None
     detected_at: datetime
     updated_at: datetime
+    archived_at: datetime | None = None  # Set for rows read from the archive
 
     class Config:
         from_attributes = True
@@ -24,3 +29,22 @@ class ExposureUpdate(BaseModel):
     status: ExposureStatus | None = None
     data_exposed: str | None = None
     incogni_request_id: str | None = None
+
+
+class ExposureEventResponse(BaseModel):
+    id: int
+    exposure_id: int
+    family_member_id: int
+    event_type: ExposureEventType
+    old_status: ExposureStatus | None
+    new_status: ExposureStatus | None
+    actor: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class ExportFormat(str, enum.Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
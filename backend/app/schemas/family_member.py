@@ -1,6 +1,8 @@
 from datetime import datetime
 from pydantic import BaseModel, EmailStr, field_validator
 
+from app.models.member_identifier import IdentifierKind
+
 
 class FamilyMemberBase(BaseModel):
     first_name: str
@@ -90,3 +92,21 @@ class FamilyMemberResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class FamilyMemberImportError(BaseModel):
+    row: int
+    errors: list[str]
+
+
+class FamilyMemberImportResult(BaseModel):
+    imported: int
+    failed: int
+    errors: list[FamilyMemberImportError] = []
+    scan_id: int | None = None  # Set when a scan was queued for the imported members
+
+
+class SharedIdentifier(BaseModel):
+    kind: IdentifierKind
+    value: str  # Normalized value
+    member_ids: list[int]
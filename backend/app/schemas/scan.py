@@ -7,6 +7,7 @@ from app.models.scan import ScanStatus, ScanType
 class ScanCreate(BaseModel):
     scan_type: ScanType = ScanType.FULL
     family_member_ids: list[int] | None = None  # None = scan all
+    profile: bool = False  # Save a cProfile profile of the scan task(s)
 
 
 class ScanResponse(BaseModel):
@@ -15,8 +16,13 @@ class ScanResponse(BaseModel):
     status: ScanStatus
     exposures_found: int
     error_message: str | None
+    # Per task ("breach", "data_broker"): queue wait, seconds per phase
+    # (load_members, hibp, dedup, insert, notify) and counts (API calls,
+    # cache hits, DB statements)
+    timings: dict | None = None
     started_at: datetime
     completed_at: datetime | None
+    archived_at: datetime | None = None  # Set for rows read from the archive
 
     class Config:
         from_attributes = True
@@ -0,0 +1,260 @@
+"""Automatic check of people-search results.
+
+The data broker scan records one search URL per site and member. This
+module fetches those pages and decides whether the member is listed:
+
+- confirmed: the page shows the member's name
+- absent: the site answers "no results" (or 404)
+- unknown: anything we can't read: robots.txt disallows the page, the site
+  blocks us (403, 429, captcha) or the page matches neither
+
+The crawler is polite: requests to one site are limited to
+BROKER_CRAWL_PER_DOMAIN at a time and spaced BROKER_CRAWL_DELAY_SECONDS
+apart (or the robots.txt Crawl-delay, if longer), robots.txt is honoured,
+all sites share one connection pool, and a page fetched once is reused
+for BROKER_CRAWL_CACHE_SECONDS.
+"""
+
+import asyncio
+import html
+import logging
+import re
+import time
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+
+import httpx
+
+from app.core.config import settings
+from app.core.tracing import tracer
+from app.models.exposure import ListingVerification
+
+logger = logging.getLogger(__name__)
+
+BROKER_USER_AGENT = "Fibertap-Privacy-Monitor"
+
+# Pages bigger than this are cut off before matching
+MAX_PAGE_BYTES = 1_000_000
+
+# Phrases of "nothing found" pages, lowercase
+ABSENT_MARKERS = (
+    "no results found",
+    "no records found",
+    "found 0 results",
+    "no matches found",
+    "we couldn't find",
+    "we could not find",
+    "did not match any",
+    "no people found",
+)
+
+# Phrases of bot checks and block pages, lowercase
+BLOCKED_MARKERS = (
+    "captcha",
+    "are you a robot",
+    "are you human",
+    "verify you are human",
+    "access denied",
+    "unusual traffic",
+)
+
+_TAG = re.compile(r"<(script|style)\b.*?</\1>|<[^>]+>", re.DOTALL | re.IGNORECASE)
+_SPACE = re.compile(r"\s+")
+
+
+@dataclass
+class Page:
+    status: int | None  # None: not fetched (robots.txt, network error)
+    text: str = ""
+    error: str | None = None
+
+
+@dataclass
+class ListingCandidate:
+    exposure_id: int
+    url: str
+    first_name: str
+    last_name: str
+
+
+def page_text(markup: str) -> str:
+    """Visible text of an HTML page, lowercase, whitespace collapsed."""
+    return _SPACE.sub(" ", html.unescape(_TAG.sub(" ", markup))).strip().lower()
+
+
+def classify(page: Page, first_name: str, last_name: str) -> ListingVerification:
+    """Decide from a fetched search page whether it lists the person."""
+    if page.status in (404, 410):
+        return ListingVerification.ABSENT
+    if page.status != 200:
+        return ListingVerification.UNKNOWN
+
+    text = page_text(page.text)
+    if any(marker in text for marker in BLOCKED_MARKERS):
+        return ListingVerification.UNKNOWN
+    if any(marker in text for marker in ABSENT_MARKERS):
+        return ListingVerification.ABSENT
+    if f"{first_name} {last_name}".lower() in text:
+        return ListingVerification.CONFIRMED
+    return ListingVerification.UNKNOWN
+
+
+@dataclass
+class _Site:
+    """Per-host politeness state."""
+    semaphore: asyncio.Semaphore
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    next_request_at: float = 0.0  # time.monotonic()
+    robots: RobotFileParser | None = None
+    robots_loaded: bool = False
+
+
+class BrokerCrawler:
+    """
+    Fetches search pages politely; share one instance across a whole run.
+
+    Use as ``async with BrokerCrawler() as crawler``. Pass a client to reuse
+    an existing connection pool (it is then not closed by the crawler).
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient | None = None,
+        per_domain: int | None = None,
+        delay: float | None = None,
+        cache_seconds: float | None = None,
+    ):
+        self.per_domain = per_domain or settings.broker_crawl_per_domain
+        self.delay = settings.broker_crawl_delay_seconds if delay is None else delay
+        self.cache_seconds = (
+            settings.broker_crawl_cache_seconds if cache_seconds is None else cache_seconds
+        )
+        self._own_client = client is None
+        self._client = client or httpx.AsyncClient(
+            timeout=settings.broker_crawl_timeout,
+            follow_redirects=True,
+            headers={"user-agent": BROKER_USER_AGENT},
+            limits=httpx.Limits(max_connections=settings.broker_crawl_max_connections),
+        )
+        self._sites: dict[str, _Site] = {}
+        # url -> (time.monotonic() it expires, page)
+        self._cache: dict[str, tuple[float, Page]] = {}
+        # url -> fetch in progress, so concurrent callers share it
+        self._pending: dict[str, asyncio.Task] = {}
+        self.requests = 0
+
+    async def __aenter__(self) -> "BrokerCrawler":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        if self._own_client:
+            await self._client.aclose()
+
+    def _site(self, host: str) -> _Site:
+        if host not in self._sites:
+            self._sites[host] = _Site(asyncio.Semaphore(self.per_domain))
+        return self._sites[host]
+
+    async def _load_robots(self, origin: str, site: _Site) -> None:
+        """Read robots.txt once per host (RFC 9309: 4xx allows all, 5xx or none disallows all)."""
+        async with site.lock:
+            if site.robots_loaded:
+                return
+            robots = RobotFileParser()
+            try:
+                response = await self._client.get(f"{origin}/robots.txt")
+                self.requests += 1
+                if response.status_code >= 500:
+                    robots.disallow_all = True
+                elif response.status_code < 400:
+                    robots.parse(response.text.splitlines())
+                else:
+                    robots.allow_all = True
+            except httpx.HTTPError as e:
+                logger.info("robots.txt of %s unreachable, skipping the site: %s", origin, e)
+                robots.disallow_all = True
+            site.robots = robots
+            site.robots_loaded = True
+
+    async def _wait_turn(self, site: _Site) -> None:
+        """Space requests to one host by the crawl delay."""
+        delay = max(self.delay, float(site.robots.crawl_delay(BROKER_USER_AGENT) or 0))
+        async with site.lock:
+            wait = site.next_request_at - time.monotonic()
+            site.next_request_at = max(site.next_request_at, time.monotonic()) + delay
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    async def _fetch(self, url: str) -> Page:
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        site = self._site(parts.netloc)
+        await self._load_robots(origin, site)
+        if not site.robots.can_fetch(BROKER_USER_AGENT, url):
+            return Page(None, error="Disallowed by robots.txt")
+
+        async with site.semaphore:
+            await self._wait_turn(site)
+            with tracer.start_as_current_span(
+                "broker.fetch", attributes={"server.address": parts.netloc}
+            ) as span:
+                try:
+                    response = await self._client.get(url)
+                except httpx.HTTPError as e:
+                    return Page(None, error=str(e) or type(e).__name__)
+                finally:
+                    self.requests += 1
+                span.set_attribute("http.response.status_code", response.status_code)
+        return Page(response.status_code, response.text[:MAX_PAGE_BYTES])
+
+    async def fetch(self, url: str) -> Page:
+        """The page at url, from the cache when fetched recently."""
+        cached = self._cache.get(url)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        if url not in self._pending:
+            self._pending[url] = asyncio.ensure_future(self._fetch(url))
+        try:
+            page = await self._pending[url]
+        finally:
+            self._pending.pop(url, None)
+        if page.status is not None:
+            self._cache[url] = (time.monotonic() + self.cache_seconds, page)
+        return page
+
+
+async def iter_listings(
+    candidates: list[ListingCandidate],
+    crawler: BrokerCrawler,
+) -> AsyncIterator[tuple[int, ListingVerification]]:
+    """Fetch and classify every candidate's search page; yields (exposure_id, verdict) when done."""
+
+    async def check(candidate: ListingCandidate) -> tuple[int, ListingVerification]:
+        page = await crawler.fetch(candidate.url)
+        if page.error:
+            logger.info("Could not check %s: %s", candidate.url, page.error)
+        return candidate.exposure_id, classify(page, candidate.first_name, candidate.last_name)
+
+    # Sites are throttled by the crawler, so every candidate can be in flight
+    checks = [asyncio.ensure_future(check(candidate)) for candidate in candidates]
+    try:
+        for done in asyncio.as_completed(checks):
+            yield await done
+    finally:
+        for task in checks:
+            task.cancel()
+
+
+async def check_listings(
+    candidates: list[ListingCandidate],
+    crawler: BrokerCrawler | None = None,
+) -> dict[int, ListingVerification]:
+    """Fetch and classify every candidate's search page; returns exposure_id -> verdict."""
+    if crawler is None:
+        async with BrokerCrawler() as own_crawler:
+            return await check_listings(candidates, own_crawler)
+    return {
+        exposure_id: verdict async for exposure_id, verdict in iter_listings(candidates, crawler)
+    }
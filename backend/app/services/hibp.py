@@ -4,9 +4,10 @@ import httpx
 from typing import Any
 
 from app.core.config import settings
+from app.core.metrics import HIBP_REQUEST_SECONDS, timed
+from app.core.tracing import tracer
 
 
-HIBP_API_BASE = "https://haveibeenpwned.com/api/v3"
 HIBP_USER_AGENT = "Fibertap-Privacy-Monitor"
 
 
@@ -42,35 +43,43 @@ async def check_email_breaches(email: str) -> list[dict[str, Any]]:
     if not settings.hibp_api_key:
         raise HIBPError("HIBP API key not configured. Set HIBP_API_KEY environment variable.")
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"{HIBP_API_BASE}/breachedaccount/{email}",
-            params={"truncateResponse": "false"},
-            headers={
-                "hibp-api-key": settings.hibp_api_key,
-                "user-agent": HIBP_USER_AGENT,
-            },
-            timeout=30.0,
-        )
-
-        if response.status_code == 200:
-            return response.json()
-        elif response.status_code == 404:
-            # No breaches found - this is good!
-            return []
-        elif response.status_code == 401:
-            raise HIBPUnauthorized("Invalid HIBP API key")
-        elif response.status_code == 429:
-            raise HIBPRateLimited("HIBP rate limit exceeded. Wait before retrying.")
-        else:
-            raise HIBPError(f"HIBP API error: {response.status_code} - {response.text}")
+    with (
+        tracer.start_as_current_span("hibp.breachedaccount") as span,
+        timed(HIBP_REQUEST_SECONDS, outcome="error") as labels,
+    ):
+        async with httpx.AsyncClient() as client:
+            response = await client.get(
+                f"{settings.hibp_api_url}/breachedaccount/{email}",
+                params={"truncateResponse": "false"},
+                headers={
+                    "hibp-api-key": settings.hibp_api_key,
+                    "user-agent": HIBP_USER_AGENT,
+                },
+                timeout=30.0,
+            )
+        span.set_attribute("http.response.status_code", response.status_code)
+        labels["outcome"] = {
+            200: "ok", 404: "not_found", 401: "unauthorized", 429: "rate_limited",
+        }.get(response.status_code, "error")
+
+    if response.status_code == 200:
+        return response.json()
+    elif response.status_code == 404:
+        # No breaches found - this is good!
+        return []
+    elif response.status_code == 401:
+        raise HIBPUnauthorized("Invalid HIBP API key")
+    elif response.status_code == 429:
+        raise HIBPRateLimited("HIBP rate limit exceeded. Wait before retrying.")
+    else:
+        raise HIBPError(f"HIBP API error: {response.status_code} - {response.text}")
 
 
 async def get_breach_info(breach_name: str) -> dict[str, Any] | None:
     """Get detailed information about a specific breach."""
     async with httpx.AsyncClient() as client:
         response = await client.get(
-            f"{HIBP_API_BASE}/breach/{breach_name}",
+            f"{settings.hibp_api_url}/breach/{breach_name}",
             headers={"user-agent": HIBP_USER_AGENT},
             timeout=30.0,
         )
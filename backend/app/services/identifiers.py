@@ -0,0 +1,163 @@
+"""Normalized member identifiers (emails, phones, addresses) for indexed lookups.
+
+The normalization rules here must stay in sync with the SQL backfill in
+migration 006.
+"""
+
+import re
+from collections import defaultdict
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.member_identifier import IdentifierKind, MemberIdentifier
+
+_NON_DIGITS = re.compile(r"[^0-9]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_identifier(kind: IdentifierKind, value: str | None) -> str | None:
+    """
+    Normalize a raw identifier value for storage and lookup.
+
+    - email: trimmed and lowercased
+    - phone: digits only
+    - address: trimmed, whitespace collapsed, lowercased
+
+    Returns None if nothing is left after normalization.
+    """
+    if not value:
+        return None
+
+    if kind == IdentifierKind.EMAIL:
+        normalized = value.strip().lower()
+    elif kind == IdentifierKind.PHONE:
+        normalized = _NON_DIGITS.sub("", value)
+    else:
+        normalized = _WHITESPACE.sub(" ", value.strip()).lower()
+
+    return normalized or None
+
+
+def identifiers_from_fields(
+    emails: list[str] | None = None,
+    phone_numbers: list[str] | None = None,
+    addresses: list[str] | None = None,
+    email: str | None = None,
+    phone: str | None = None,
+    address: str | None = None,
+) -> list[tuple[IdentifierKind, str]]:
+    """
+    Collect normalized (kind, value) pairs from list fields plus legacy single fields.
+
+    Duplicates are dropped; the order of the original fields is kept.
+    """
+    raw = (
+        [(IdentifierKind.EMAIL, v) for v in [*(emails or []), email]]
+        + [(IdentifierKind.PHONE, v) for v in [*(phone_numbers or []), phone]]
+        + [(IdentifierKind.ADDRESS, v) for v in [*(addresses or []), address]]
+    )
+    pairs: dict[tuple[IdentifierKind, str], None] = {}
+    for kind, value in raw:
+        normalized = normalize_identifier(kind, value)
+        if normalized:
+            pairs[(kind, normalized)] = None
+    return list(pairs)
+
+
+def member_identifiers(member) -> list[tuple[IdentifierKind, str]]:
+    """Normalized identifiers for a FamilyMember (or anything with the same fields)."""
+    return identifiers_from_fields(
+        emails=member.emails,
+        phone_numbers=member.phone_numbers,
+        addresses=member.addresses,
+        email=getattr(member, "email", None),
+        phone=getattr(member, "phone", None),
+        address=getattr(member, "address", None),
+    )
+
+
+def _identifier_rows(members: dict[int, list[tuple[IdentifierKind, str]]]) -> list[dict]:
+    return [
+        {"family_member_id": member_id, "kind": kind, "value": value}
+        for member_id, pairs in members.items()
+        for kind, value in pairs
+    ]
+
+
+async def replace_member_identifiers(
+    db: AsyncSession,
+    members: dict[int, list[tuple[IdentifierKind, str]]],
+    *,
+    existing: bool = True,
+) -> None:
+    """
+    Replace the identifier rows of the given members (does not commit).
+
+    Args:
+        db: Database session
+        members: member_id -> normalized (kind, value) pairs
+        existing: Set False for freshly inserted members to skip the DELETE
+    """
+    if not members:
+        return
+    if existing:
+        await db.execute(
+            delete(MemberIdentifier).where(MemberIdentifier.family_member_id.in_(members))
+        )
+    rows = _identifier_rows(members)
+    if rows:
+        await db.execute(insert(MemberIdentifier), rows)
+
+
+async def find_member_ids(
+    db: AsyncSession,
+    kind: IdentifierKind,
+    value: str,
+) -> list[int]:
+    """Return ids of members owning an identifier (index lookup, no JSON parsing)."""
+    normalized = normalize_identifier(kind, value)
+    if not normalized:
+        return []
+    result = await db.execute(
+        select(MemberIdentifier.family_member_id)
+        .where(MemberIdentifier.kind == kind, MemberIdentifier.value == normalized)
+        .order_by(MemberIdentifier.family_member_id)
+    )
+    return list(result.scalars().all())
+
+
+async def find_shared_identifiers(db: AsyncSession) -> list[dict]:
+    """Return identifiers that belong to more than one member (likely duplicates)."""
+    member_ids = func.array_agg(MemberIdentifier.family_member_id.distinct())
+    result = await db.execute(
+        select(MemberIdentifier.kind, MemberIdentifier.value, member_ids)
+        .group_by(MemberIdentifier.kind, MemberIdentifier.value)
+        .having(func.count(MemberIdentifier.family_member_id.distinct()) > 1)
+        .order_by(MemberIdentifier.kind, MemberIdentifier.value)
+    )
+    return [
+        {"kind": kind, "value": value, "member_ids": sorted(ids)}
+        for kind, value, ids in result.all()
+    ]
+
+
+def load_identifier_values(
+    db: Session,
+    kind: IdentifierKind,
+    member_ids: list[int],
+) -> dict[int, list[str]]:
+    """Load one kind of identifier for several members in a single query (sync)."""
+    result = db.execute(
+        select(MemberIdentifier.family_member_id, MemberIdentifier.value)
+        .where(
+            MemberIdentifier.kind == kind,
+            MemberIdentifier.family_member_id.in_(member_ids),
+        )
+        .order_by(MemberIdentifier.family_member_id, MemberIdentifier.id)
+    )
+    values: dict[int, list[str]] = defaultdict(list)
+    for member_id, value in result.all():
+        values[member_id].append(value)
+    return values
@@ -0,0 +1,231 @@
+"""Live scan progress and exposure changes over Redis pub/sub.
+
+Celery tasks and API processes publish small JSON events; the SSE endpoints
+subscribe and forward them to dashboards. Publishing is best effort: a Redis
+outage never fails a scan or a request, clients just fall back to polling.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+EXPOSURES_CHANNEL = "fibertap:events:exposures"
+
+# Event type that ends a scan task's stream
+SCAN_FINISHED = "finished"
+
+# After a failed publish, skip publishing for this long instead of
+# paying a connect timeout on every event while Redis is down
+PUBLISH_BACKOFF_SECONDS = 5.0
+
+_redis: redis.Redis | None = None
+# (event loop it belongs to, client)
+_aredis: tuple[asyncio.AbstractEventLoop, aioredis.Redis] | None = None
+_publish_failed_at: float | None = None
+# Publishes scheduled on the event loop and not done yet (the loop only keeps weak references)
+_pending: set[asyncio.Task] = set()
+
+
+def scan_channel(scan_id: int) -> str:
+    return f"fibertap:events:scan:{scan_id}"
+
+
+def _sync_redis() -> redis.Redis:
+    global _redis
+    if _redis is None:
+        _redis = redis.Redis.from_url(
+            settings.redis_url, socket_timeout=0.5, socket_connect_timeout=0.5
+        )
+    return _redis
+
+
+def _async_redis() -> aioredis.Redis:
+    global _aredis
+    loop = asyncio.get_running_loop()
+    if _aredis is None or _aredis[0] is not loop:
+        _aredis = (loop, aioredis.Redis.from_url(
+            settings.redis_url, socket_timeout=0.5, socket_connect_timeout=0.5
+        ))
+    return _aredis[1]
+
+
+def _backing_off() -> bool:
+    return bool(
+        _publish_failed_at and time.monotonic() - _publish_failed_at < PUBLISH_BACKOFF_SECONDS
+    )
+
+
+def _published(error: redis.RedisError | None) -> None:
+    global _publish_failed_at
+    if error is None:
+        _publish_failed_at = None
+    else:
+        _publish_failed_at = time.monotonic()
+        logger.warning("Could not publish live events: %s", error)
+
+
+def publish_many(messages: list[tuple[str, dict[str, Any]]]) -> None:
+    """Publish (channel, event) pairs in one round-trip; errors are logged and swallowed."""
+    if not messages or _backing_off():
+        return
+    try:
+        pipe = _sync_redis().pipeline(transaction=False)
+        for channel, event in messages:
+            pipe.publish(channel, json.dumps(event, default=str))
+        pipe.execute()
+        _published(None)
+    except redis.RedisError as e:
+        _published(e)
+
+
+async def apublish_many(messages: list[tuple[str, dict[str, Any]]]) -> None:
+    """Async publish_many, for code running on the event loop."""
+    if not messages or _backing_off():
+        return
+    try:
+        async with _async_redis().pipeline(transaction=False) as pipe:
+            for channel, event in messages:
+                pipe.publish(channel, json.dumps(event, default=str))
+            await pipe.execute()
+        _published(None)
+    except redis.RedisError as e:
+        _published(e)
+
+
+def publish_many_soon(messages: list[tuple[str, dict[str, Any]]]) -> None:
+    """
+    Publish without blocking the caller's event loop.
+
+    On a running event loop (API routes, including sync code an AsyncSession
+    runs) the publish becomes a task on that loop; elsewhere (Celery tasks)
+    it happens right away.
+    """
+    if not messages:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        publish_many(messages)
+        return
+    task = loop.create_task(apublish_many(messages))
+    _pending.add(task)
+    task.add_done_callback(_pending.discard)
+
+
+def publish(channel: str, event: dict[str, Any]) -> None:
+    """Publish one event (sync, best effort)."""
+    publish_many([(channel, event)])
+
+
+async def _messages(pubsub) -> AsyncIterator[dict[str, Any] | None]:
+    while True:
+        message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+        if message is None:
+            yield None
+            continue
+        try:
+            yield json.loads(message["data"])
+        except (TypeError, ValueError):
+            continue
+
+
+@asynccontextmanager
+async def subscription(*channels: str) -> AsyncIterator[AsyncIterator[dict[str, Any] | None]]:
+    """
+    Subscribe to channels for the duration of the block.
+
+    The subscription is active on entry, so state read inside the block can't
+    miss events published meanwhile. The iterator yields None about once a
+    second when nothing arrived, so callers can check for disconnects and
+    send keep-alives.
+    """
+    # Own client per subscriber: pub/sub holds a dedicated connection anyway,
+    # and this keeps the client on the event loop that uses it
+    client = aioredis.Redis.from_url(settings.redis_url)
+    pubsub = client.pubsub()
+    try:
+        await pubsub.subscribe(*channels)
+        yield _messages(pubsub)
+    finally:
+        await pubsub.aclose()
+        await client.aclose()
+
+
+def publish_exposure_events(rows: list[dict[str, Any]]) -> None:
+    """Fan committed exposure events out to the global exposure stream (see publish_many_soon)."""
+    publish_many_soon([
+        (EXPOSURES_CHANNEL, {
+            "exposure_id": row["exposure_id"],
+            "family_member_id": row["family_member_id"],
+            "event_type": row["event_type"].value,
+            "old_status": row["old_status"].value if row["old_status"] else None,
+            "new_status": row["new_status"].value if row["new_status"] else None,
+            "actor": row["actor"],
+            "created_at": row["created_at"].isoformat(),
+        })
+        for row in rows
+    ])
+
+
+class ScanProgress:
+    """
+    Publishes progress of one scan task.
+
+    A FULL scan runs a breach and a data broker task under the same scan id;
+    each publishes its own events, tagged with the task name.
+    """
+
+    def __init__(self, scan_id: int | None, task: str):
+        self.scan_id = scan_id
+        self.task = task
+        self.total_members = 0
+        self.members_done = 0
+        self.emails_checked = 0
+        self.new_exposures = 0
+        self.errors = 0
+
+    def _publish(self, event_type: str, **data: Any) -> None:
+        if self.scan_id is None:
+            return
+        publish(scan_channel(self.scan_id), {
+            "type": event_type,
+            "scan_id": self.scan_id,
+            "task": self.task,
+            "members_done": self.members_done,
+            "total_members": self.total_members,
+            "emails_checked": self.emails_checked,
+            "new_exposures": self.new_exposures,
+            "errors": self.errors,
+            "at": datetime.utcnow().isoformat(),
+            **data,
+        })
+
+    def started(self, total_members: int) -> None:
+        self.total_members = total_members
+        self._publish("started")
+
+    def member_done(self, new_exposures: int = 0, emails_checked: int = 0) -> None:
+        self.members_done += 1
+        self.new_exposures += new_exposures
+        self.emails_checked += emails_checked
+        self._publish("progress")
+
+    def error(self, message: str) -> None:
+        self.errors += 1
+        self._publish("error", message=message)
+
+    def finished(self, status: str) -> None:
+        self._publish(SCAN_FINISHED, status=status)
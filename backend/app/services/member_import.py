@@ -0,0 +1,126 @@
+"""Parsing and validation for bulk family member imports (CSV / NDJSON)."""
+
+import csv
+import io
+import json
+from collections.abc import Iterator
+from typing import IO, Any
+
+from pydantic import ValidationError
+
+from app.schemas.family_member import FamilyMemberCreate
+
+# Rows validated and inserted per batch
+IMPORT_CHUNK_SIZE = 500
+
+# CSV columns holding several values, separated by ";" or "|"
+MULTI_VALUE_FIELDS = ("emails", "phone_numbers", "addresses")
+
+# Single-value CSV column names accepted as aliases for the list fields
+LEGACY_ALIASES = {"email": "emails", "phone": "phone_numbers", "address": "addresses"}
+
+
+class ImportFormatError(Exception):
+    """Upload could not be parsed as CSV or NDJSON."""
+    pass
+
+
+def _split_multi(value: str) -> list[str]:
+    """Split a multi-value CSV cell on ';' or '|'."""
+    return [part.strip() for part in value.replace("|", ";").split(";") if part.strip()]
+
+
+def _normalize_csv_row(row: dict[str, str | None]) -> dict[str, Any]:
+    """Turn a raw CSV row into the shape FamilyMemberCreate expects."""
+    data: dict[str, Any] = {}
+    for column, value in row.items():
+        if column is None:
+            continue  # Extra cells beyond the header
+        key = column.strip().lower()
+        key = LEGACY_ALIASES.get(key, key)
+        value = (value or "").strip()
+
+        if key in MULTI_VALUE_FIELDS:
+            data.setdefault(key, []).extend(_split_multi(value))
+        elif value:
+            data[key] = value
+    return data
+
+
+def iter_csv_rows(stream: IO[bytes]) -> Iterator[tuple[int, dict[str, Any] | None, str | None]]:
+    """
+    Yield (row_number, data, parse_error) for each CSV data row.
+
+    Row numbers are 1-based and count the header as row 1, matching what a
+    spreadsheet shows.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    reader = csv.DictReader(text)
+    if not reader.fieldnames:
+        raise ImportFormatError("CSV upload has no header row")
+
+    try:
+        for row in reader:
+            yield reader.line_num, _normalize_csv_row(row), None
+    except (csv.Error, UnicodeDecodeError) as e:
+        raise ImportFormatError(f"Invalid CSV: {e}")
+
+
+def iter_ndjson_rows(stream: IO[bytes]) -> Iterator[tuple[int, dict[str, Any] | None, str | None]]:
+    """Yield (line_number, data, parse_error) for each non-blank NDJSON line."""
+    for line_number, raw in enumerate(stream, start=1):
+        try:
+            line = raw.decode("utf-8-sig").strip()
+        except UnicodeDecodeError:
+            yield line_number, None, "Line is not valid UTF-8"
+            continue
+        if not line:
+            continue
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, None, f"Invalid JSON: {e.msg}"
+            continue
+        if not isinstance(data, dict):
+            yield line_number, None, "Expected a JSON object"
+            continue
+        yield line_number, data, None
+
+
+def validate_chunks(
+    rows: Iterator[tuple[int, dict[str, Any] | None, str | None]],
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+) -> Iterator[tuple[list[FamilyMemberCreate], list[dict[str, Any]]]]:
+    """
+    Validate parsed rows with FamilyMemberCreate, batching the results.
+
+    Yields:
+        (valid_members, errors) per chunk, where each error is
+        ``{"row": int, "errors": [str, ...]}``
+    """
+    valid: list[FamilyMemberCreate] = []
+    errors: list[dict[str, Any]] = []
+    seen = 0
+
+    for row_number, data, parse_error in rows:
+        seen += 1
+        if parse_error:
+            errors.append({"row": row_number, "errors": [parse_error]})
+        else:
+            try:
+                valid.append(FamilyMemberCreate.model_validate(data))
+            except ValidationError as e:
+                errors.append({
+                    "row": row_number,
+                    "errors": [
+                        f"{'.'.join(str(part) for part in err['loc']) or 'row'}: {err['msg']}"
+                        for err in e.errors()
+                    ],
+                })
+
+        if seen >= chunk_size:
+            yield valid, errors
+            valid, errors, seen = [], [], 0
+
+    if seen:
+        yield valid, errors
@@ -1,5 +1,6 @@
 """Microsoft OAuth service for Outlook email integration."""
 
+import asyncio
 import httpx
 from datetime import datetime, timedelta
 from urllib.parse import urlencode
@@ -17,7 +18,19 @@ class MicrosoftOAuthError(Exception):
 AUTHORITY = "https://login.microsoftonline.com/common"
 AUTHORIZE_URL = f"{AUTHORITY}/oauth2/v2.0/authorize"
 TOKEN_URL = f"{AUTHORITY}/oauth2/v2.0/token"
-GRAPH_API_URL = "https://graph.microsoft.com/v1.0"
+
+# Seconds before a Graph request is abandoned
+GRAPH_TIMEOUT = 30.0
+
+# Graph accepts at most 20 requests per $batch call
+GRAPH_BATCH_LIMIT = 20
+
+# Times throttled (429) batch items are retried before giving up
+GRAPH_BATCH_RETRIES = 3
+
+# Bounds on how long to wait when Graph asks us to back off
+DEFAULT_RETRY_AFTER = 5.0
+MAX_RETRY_AFTER = 60.0
 
 # Scopes needed for sending email
 SCOPES = [
@@ -133,7 +146,7 @@ async def get_user_profile(access_token: str) -> dict[str, Any]:
     """
     async with httpx.AsyncClient() as client:
         response = await client.get(
-            f"{GRAPH_API_URL}/me",
+            f"{settings.microsoft_graph_url}/me",
             headers={"Authorization": f"Bearer {access_token}"},
         )
 
@@ -149,6 +162,7 @@ async def send_email(
     subject: str,
     body_text: str,
     body_html: str | None = None,
+    client: httpx.AsyncClient | None = None,
 ) -> bool:
     """
     Send an email via Microsoft Graph API.
@@ -159,12 +173,49 @@ async def send_email(
         subject: Email subject
         body_text: Plain text body
         body_html: Optional HTML body
+        client: Optional shared client, so several sends reuse one connection
 
     Returns:
         True if sent successfully
     """
-    # Build email message
-    message = {
+    if client is None:
+        async with httpx.AsyncClient(timeout=GRAPH_TIMEOUT) as own_client:
+            return await send_email(
+                access_token, to_email, subject, body_text, body_html, client=own_client
+            )
+
+    message = _mail_payload(to_email, subject, body_text, body_html)
+
+    response = await client.post(
+        f"{settings.microsoft_graph_url}/me/sendMail",
+        headers={
+            "Authorization": f"Bearer {access_token}",
+            "Content-Type": "application/json",
+        },
+        json=message,
+    )
+
+    if response.status_code == 202:
+        return True
+
+    error_msg = response.text
+    try:
+        error_data = response.json()
+        error_msg = error_data.get("error", {}).get("message", error_msg)
+    except Exception:
+        pass
+
+    raise MicrosoftOAuthError(f"Failed to send email: {error_msg}")
+
+
+def _mail_payload(
+    to_email: str,
+    subject: str,
+    body_text: str,
+    body_html: str | None = None,
+) -> dict[str, Any]:
+    """Build the sendMail request body."""
+    return {
         "message": {
             "subject": subject,
             "body": {
@@ -182,27 +233,118 @@ async def send_email(
         "saveToSentItems": "true",
     }
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"{GRAPH_API_URL}/me/sendMail",
-            headers={
-                "Authorization": f"Bearer {access_token}",
-                "Content-Type": "application/json",
-            },
-            json=message,
-        )
 
-        if response.status_code == 202:
-            return True
+def _retry_after(headers: dict[str, str] | httpx.Headers | None) -> float:
+    """Seconds to wait from a Retry-After header, bounded to MAX_RETRY_AFTER."""
+    value = None
+    if headers:
+        value = next((v for k, v in headers.items() if k.lower() == "retry-after"), None)
+    try:
+        delay = float(value) if value is not None else DEFAULT_RETRY_AFTER
+    except ValueError:
+        delay = DEFAULT_RETRY_AFTER
+    return max(0.0, min(delay, MAX_RETRY_AFTER))
 
-        error_msg = response.text
-        try:
-            error_data = response.json()
-            error_msg = error_data.get("error", {}).get("message", error_msg)
-        except Exception:
-            pass
 
-        raise MicrosoftOAuthError(f"Failed to send email: {error_msg}")
+def _graph_error(body: Any, status: int | None) -> str:
+    """Extract Graph's error message from a response body."""
+    if isinstance(body, dict):
+        message = body.get("error", {}).get("message")
+        if message:
+            return message
+    return f"Graph returned {status}"
+
+
+async def send_email_batch(
+    access_token: str,
+    messages: list[dict[str, Any]],
+    client: httpx.AsyncClient | None = None,
+) -> list[str | None]:
+    """
+    Send several emails via Graph JSON batching ($batch).
+
+    Messages are grouped GRAPH_BATCH_LIMIT at a time into one HTTP request
+    each. Items Graph throttles (429) are resent after the largest
+    Retry-After in the batch, up to GRAPH_BATCH_RETRIES times.
+
+    Args:
+        access_token: Valid access token with Mail.Send scope
+        messages: Dicts with to_email, subject, body_text and optional body_html
+        client: Optional shared client
+
+    Returns:
+        One entry per message, in order: None if sent, else the error message
+
+    Raises:
+        MicrosoftOAuthError: If a whole batch request is rejected (e.g. 401)
+    """
+    if client is None:
+        async with httpx.AsyncClient(timeout=GRAPH_TIMEOUT) as own_client:
+            return await send_email_batch(access_token, messages, client=own_client)
+
+    results: list[str | None] = [None] * len(messages)
+    headers = {
+        "Authorization": f"Bearer {access_token}",
+        "Content-Type": "application/json",
+    }
+
+    for start in range(0, len(messages), GRAPH_BATCH_LIMIT):
+        pending = list(range(start, min(start + GRAPH_BATCH_LIMIT, len(messages))))
+
+        for attempt in range(GRAPH_BATCH_RETRIES + 1):
+            payload = {
+                "requests": [
+                    {
+                        "id": str(i),
+                        "method": "POST",
+                        "url": "/me/sendMail",
+                        "headers": {"Content-Type": "application/json"},
+                        "body": _mail_payload(**messages[i]),
+                    }
+                    for i in pending
+                ]
+            }
+            response = await client.post(
+                f"{settings.microsoft_graph_url}/$batch", headers=headers, json=payload
+            )
+
+            throttled: list[int] = []
+            delay = 0.0
+
+            if response.status_code == 429:
+                # The batch request itself was throttled
+                throttled = pending
+                delay = _retry_after(response.headers)
+            elif response.status_code != 200:
+                try:
+                    error = _graph_error(response.json(), response.status_code)
+                except Exception:
+                    error = response.text or f"Graph returned {response.status_code}"
+                raise MicrosoftOAuthError(f"Failed to send email batch: {error}")
+            else:
+                for i in pending:
+                    results[i] = "Missing from Graph batch response"
+                for item in response.json().get("responses", []):
+                    i = int(item["id"])
+                    status = item.get("status")
+                    if status == 202:
+                        results[i] = None
+                    elif status == 429:
+                        throttled.append(i)
+                        delay = max(delay, _retry_after(item.get("headers")))
+                    else:
+                        results[i] = _graph_error(item.get("body"), status)
+
+            if not throttled:
+                break
+            if attempt == GRAPH_BATCH_RETRIES:
+                for i in throttled:
+                    results[i] = "Throttled by Microsoft Graph"
+                break
+            await asyncio.sleep(delay)
+            pending = sorted(throttled)
+
+    return results
 
 
 def calculate_expiry(expires_in: int) -> datetime:
@@ -2,15 +2,21 @@
 
 import smtplib
 import asyncio
+from contextlib import contextmanager
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime
 from typing import Any
 
+import aiosmtplib
+import httpx
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.core.metrics import EMAIL_SEND_SECONDS, timed
+from app.core.tracing import tracer
+from app.services.settings_store import SmtpConfig, settings_store
 
 
 class NotificationError(Exception):
@@ -18,26 +24,16 @@ class NotificationError(Exception):
     pass
 
 
-def _get_smtp_settings() -> dict | None:
-    """Get SMTP settings from database or config."""
-    try:
-        from app.models.app_settings import AppSettings
-        from app.core.database import sync_engine
-
-        with Session(sync_engine) as db:
-            result = db.execute(select(AppSettings))
-            settings_dict = {s.key: s.value for s in result.scalars().all()}
-
-            if settings_dict.get("smtp_user") and settings_dict.get("smtp_password"):
-                return {
-                    "host": settings_dict.get("smtp_host", "smtp.gmail.com"),
-                    "port": int(settings_dict.get("smtp_port", "587")),
-                    "user": settings_dict["smtp_user"],
-                    "password": settings_dict["smtp_password"],
-                    "notification_email": settings_dict.get("notification_email", settings_dict["smtp_user"]),
-                }
-    except Exception:
-        pass
+def _smtp_settings(smtp_config: SmtpConfig | None) -> dict | None:
+    """SMTP settings from the stored config, or else from the environment."""
+    if smtp_config:
+        return {
+            "host": smtp_config.host,
+            "port": smtp_config.port,
+            "user": smtp_config.user,
+            "password": smtp_config.password,
+            "notification_email": smtp_config.notification_email,
+        }
 
     # Fall back to config settings
     if all([settings.smtp_host, settings.smtp_user, settings.smtp_password]):
@@ -52,6 +48,24 @@ def _get_smtp_settings() -> dict | None:
     return None
 
 
+def _get_smtp_settings() -> dict | None:
+    """Get SMTP settings from database (cached) or config."""
+    try:
+        smtp_config = settings_store.smtp_config()
+    except Exception:
+        smtp_config = None
+    return _smtp_settings(smtp_config)
+
+
+async def _aget_smtp_settings() -> dict | None:
+    """Async variant of _get_smtp_settings for API routes."""
+    try:
+        smtp_config = await settings_store.asmtp_config()
+    except Exception:
+        smtp_config = None
+    return _smtp_settings(smtp_config)
+
+
 def is_smtp_configured() -> bool:
     """Check if SMTP email is configured."""
     return _get_smtp_settings() is not None
@@ -68,131 +82,310 @@ def is_email_configured() -> bool:
 
 def _has_valid_microsoft_token() -> bool:
     """Check if we have a valid Microsoft OAuth token."""
-    try:
-        from app.models.oauth_token import OAuthToken
-        from app.core.database import sync_engine
+    from app.services.token_manager import microsoft_token_manager
 
-        with Session(sync_engine) as db:
-            result = db.execute(
-                select(OAuthToken).where(OAuthToken.provider == "microsoft")
-            )
-            token = result.scalar_one_or_none()
-            if token and token.refresh_token:
-                return True
-    except Exception:
-        pass
-    return False
+    return microsoft_token_manager.is_connected()
 
 
 def _get_microsoft_token() -> tuple[str, str] | None:
-    """Get Microsoft OAuth token, refreshing if needed."""
-    try:
-        from app.models.oauth_token import OAuthToken
-        from app.core.database import sync_engine
-        from app.services.microsoft_oauth import refresh_access_token, calculate_expiry
+    """Get Microsoft OAuth token from the process cache, refreshing if needed."""
+    from app.services.token_manager import microsoft_token_manager
 
-        with Session(sync_engine) as db:
-            result = db.execute(
-                select(OAuthToken).where(OAuthToken.provider == "microsoft")
-            )
-            token = result.scalar_one_or_none()
+    return microsoft_token_manager.get_token()
 
-            if not token:
-                return None
 
-            # Check if token needs refresh
-            if token.expires_at and token.expires_at < datetime.utcnow():
-                if not token.refresh_token:
-                    return None
+@contextmanager
+def _instrumented_send(transport: str):
+    """Trace and time one send; set ``labels["outcome"] = "ok"`` on success."""
+    with (
+        tracer.start_as_current_span("email.send", attributes={"email.transport": transport}),
+        timed(EMAIL_SEND_SECONDS, transport=transport, outcome="error") as labels,
+    ):
+        yield labels
 
-                # Refresh the token
-                new_tokens = asyncio.run(refresh_access_token(token.refresh_token))
-                token.access_token = new_tokens["access_token"]
-                if new_tokens.get("refresh_token"):
-                    token.refresh_token = new_tokens["refresh_token"]
-                token.expires_at = calculate_expiry(new_tokens.get("expires_in", 3600))
-                db.commit()
 
-            return token.access_token, token.email
-    except Exception:
-        pass
+def _build_message(
+    smtp_settings: dict,
+    subject: str,
+    body_text: str,
+    body_html: str | None = None,
+) -> MIMEMultipart:
+    """Build the MIME message sent over SMTP."""
+    msg = MIMEMultipart("alternative")
+    msg["Subject"] = subject
+    msg["From"] = smtp_settings["user"]
+    msg["To"] = smtp_settings["notification_email"]
+
+    # Attach text version
+    msg.attach(MIMEText(body_text, "plain"))
+
+    # Attach HTML version if provided
+    if body_html:
+        msg.attach(MIMEText(body_html, "html"))
+
+    return msg
+
+
+class SmtpTransport:
+    """SMTP sender that keeps one authenticated connection open across messages."""
+
+    def __init__(self, smtp_settings: dict, timeout: float | None = None):
+        self.smtp_settings = smtp_settings
+        self.timeout = timeout if timeout is not None else settings.smtp_timeout
+        self._server: smtplib.SMTP | None = None
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(
+            self.smtp_settings["host"], self.smtp_settings["port"], timeout=self.timeout
+        )
+        if settings.smtp_starttls:
+            server.starttls()
+        server.login(self.smtp_settings["user"], self.smtp_settings["password"])
+        return server
+
+    def send(self, subject: str, body_text: str, body_html: str | None = None) -> None:
+        msg = _build_message(self.smtp_settings, subject, body_text, body_html)
+
+        with _instrumented_send("smtp") as labels:
+            try:
+                for attempt in range(2):
+                    if self._server is None:
+                        self._server = self._connect()
+                    try:
+                        self._server.sendmail(
+                            self.smtp_settings["user"],
+                            self.smtp_settings["notification_email"],
+                            msg.as_string(),
+                        )
+                        labels["outcome"] = "ok"
+                        return
+                    except smtplib.SMTPServerDisconnected:
+                        # Server dropped the idle connection; reconnect once
+                        self._server = None
+                        if attempt:
+                            raise
+            except Exception as e:
+                self.close()
+                raise NotificationError(f"Failed to send email: {e}")
+
+    def send_many(self, messages: list[tuple[str, str, str | None]]) -> list[str | None]:
+        """Send (subject, body_text, body_html) messages; returns an error or None per message."""
+        results: list[str | None] = []
+        for subject, body_text, body_html in messages:
+            try:
+                self.send(subject, body_text, body_html)
+                results.append(None)
+            except NotificationError as e:
+                results.append(str(e))
+        return results
+
+    def close(self) -> None:
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except Exception:
+                pass
+            self._server = None
+
+
+class GraphTransport:
+    """Microsoft Graph sender that reuses one HTTP client (and event loop) across messages."""
+
+    def __init__(self, access_token: str, to_email: str, timeout: float | None = None):
+        from app.services.microsoft_oauth import GRAPH_TIMEOUT
+
+        self.access_token = access_token
+        self.to_email = to_email
+        self._loop = asyncio.new_event_loop()
+        self._client = httpx.AsyncClient(timeout=timeout or GRAPH_TIMEOUT)
+
+    def send(self, subject: str, body_text: str, body_html: str | None = None) -> None:
+        from app.services.microsoft_oauth import send_email as ms_send_email
+
+        with _instrumented_send("graph") as labels:
+            try:
+                self._loop.run_until_complete(ms_send_email(
+                    access_token=self.access_token,
+                    to_email=self.to_email,
+                    subject=subject,
+                    body_text=body_text,
+                    body_html=body_html,
+                    client=self._client,
+                ))
+                labels["outcome"] = "ok"
+            except Exception as e:
+                raise NotificationError(f"Failed to send via Microsoft: {e}")
+
+    def send_many(self, messages: list[tuple[str, str, str | None]]) -> list[str | None]:
+        """
+        Send (subject, body_text, body_html) messages through Graph $batch requests.
+
+        Returns an error or None per message. Raises NotificationError if
+        Graph rejects the batch as a whole (e.g. an expired token).
+        """
+        from app.services.microsoft_oauth import send_email_batch
+
+        # Per-message failures inside an accepted batch don't count as a failed send
+        with _instrumented_send("graph_batch") as labels:
+            try:
+                results = self._loop.run_until_complete(send_email_batch(
+                    access_token=self.access_token,
+                    messages=[
+                        {
+                            "to_email": self.to_email,
+                            "subject": subject,
+                            "body_text": body_text,
+                            "body_html": body_html,
+                        }
+                        for subject, body_text, body_html in messages
+                    ],
+                    client=self._client,
+                ))
+            except Exception as e:
+                raise NotificationError(f"Failed to send via Microsoft: {e}")
+            labels["outcome"] = "ok"
+            return results
+
+    def close(self) -> None:
+        if self._loop.is_closed():
+            return
+        try:
+            self._loop.run_until_complete(self._client.aclose())
+        finally:
+            self._loop.close()
+
+
+def open_transport() -> SmtpTransport | GraphTransport | None:
+    """
+    Build the transport for the configured email method.
+
+    Prefers Microsoft Graph, falls back to SMTP. Returns None if email
+    is not configured. The caller must close() the transport.
+    """
+    ms_token = _get_microsoft_token()
+    if ms_token:
+        access_token, from_email = ms_token
+        return GraphTransport(access_token, settings.notification_email or from_email)
+
+    smtp_settings = _get_smtp_settings()
+    if smtp_settings:
+        return SmtpTransport(smtp_settings)
+
     return None
 
 
 def send_email(subject: str, body_text: str, body_html: str | None = None) -> bool:
     """
-    Send an email notification.
+    Send an email notification immediately.
 
     Tries Microsoft Graph API first, falls back to SMTP.
     Returns True if sent successfully, False if not configured.
     Raises NotificationError on failure.
     """
-    # Try Microsoft OAuth first
-    ms_token = _get_microsoft_token()
+    transport = open_transport()
+    if not transport:
+        return False
+
+    try:
+        transport.send(subject, body_text, body_html)
+        return True
+    finally:
+        transport.close()
+
+
+async def send_email_async(
+    subject: str,
+    body_text: str,
+    body_html: str | None = None,
+) -> bool:
+    """
+    Send an email notification without blocking the event loop.
+
+    Async counterpart of send_email for FastAPI routes: awaits the Graph
+    request directly and talks SMTP through aiosmtplib. Celery tasks keep
+    using send_email.
+
+    Returns True if sent successfully, False if not configured.
+    Raises NotificationError on failure.
+    """
+    from app.services.microsoft_oauth import send_email as ms_send_email
+
+    # The token cache may hit the database (or refresh) on a miss
+    ms_token = await asyncio.to_thread(_get_microsoft_token)
     if ms_token:
         access_token, from_email = ms_token
-        to_email = settings.notification_email or from_email
+        with _instrumented_send("graph") as labels:
+            try:
+                await ms_send_email(
+                    access_token=access_token,
+                    to_email=settings.notification_email or from_email,
+                    subject=subject,
+                    body_text=body_text,
+                    body_html=body_html,
+                )
+                labels["outcome"] = "ok"
+                return True
+            except Exception as e:
+                raise NotificationError(f"Failed to send via Microsoft: {e}")
 
+    smtp_settings = await _aget_smtp_settings()
+    if not smtp_settings:
+        return False
+
+    msg = _build_message(smtp_settings, subject, body_text, body_html)
+    with _instrumented_send("smtp") as labels:
         try:
-            from app.services.microsoft_oauth import send_email as ms_send_email
-            asyncio.run(ms_send_email(
-                access_token=access_token,
-                to_email=to_email,
-                subject=subject,
-                body_text=body_text,
-                body_html=body_html,
-            ))
+            await aiosmtplib.send(
+                msg,
+                hostname=smtp_settings["host"],
+                port=smtp_settings["port"],
+                username=smtp_settings["user"],
+                password=smtp_settings["password"],
+                start_tls=settings.smtp_starttls,
+                timeout=settings.smtp_timeout,
+            )
+            labels["outcome"] = "ok"
             return True
         except Exception as e:
-            raise NotificationError(f"Failed to send via Microsoft: {e}")
+            raise NotificationError(f"Failed to send email: {e}")
 
-    # Fall back to SMTP
-    smtp_settings = _get_smtp_settings()
-    if not smtp_settings:
-        return False
-
-    msg = MIMEMultipart("alternative")
-    msg["Subject"] = subject
-    msg["From"] = smtp_settings["user"]
-    msg["To"] = smtp_settings["notification_email"]
 
-    # Attach text version
-    msg.attach(MIMEText(body_text, "plain"))
+def queue_email(
+    db: Session,
+    kind: str,
+    subject: str,
+    body_text: str,
+    body_html: str | None = None,
+):
+    """
+    Write an email to the notification outbox.
 
-    # Attach HTML version if provided
-    if body_html:
-        msg.attach(MIMEText(body_html, "html"))
+    The row is only added to the session; it is committed with the caller's
+    transaction and delivered later by the deliver_notifications task.
+    """
+    from app.models.notification import NotificationOutbox
 
-    try:
-        with smtplib.SMTP(smtp_settings["host"], smtp_settings["port"]) as server:
-            server.starttls()
-            server.login(smtp_settings["user"], smtp_settings["password"])
-            server.sendmail(
-                smtp_settings["user"],
-                smtp_settings["notification_email"],
-                msg.as_string(),
-            )
-        return True
-    except Exception as e:
-        raise NotificationError(f"Failed to send email: {e}")
+    notification = NotificationOutbox(
+        kind=kind,
+        subject=subject,
+        body_text=body_text,
+        body_html=body_html,
+    )
+    db.add(notification)
+    return notification
 
 
-def send_new_exposures_alert(
+def render_new_exposures_alert(
     exposures: list[dict[str, Any]],
     member_name: str,
-    scan_type: str = "scan",
-) -> bool:
+) -> tuple[str, str, str]:
     """
-    Send alert about newly detected exposures.
+    Build subject, text and HTML bodies for a new exposures alert.
 
     Args:
         exposures: List of new exposure dicts with source_name, source_url, data_exposed
         member_name: Name of the family member affected
-        scan_type: Type of scan that found them
     """
-    if not exposures:
-        return False
-
     count = len(exposures)
     subject = f"[Fibertap] {count} new exposure(s) detected for {member_name}"
 
@@ -268,16 +461,49 @@ def send_new_exposures_alert(
     </html>
     """
 
-    return send_email(subject, body_text, body_html)
+    return subject, body_text, body_html
 
 
-def send_scan_complete_alert(
+def send_new_exposures_alert(
+    exposures: list[dict[str, Any]],
+    member_name: str,
+    scan_type: str = "scan",
+) -> bool:
+    """
+    Send alert about newly detected exposures.
+
+    Args:
+        exposures: List of new exposure dicts with source_name, source_url, data_exposed
+        member_name: Name of the family member affected
+        scan_type: Type of scan that found them
+    """
+    if not exposures:
+        return False
+
+    return send_email(*render_new_exposures_alert(exposures, member_name))
+
+
+def queue_new_exposures_alert(
+    db: Session,
+    exposures: list[dict[str, Any]],
+    member_name: str,
+    scan_type: str = "scan",
+) -> bool:
+    """Queue a new exposures alert in the outbox (committed by the caller)."""
+    if not exposures:
+        return False
+
+    queue_email(db, "new_exposures", *render_new_exposures_alert(exposures, member_name))
+    return True
+
+
+def render_scan_complete_alert(
     scan_type: str,
     total_members: int,
     new_exposures: int,
     errors: list[str] | None = None,
-) -> bool:
-    """Send alert when a scheduled scan completes."""
+) -> tuple[str, str]:
+    """Build subject and text body for a scan completion alert."""
     subject = f"[Fibertap] {scan_type.title()} scan complete - {new_exposures} new exposures"
 
     status = "with errors" if errors else "successfully"
@@ -294,4 +520,314 @@ Summary:
 
     body_text += "\n\nLog in to your dashboard to review results."
 
-    return send_email(subject, body_text)
+    return subject, body_text
+
+
+def send_scan_complete_alert(
+    scan_type: str,
+    total_members: int,
+    new_exposures: int,
+    errors: list[str] | None = None,
+) -> bool:
+    """Send alert when a scheduled scan completes."""
+    return send_email(*render_scan_complete_alert(scan_type, total_members, new_exposures, errors))
+
+
+def queue_scan_complete_alert(
+    db: Session,
+    scan_type: str,
+    total_members: int,
+    new_exposures: int,
+    errors: list[str] | None = None,
+) -> None:
+    """Queue a scan completion alert in the outbox (committed by the caller)."""
+    queue_email(
+        db,
+        "scan_complete",
+        *render_scan_complete_alert(scan_type, total_members, new_exposures, errors),
+    )
+
+
+# --- Digests -----------------------------------------------------------------
+#
+# In "per_scan" and "window" digest modes, scans write one outbox row of kind
+# DIGEST_ITEM_KIND per affected member instead of an email. The items are
+# later coalesced into a single summary email: at the end of the scan
+# ("per_scan") or by the periodic flush_notification_digests task ("window").
+# The delivery worker never sends digest items themselves.
+
+DIGEST_ITEM_KIND = "digest_item"
+WINDOW_DIGEST_KEY = "window"
+
+DIGEST_MODES = ("immediate", "per_scan", "window")
+
+# Members listed in full in a digest; the rest are summarized by count
+DIGEST_MAX_MEMBERS = 25
+# Exposures listed per member in a digest
+DIGEST_MAX_EXPOSURES_PER_MEMBER = 5
+
+
+def _queue_digest_item(db: Session, digest_key: str, payload: dict[str, Any]) -> None:
+    from app.models.notification import NotificationOutbox
+
+    db.add(NotificationOutbox(
+        kind=DIGEST_ITEM_KIND,
+        subject=f"Digest item: {payload.get('member_name') or payload.get('scan_type')}",
+        body_text="",
+        digest_key=digest_key,
+        payload=payload,
+    ))
+
+
+class ScanAlerts:
+    """
+    Routes a scan's alerts according to settings.notification_digest_mode.
+
+    - immediate: one email per member plus a completion email (legacy behaviour)
+    - per_scan: one summary email when the scan finishes
+    - window: items are held and summarized by the periodic digest task
+
+    All rows are added to the caller's session and committed with it.
+    """
+
+    def __init__(self, db: Session, scan_type: str, digest_key: str, mode: str | None = None):
+        self.db = db
+        self.scan_type = scan_type
+        self.mode = mode or settings.notification_digest_mode
+        if self.mode not in DIGEST_MODES:
+            self.mode = "per_scan"
+        self.digest_key = WINDOW_DIGEST_KEY if self.mode == "window" else digest_key
+
+    def add_member(self, member_name: str, exposures: list[dict[str, Any]]) -> None:
+        """Record new exposures found for one member."""
+        if not exposures:
+            return
+        if self.mode == "immediate":
+            queue_new_exposures_alert(self.db, exposures, member_name, self.scan_type)
+            return
+        _queue_digest_item(self.db, self.digest_key, {
+            "scan_type": self.scan_type,
+            "member_name": member_name,
+            "exposures": [
+                {
+                    "source_name": exp.get("source_name"),
+                    "source_url": exp.get("source_url"),
+                    "data_exposed": exp.get("data_exposed"),
+                }
+                for exp in exposures
+            ],
+        })
+
+    def finish(
+        self,
+        total_members: int,
+        new_exposures: int,
+        errors: list[str] | None = None,
+    ) -> bool:
+        """
+        Record the end of the scan.
+
+        Returns:
+            True if an email is now ready in the outbox for delivery
+        """
+        if self.mode == "immediate":
+            if new_exposures > 0 or errors:
+                queue_scan_complete_alert(
+                    self.db, self.scan_type, total_members, new_exposures, errors
+                )
+                return True
+            return False
+
+        if errors:
+            _queue_digest_item(self.db, self.digest_key, {
+                "scan_type": self.scan_type,
+                "errors": errors[:5],
+            })
+
+        if self.mode == "window":
+            return False
+
+        self.db.flush()
+        return coalesce_digest(self.db, digest_key=self.digest_key, total_members=total_members)
+
+
+def render_exposure_digest(
+    payloads: list[dict[str, Any]],
+    total_members: int | None = None,
+) -> tuple[str, str, str] | None:
+    """
+    Build one summary email from digest item payloads.
+
+    Exposures are grouped per member and deduplicated by source, so an
+    exposure reported by several items (e.g. a retried scan) appears once.
+
+    Returns:
+        (subject, body_text, body_html), or None if there is nothing to report
+    """
+    members: dict[str, dict[tuple, dict[str, Any]]] = {}
+    scan_types: list[str] = []
+    errors: list[str] = []
+
+    for payload in payloads:
+        scan_type = payload.get("scan_type")
+        if scan_type and scan_type not in scan_types:
+            scan_types.append(scan_type)
+        errors.extend(payload.get("errors") or [])
+        member_name = payload.get("member_name")
+        if not member_name:
+            continue
+        seen = members.setdefault(member_name, {})
+        for exp in payload.get("exposures") or []:
+            seen.setdefault((exp.get("source_name"), exp.get("source_url")), exp)
+
+    total = sum(len(exposures) for exposures in members.values())
+    if not total and not errors:
+        return None
+
+    label = " + ".join(scan_types) or "scan"
+    if total:
+        subject = f"[Fibertap] {total} new exposure(s) for {len(members)} family member(s)"
+    else:
+        subject = f"[Fibertap] {label.title()} scan completed with errors"
+
+    ranked = sorted(members.items(), key=lambda item: (-len(item[1]), item[0]))
+    shown = ranked[:DIGEST_MAX_MEMBERS]
+
+    # Build text body
+    lines = [f"Fibertap {label} summary: {total} new data exposure(s).", ""]
+    if total_members is not None:
+        lines += [f"Family members scanned: {total_members}", ""]
+
+    for member_name, exposures in shown:
+        if not exposures:
+            continue
+        lines.append(f"{member_name}: {len(exposures)} new")
+        for exp in list(exposures.values())[:DIGEST_MAX_EXPOSURES_PER_MEMBER]:
+            lines.append(f"  - {exp.get('source_name') or 'Unknown'}")
+            if exp.get("source_url"):
+                lines.append(f"    Link: {exp['source_url']}")
+        if len(exposures) > DIGEST_MAX_EXPOSURES_PER_MEMBER:
+            lines.append(f"  ... and {len(exposures) - DIGEST_MAX_EXPOSURES_PER_MEMBER} more.")
+        lines.append("")
+
+    if len(ranked) > DIGEST_MAX_MEMBERS:
+        lines.append(f"... and {len(ranked) - DIGEST_MAX_MEMBERS} more family member(s).")
+        lines.append("")
+
+    if errors:
+        lines.append("Errors:")
+        lines.extend(f"- {e}" for e in errors[:5])
+        lines.append("")
+
+    lines.append("Log in to your Fibertap dashboard to review and request removals.")
+    body_text = "\n".join(lines)
+
+    # Build HTML body
+    member_rows = ""
+    for member_name, exposures in shown:
+        if not exposures:
+            continue
+        sources = ", ".join(
+            exp.get("source_name") or "Unknown"
+            for exp in list(exposures.values())[:DIGEST_MAX_EXPOSURES_PER_MEMBER]
+        )
+        if len(exposures) > DIGEST_MAX_EXPOSURES_PER_MEMBER:
+            sources += f", +{len(exposures) - DIGEST_MAX_EXPOSURES_PER_MEMBER} more"
+        member_rows += f"""
+        <tr>
+            <td style="padding: 8px; border-bottom: 1px solid #eee;">{member_name}</td>
+            <td style="padding: 8px; border-bottom: 1px solid #eee;">{len(exposures)}</td>
+            <td style="padding: 8px; border-bottom: 1px solid #eee;">{sources}</td>
+        </tr>
+        """
+
+    more_members = len(ranked) - DIGEST_MAX_MEMBERS
+    more_html = (
+        f"<p><em>...and {more_members} more family member(s).</em></p>" if more_members > 0 else ""
+    )
+    error_items = "".join(f"<li>{e}</li>" for e in errors[:5])
+
+    body_html = f"""
+    <html>
+    <body style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
+        <h2 style="color: #dc2626;">Fibertap {label.title()} Summary</h2>
+        <p>Fibertap detected <strong>{total} new data exposure(s)</strong>
+            across <strong>{len(members)} family member(s)</strong>.</p>
+
+        <table style="width: 100%; border-collapse: collapse; margin: 20px 0;">
+            <thead>
+                <tr style="background: #f3f4f6;">
+                    <th style="padding: 8px; text-align: left;">Family Member</th>
+                    <th style="padding: 8px; text-align: left;">New</th>
+                    <th style="padding: 8px; text-align: left;">Sources</th>
+                </tr>
+            </thead>
+            <tbody>
+                {member_rows}
+            </tbody>
+        </table>
+
+        {more_html}
+        {f'<h3>Errors</h3><ul>{error_items}</ul>' if errors else ''}
+
+        <p style="margin-top: 20px;">
+            <a href="http://localhost:3000" style="background: #2563eb; color: white;
+                padding: 10px 20px; text-decoration: none; border-radius: 5px;">
+                View Dashboard
+            </a>
+        </p>
+
+        <hr style="margin-top: 30px; border: none; border-top: 1px solid #eee;">
+        <p style="color: #666; font-size: 12px;">
+            This alert was sent by Fibertap Privacy Monitor.
+        </p>
+    </body>
+    </html>
+    """
+
+    return subject, body_text, body_html
+
+
+def coalesce_digest(
+    db: Session,
+    digest_key: str | None = None,
+    created_before: datetime | None = None,
+    total_members: int | None = None,
+) -> bool:
+    """
+    Turn pending digest items into one summary email in the outbox.
+
+    Items are selected by digest_key and/or age, locked with SKIP LOCKED and
+    marked SENT once folded into the digest. Does not commit.
+
+    Returns:
+        True if a digest email was queued
+    """
+    from app.models.notification import NotificationOutbox, NotificationStatus
+
+    query = select(NotificationOutbox).where(
+        NotificationOutbox.kind == DIGEST_ITEM_KIND,
+        NotificationOutbox.status == NotificationStatus.PENDING,
+    )
+    if digest_key is not None:
+        query = query.where(NotificationOutbox.digest_key == digest_key)
+    if created_before is not None:
+        query = query.where(NotificationOutbox.created_at < created_before)
+
+    items = db.execute(
+        query.order_by(NotificationOutbox.id).with_for_update(skip_locked=True)
+    ).scalars().all()
+    if not items:
+        return False
+
+    now = datetime.utcnow()
+    for item in items:
+        item.status = NotificationStatus.SENT  # Delivered as part of the digest
+        item.sent_at = now
+
+    rendered = render_exposure_digest([item.payload or {} for item in items], total_members)
+    if not rendered:
+        return False
+
+    queue_email(db, "digest", *rendered)
+    return True
@@ -0,0 +1,203 @@
+"""Typed, cached access to the app_settings key/value table.
+
+Every process (API and Celery workers) keeps the whole table in memory. A
+version counter in Redis is bumped on each write; readers compare it at most
+every ``app_settings_cache_seconds`` and reload only when it moved, so hot
+paths like sending an email read settings without touching Postgres.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+
+import redis
+import redis.asyncio as aioredis
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.config import settings
+from app.core.metrics import record_cache_lookup
+from app.models.app_settings import AppSettings
+
+VERSION_KEY = "fibertap:app_settings:version"
+
+SMTP_KEYS = ("smtp_host", "smtp_port", "smtp_user", "smtp_password", "notification_email")
+
+
+@dataclass(frozen=True)
+class SmtpConfig:
+    """SMTP settings as stored by /auth/smtp/configure."""
+
+    host: str
+    port: int
+    user: str
+    password: str
+    notification_email: str
+
+    @classmethod
+    def from_values(cls, values: dict[str, str | None]) -> "SmtpConfig | None":
+        """Build from raw settings, or None if user/password are missing."""
+        if not (values.get("smtp_user") and values.get("smtp_password")):
+            return None
+        return cls(
+            host=values.get("smtp_host") or "smtp.gmail.com",
+            port=int(values.get("smtp_port") or 587),
+            user=values["smtp_user"],
+            password=values["smtp_password"],
+            notification_email=values.get("notification_email") or values["smtp_user"],
+        )
+
+
+class SettingsStore:
+    """In-process cache of app_settings with Redis-versioned invalidation."""
+
+    def __init__(self):
+        self._values: dict[str, str | None] | None = None
+        self._version: int | None = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._redis: redis.Redis | None = None
+        self._aredis: aioredis.Redis | None = None
+
+    # --- version counter ----------------------------------------------------
+
+    def _sync_redis(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = redis.Redis.from_url(settings.redis_url, socket_timeout=0.5)
+        return self._redis
+
+    def _async_redis(self) -> aioredis.Redis:
+        if self._aredis is None:
+            self._aredis = aioredis.Redis.from_url(settings.redis_url, socket_timeout=0.5)
+        return self._aredis
+
+    def _read_version(self) -> int | None:
+        try:
+            return int(self._sync_redis().get(VERSION_KEY) or 0)
+        except redis.RedisError:
+            return None
+
+    async def _aread_version(self) -> int | None:
+        try:
+            return int(await self._async_redis().get(VERSION_KEY) or 0)
+        except redis.RedisError:
+            return None
+
+    async def _abump_version(self) -> None:
+        try:
+            await self._async_redis().incr(VERSION_KEY)
+        except redis.RedisError:
+            pass  # Other processes fall back to reloading every check interval
+
+    def _due_for_check(self) -> bool:
+        return (
+            self._values is None
+            or time.monotonic() - self._checked_at >= settings.app_settings_cache_seconds
+        )
+
+    def _is_current(self, version: int | None) -> bool:
+        self._checked_at = time.monotonic()
+        # Without Redis there is no version to compare, so reload on every check
+        return self._values is not None and version is not None and version == self._version
+
+    def invalidate(self) -> None:
+        """Drop the local cache so the next read reloads."""
+        self._values = None
+
+    # --- reads ----------------------------------------------------------------
+
+    def get_all(self) -> dict[str, str | None]:
+        """All settings (sync, for Celery workers)."""
+        if not self._due_for_check():
+            record_cache_lookup("app_settings", hit=True)
+            return self._values
+
+        with self._lock:
+            if not self._due_for_check():
+                record_cache_lookup("app_settings", hit=True)
+                return self._values
+            version = self._read_version()
+            current = self._is_current(version)
+            record_cache_lookup("app_settings", hit=current)
+            if not current:
+                from app.core.database import get_sync_db
+
+                # Version is read before the rows, so a concurrent write always
+                # leaves us with a version that triggers another reload
+                with get_sync_db() as db:
+                    rows = db.execute(select(AppSettings.key, AppSettings.value)).all()
+                self._values = dict(rows)
+                self._version = version
+            return self._values
+
+    async def aget_all(self) -> dict[str, str | None]:
+        """All settings (async, for API routes)."""
+        if not self._due_for_check():
+            record_cache_lookup("app_settings", hit=True)
+            return self._values
+
+        version = await self._aread_version()
+        current = self._is_current(version)
+        record_cache_lookup("app_settings", hit=current)
+        if not current:
+            from app.core.database import async_session_maker
+
+            async with async_session_maker() as db:
+                result = await db.execute(select(AppSettings.key, AppSettings.value))
+                rows = result.all()
+            self._values = dict(rows)
+            self._version = version
+        return self._values
+
+    def get_many(self, keys: tuple[str, ...] | list[str]) -> dict[str, str | None]:
+        values = self.get_all()
+        return {key: values.get(key) for key in keys}
+
+    async def aget_many(self, keys: tuple[str, ...] | list[str]) -> dict[str, str | None]:
+        values = await self.aget_all()
+        return {key: values.get(key) for key in keys}
+
+    def smtp_config(self) -> SmtpConfig | None:
+        return SmtpConfig.from_values(self.get_many(SMTP_KEYS))
+
+    async def asmtp_config(self) -> SmtpConfig | None:
+        return SmtpConfig.from_values(await self.aget_many(SMTP_KEYS))
+
+    # --- writes ---------------------------------------------------------------
+
+    async def aset_many(self, values: dict[str, str | None]) -> None:
+        """Upsert several settings in one statement and notify other processes."""
+        if not values:
+            return
+        from app.core.database import async_session_maker
+
+        now = datetime.utcnow()
+        stmt = insert(AppSettings).values([
+            {"key": key, "value": value, "created_at": now, "updated_at": now}
+            for key, value in values.items()
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[AppSettings.key],
+            set_={"value": stmt.excluded.value, "updated_at": stmt.excluded.updated_at},
+        )
+        async with async_session_maker() as db:
+            await db.execute(stmt)
+            await db.commit()
+
+        self.invalidate()
+        await self._abump_version()
+
+    async def adelete_many(self, keys: tuple[str, ...] | list[str]) -> None:
+        """Delete several settings in one statement and notify other processes."""
+        from app.core.database import async_session_maker
+
+        async with async_session_maker() as db:
+            await db.execute(delete(AppSettings).where(AppSettings.key.in_(keys)))
+            await db.commit()
+
+        self.invalidate()
+        await self._abump_version()
+
+
+settings_store = SettingsStore()
@@ -0,0 +1,166 @@
+"""Process-wide Microsoft OAuth access token cache with single-flight refresh.
+
+The token is served from memory until it is close to expiry. Inside
+REFRESH_MARGIN it is refreshed in a background thread while callers keep
+using the still-valid token; only an already-expired token makes callers
+wait. Refreshes hold a row lock (SELECT ... FOR UPDATE) on the oauth_tokens
+row, so when several workers hit expiry together only the first one calls
+Microsoft and the others read the refreshed row when the lock is released.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from app.core.metrics import record_cache_lookup
+from app.models.oauth_token import OAuthToken
+
+logger = logging.getLogger(__name__)
+
+
+# Refresh proactively once the token is this close to expiring
+REFRESH_MARGIN = timedelta(minutes=5)
+
+# Re-read the token row after this many seconds, to notice reconnects/disconnects
+MAX_CACHE_AGE = 60.0
+
+
+@dataclass(frozen=True)
+class CachedToken:
+    access_token: str
+    email: str | None
+    expires_at: datetime | None
+    has_refresh_token: bool
+
+    def expired(self, now: datetime) -> bool:
+        return self.expires_at is not None and self.expires_at <= now
+
+    def needs_refresh(self, now: datetime) -> bool:
+        return self.expires_at is not None and self.expires_at - now <= REFRESH_MARGIN
+
+
+class MicrosoftTokenManager:
+    """Caches the Microsoft Graph access token and refreshes it ahead of expiry."""
+
+    provider = "microsoft"
+
+    def __init__(self):
+        self._token: CachedToken | None = None
+        self._loaded_at: float | None = None  # time.monotonic() of the last row read
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        """Forget the cached token (e.g. after connect/disconnect)."""
+        self._token = None
+        self._loaded_at = None
+
+    def _stale(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > MAX_CACHE_AGE
+
+    def _sync(self, refresh: bool) -> None:
+        """
+        Reload the token row and, if refresh is set and it is due, refresh it.
+
+        Must be called with self._lock held.
+        """
+        from app.core.database import get_sync_db
+        from app.services.microsoft_oauth import calculate_expiry, refresh_access_token
+
+        with get_sync_db() as db:
+            query = select(OAuthToken).where(OAuthToken.provider == self.provider)
+            if refresh:
+                # Row lock makes the refresh single-flight across processes
+                query = query.with_for_update()
+            row = db.execute(query).scalars().first()
+
+            if row and refresh and row.refresh_token and (
+                row.expires_at is None or row.expires_at - datetime.utcnow() <= REFRESH_MARGIN
+            ):
+                new_tokens = asyncio.run(refresh_access_token(row.refresh_token))
+                row.access_token = new_tokens["access_token"]
+                if new_tokens.get("refresh_token"):
+                    row.refresh_token = new_tokens["refresh_token"]
+                row.expires_at = calculate_expiry(new_tokens.get("expires_in", 3600))
+
+            token = None
+            if row:
+                token = CachedToken(
+                    access_token=row.access_token,
+                    email=row.email,
+                    expires_at=row.expires_at,
+                    has_refresh_token=bool(row.refresh_token),
+                )
+            db.commit()
+
+        self._token = token
+        self._loaded_at = time.monotonic()
+
+    def _refresh_in_background(self) -> None:
+        """Start a refresh thread unless one is already running in this process."""
+        if not self._lock.acquire(blocking=False):
+            return
+
+        def run():
+            try:
+                self._sync(refresh=True)
+            except Exception:
+                logger.exception("Background Microsoft token refresh failed")
+            finally:
+                self._lock.release()
+
+        threading.Thread(target=run, name="ms-token-refresh", daemon=True).start()
+
+    def is_connected(self) -> bool:
+        """Whether a Microsoft account with a refresh token is connected."""
+        try:
+            if self._stale():
+                with self._lock:
+                    if self._stale():
+                        self._sync(refresh=False)
+        except Exception:
+            return False
+        return bool(self._token and self._token.has_refresh_token)
+
+    def get_token(self) -> tuple[str, str | None] | None:
+        """
+        Return (access_token, email), refreshing if needed.
+
+        Returns None if no account is connected or the token cannot be refreshed.
+        """
+        now = datetime.utcnow()
+        token = self._token
+
+        if token and not self._stale():
+            if not token.needs_refresh(now):
+                record_cache_lookup("microsoft_token", hit=True)
+                return token.access_token, token.email
+            if not token.expired(now):
+                # Still valid: keep serving it while a refresh runs
+                self._refresh_in_background()
+                record_cache_lookup("microsoft_token", hit=True)
+                return token.access_token, token.email
+
+        record_cache_lookup("microsoft_token", hit=False)
+        try:
+            with self._lock:
+                if self._stale():
+                    self._sync(refresh=False)
+                token = self._token
+                if token and token.has_refresh_token and token.needs_refresh(datetime.utcnow()):
+                    self._sync(refresh=True)
+                    token = self._token
+        except Exception:
+            logger.exception("Microsoft token refresh failed")
+            token = self._token  # Fall back to the cached token if it is still valid
+
+        if not token or token.expired(datetime.utcnow()):
+            return None
+        return token.access_token, token.email
+
+
+microsoft_token_manager = MicrosoftTokenManager()
@@ -1,6 +1,17 @@
+from datetime import timedelta
+
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import (
+    before_task_publish,
+    task_postrun,
+    task_prerun,
+    worker_init,
+    worker_process_init,
+    worker_process_shutdown,
+)
 
+from app.core import instrumentation, metrics, profiling, tracing
 from app.core.config import settings
 
 celery_app = Celery(
@@ -27,6 +38,21 @@ celery_app.conf.update(
             "task": "app.tasks.scanning.scheduled_breach_scan",
             "schedule": crontab(hour="*/6", minute=0),
         },
+        # Drain the notification outbox (scans also kick this off on completion)
+        "deliver-notifications-1m": {
+            "task": "app.tasks.notifications.deliver_notifications",
+            "schedule": crontab(minute="*"),
+        },
+        # Summarize alerts held for the digest window
+        "flush-notification-digests": {
+            "task": "app.tasks.notifications.flush_notification_digests",
+            "schedule": timedelta(minutes=settings.notification_digest_window_minutes),
+        },
+        # Move removed exposures and old scans into the archive tables
+        "apply-retention-daily": {
+            "task": "app.tasks.retention.apply_retention",
+            "schedule": crontab(hour=4, minute=0),
+        },
         # Sync Incogni status every hour (when implemented)
         "sync-incogni-hourly": {
             "task": "app.tasks.scanning.sync_incogni_status",
@@ -35,5 +61,53 @@ celery_app.conf.update(
     },
 )
 
+
+@worker_init.connect
+def start_metrics_exporter(**kwargs):
+    # Runs in the main worker process, before the pool starts
+    if settings.metrics_worker_port:
+        metrics.start_worker_exporter(settings.metrics_worker_port)
+        metrics.start_pool_sampler()  # Runs the tasks itself with --pool solo/threads
+
+
+@worker_process_shutdown.connect
+def forget_worker_process_metrics(pid=None, **kwargs):
+    if pid:
+        metrics.mark_process_dead(pid)
+
+
+@worker_process_init.connect
+def configure_worker_tracing(**kwargs):
+    tracing.configure_tracing("fibertap-worker")
+
+
+@worker_process_init.connect
+def start_pool_metrics(**kwargs):
+    # Threads don't survive the fork: each prefork child samples its own pools
+    if settings.metrics_worker_port:
+        metrics.start_pool_sampler()
+
+
+@before_task_publish.connect
+def propagate_trace_context(headers=None, **kwargs):
+    # Also runs in the API, which publishes the scan tasks
+    if headers is not None:
+        tracing.inject_task_headers(headers)
+
+
+@task_prerun.connect
+def start_task_span(task_id=None, task=None, **kwargs):
+    tracing.start_task_span(task_id, task.name, task.request)
+    instrumentation.start_task_tracking(task_id, task.name)
+    profiling.start_task_profile(task_id, task.request)
+
+
+@task_postrun.connect
+def end_task_span(task_id=None, task=None, state=None, **kwargs):
+    profiling.finish_task_profile(task_id, task.name)
+    instrumentation.finish_task_tracking(task_id, task.name)
+    tracing.end_task_span(task_id, state)
+
+
 # Import tasks to register them
-from app.tasks import scanning  # noqa: F401, E402
+from app.tasks import notifications, retention, scanning  # noqa: F401, E402
@@ -0,0 +1,179 @@
+"""Background delivery of queued email notifications."""
+
+import re
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import get_sync_db
+from app.models.notification import NotificationOutbox, NotificationStatus
+from app.models.scan import Scan
+from app.services.notifications import (
+    DIGEST_ITEM_KIND,
+    WINDOW_DIGEST_KEY,
+    NotificationError,
+    coalesce_digest,
+    open_transport,
+)
+from app.tasks import celery_app
+
+# Upper bound on the retry delay, however many attempts have failed
+MAX_RETRY_DELAY = timedelta(hours=6)
+
+# How long queued rows wait while email is not configured yet; not counted
+# as an attempt, so nothing is lost before SMTP or Graph is set up
+NOT_CONFIGURED_DELAY = timedelta(minutes=15)
+
+# Per-scan digest items older than this, of a scan task that has ended, were
+# never summarized (the task died first); the periodic digest picks them up
+ORPHANED_DIGEST_AGE = timedelta(hours=1)
+
+# Per-scan digest keys: "scan:<scan id or Celery task id>:<task>"
+_SCAN_DIGEST_KEY = re.compile(r"scan:(?P<scan_id>[^:]+):(?P<task>\w+)")
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    """Exponential backoff: base, 2x base, 4x base, ... capped at MAX_RETRY_DELAY."""
+    delay = timedelta(seconds=settings.notification_retry_base_seconds * 2 ** (attempts - 1))
+    return min(delay, MAX_RETRY_DELAY)
+
+
+def _record_failure(notification: NotificationOutbox, error: str) -> None:
+    """Count a failed attempt and schedule a retry, or give up."""
+    notification.attempts += 1
+    notification.last_error = error[:500]
+    if notification.attempts >= settings.notification_max_attempts:
+        notification.status = NotificationStatus.FAILED
+    else:
+        notification.next_attempt_at = datetime.utcnow() + _retry_delay(notification.attempts)
+
+
+def _claim_batch(db) -> list[NotificationOutbox]:
+    """Lock the next due PENDING rows, skipping rows other workers hold."""
+    return db.execute(
+        select(NotificationOutbox)
+        .where(
+            NotificationOutbox.status == NotificationStatus.PENDING,
+            NotificationOutbox.kind != DIGEST_ITEM_KIND,
+            NotificationOutbox.next_attempt_at <= datetime.utcnow(),
+        )
+        .order_by(NotificationOutbox.id)
+        .limit(settings.notification_batch_size)
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+
+
+@celery_app.task
+def deliver_notifications(max_batches: int = 10):
+    """
+    Drain the notification outbox.
+
+    Claims due PENDING rows in batches with FOR UPDATE SKIP LOCKED, so several
+    workers can run this concurrently, and sends them over a single SMTP
+    connection or Graph client that is reused for the whole run. On Graph
+    each batch goes out as one $batch request. Failed sends
+    are retried with exponential backoff until notification_max_attempts.
+    While email is not configured, rows stay PENDING and are retried after
+    NOT_CONFIGURED_DELAY.
+
+    Args:
+        max_batches: Stop after this many batches; the next run picks up the rest.
+    """
+    sent = 0
+    failed = 0
+    deferred = 0
+    transport = None
+
+    try:
+        with get_sync_db() as db:
+            for _ in range(max_batches):
+                batch = _claim_batch(db)
+                if not batch:
+                    break
+
+                if transport is None:
+                    transport = open_transport()
+
+                if transport is None:
+                    # Keep them queued until email is set up
+                    retry_at = datetime.utcnow() + NOT_CONFIGURED_DELAY
+                    for notification in batch:
+                        notification.next_attempt_at = retry_at
+                        notification.last_error = "Email is not configured"
+                    deferred += len(batch)
+                    db.commit()
+                    continue
+
+                messages = [(n.subject, n.body_text, n.body_html) for n in batch]
+                try:
+                    errors = transport.send_many(messages)
+                except NotificationError as e:
+                    errors = [str(e)] * len(batch)
+
+                for notification, error in zip(batch, errors):
+                    if error is None:
+                        notification.status = NotificationStatus.SENT
+                        notification.sent_at = datetime.utcnow()
+                        sent += 1
+                    else:
+                        _record_failure(notification, error)
+                        failed += 1
+
+                db.commit()
+    finally:
+        if transport is not None:
+            transport.close()
+
+    return {"sent": sent, "failed": failed, "deferred": deferred}
+
+
+def _orphaned_digest_keys(db, created_before: datetime) -> list[str]:
+    """
+    Per-scan digest keys with items older than created_before whose scan task has ended.
+
+    A task has ended once it has its scan.timings entry (see
+    app.tasks.scanning), or when its scan row is gone. Not scan.status: the
+    first task of a FULL scan to finish already sets it, while the other one
+    may run for hours yet. Keys of scans without a record have nothing to
+    check and go by age alone.
+    """
+    keys = db.scalars(
+        select(NotificationOutbox.digest_key).distinct().where(
+            NotificationOutbox.kind == DIGEST_ITEM_KIND,
+            NotificationOutbox.status == NotificationStatus.PENDING,
+            NotificationOutbox.created_at < created_before,
+            NotificationOutbox.digest_key != WINDOW_DIGEST_KEY,
+        )
+    ).all()
+
+    orphaned = []
+    for key in keys:
+        match = _SCAN_DIGEST_KEY.fullmatch(key)
+        if match and match["scan_id"].isdigit():
+            scan = db.get(Scan, int(match["scan_id"]))
+            if scan is not None and match["task"] not in (scan.timings or {}):
+                continue  # Still running
+        orphaned.append(key)
+    return orphaned
+
+
+@celery_app.task
+def flush_notification_digests():
+    """
+    Summarize held digest items into one email and deliver it.
+
+    Runs every notification_digest_window_minutes. Collects everything queued
+    in "window" digest mode, plus per-scan items orphaned by scan tasks that
+    ended without their own summary (one email per task, as it would have sent).
+    """
+    with get_sync_db() as db:
+        queued = coalesce_digest(db, digest_key=WINDOW_DIGEST_KEY)
+        for key in _orphaned_digest_keys(db, datetime.utcnow() - ORPHANED_DIGEST_AGE):
+            queued = coalesce_digest(db, digest_key=key) or queued
+        db.commit()
+
+    if queued:
+        deliver_notifications.delay()
+
+    return {"queued": queued}
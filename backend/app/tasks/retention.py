@@ -0,0 +1,197 @@
+"""Retention: move old rows out of the hot tables into the archive tables."""
+
+import re
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, insert, literal, or_, select, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import get_sync_db
+from app.models.archive import ExposureArchive, ScanArchive
+from app.models.exposure import Exposure, ExposureSource, ExposureStatus
+from app.models.exposure_event import ExposureEvent, ExposureEventType
+from app.models.scan import Scan
+from app.tasks import celery_app
+
+# Columns copied as-is from the hot table to its archive
+EXPOSURE_COLUMNS = [
+    "id", "family_member_id", "source", "source_name", "source_url", "data_exposed",
+    "status", "incogni_request_id", "verification", "verified_at", "detected_at", "updated_at",
+]
+SCAN_COLUMNS = [
+    "id", "started_at", "scan_type", "status", "exposures_found", "error_message",
+    "timings", "completed_at", "updated_at",
+]
+
+_PARTITION_NAME = re.compile(r"^scans_archive_(\d{4})_(\d{2})$")
+
+
+def _month_start(value: datetime) -> datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _next_month(month: datetime) -> datetime:
+    return (month + timedelta(days=32)).replace(day=1)
+
+
+def _move_batch(
+    db: Session,
+    model,
+    archive_model,
+    columns: list[str],
+    criteria,
+    record_events: bool = False,
+) -> int:
+    """
+    Move one batch of rows to the archive in a single statement.
+
+    DELETE ... RETURNING feeds INSERT ... SELECT through a CTE, so rows are
+    never in both tables or in neither. Rows locked by someone else (e.g. a
+    scan updating them) are skipped until the next run.
+    """
+    batch = (
+        select(model.id)
+        .where(criteria)
+        .order_by(model.id)
+        .limit(settings.retention_batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    now = datetime.utcnow()
+    moved = (
+        delete(model)
+        .where(model.id.in_(batch.scalar_subquery()))
+        .returning(*(getattr(model, name) for name in columns))
+        .cte("moved")
+    )
+    stmt = insert(archive_model).from_select(
+        [*columns, "archived_at"],
+        select(*(moved.c[name] for name in columns), literal(now)),
+    )
+
+    if record_events:
+        # Bulk statements bypass the ORM event hook, so log the moves here
+        archived = stmt.returning(
+            archive_model.id, archive_model.family_member_id, archive_model.status
+        ).cte("archived")
+        stmt = insert(ExposureEvent).from_select(
+            ["exposure_id", "family_member_id", "event_type", "old_status", "actor", "created_at"],
+            select(
+                archived.c.id,
+                archived.c.family_member_id,
+                literal(ExposureEventType.ARCHIVED, ExposureEvent.event_type.type),
+                archived.c.status,
+                literal("retention"),
+                literal(now),
+            ),
+        )
+
+    count = db.execute(stmt).rowcount
+    db.commit()
+    return count
+
+
+def _move_all(
+    db: Session,
+    model,
+    archive_model,
+    columns: list[str],
+    criteria,
+    record_events: bool = False,
+) -> int:
+    total = 0
+    while True:
+        count = _move_batch(db, model, archive_model, columns, criteria, record_events)
+        total += count
+        if count < settings.retention_batch_size:
+            return total
+
+
+def ensure_scan_archive_partitions(db: Session, start: datetime, end: datetime) -> None:
+    """Create the monthly scans_archive partitions covering start..end."""
+    month = _month_start(start)
+    while month <= end:
+        next_month = _next_month(month)
+        db.execute(text(
+            f"CREATE TABLE IF NOT EXISTS scans_archive_{month:%Y_%m} "
+            f"PARTITION OF scans_archive "
+            f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{next_month:%Y-%m-%d}')"
+        ))
+        month = next_month
+    db.commit()
+
+
+def drop_scan_archive_partitions(db: Session, before: datetime) -> list[str]:
+    """Drop scans_archive partitions whose whole month lies before `before`."""
+    names = db.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = 'scans_archive'::regclass"
+    )).scalars().all()
+
+    dropped = []
+    for name in sorted(names):
+        match = _PARTITION_NAME.match(name)
+        if not match:
+            continue
+        month = datetime(int(match.group(1)), int(match.group(2)), 1)
+        if _next_month(month) <= before:
+            db.execute(text(f"DROP TABLE {name}"))
+            dropped.append(name)
+    db.commit()
+    return dropped
+
+
+@celery_app.task
+def apply_retention():
+    """
+    Archive removed exposures and old scan history.
+
+    - REMOVED exposures not updated for retention_removed_exposure_days
+    - unverified people-search exposures older than retention_stale_broker_days
+      (if set)
+    - scans started more than retention_scan_days ago
+
+    Rows move in batches of retention_batch_size, one transaction each, so
+    the hot tables are never locked for long. Archived scan partitions older
+    than retention_scan_archive_months are dropped (if set).
+    """
+    now = datetime.utcnow()
+
+    with get_sync_db() as db:
+        exposure_criteria = [
+            (Exposure.status == ExposureStatus.REMOVED)
+            & (Exposure.updated_at < now - timedelta(days=settings.retention_removed_exposure_days))
+        ]
+        if settings.retention_stale_broker_days:
+            exposure_criteria.append(
+                (Exposure.source == ExposureSource.PEOPLE_SEARCH)
+                & (Exposure.status == ExposureStatus.DETECTED)
+                & (Exposure.updated_at < now - timedelta(days=settings.retention_stale_broker_days))
+            )
+        exposures = _move_all(
+            db, Exposure, ExposureArchive, EXPOSURE_COLUMNS, or_(*exposure_criteria),
+            record_events=True,
+        )
+
+        scan_cutoff = now - timedelta(days=settings.retention_scan_days)
+        oldest_scan = db.execute(
+            select(func.min(Scan.started_at)).where(Scan.started_at < scan_cutoff)
+        ).scalar()
+        scans = 0
+        if oldest_scan:
+            ensure_scan_archive_partitions(db, oldest_scan, scan_cutoff)
+            scans = _move_all(db, Scan, ScanArchive, SCAN_COLUMNS, Scan.started_at < scan_cutoff)
+
+        dropped = []
+        if settings.retention_scan_archive_months:
+            keep_from = _month_start(now)
+            for _ in range(settings.retention_scan_archive_months):
+                keep_from = _month_start(keep_from - timedelta(days=1))
+            dropped = drop_scan_archive_partitions(db, keep_from)
+
+    return {
+        "exposures_archived": exposures,
+        "scans_archived": scans,
+        "partitions_dropped": dropped,
+    }
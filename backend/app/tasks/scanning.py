@@ -1,29 +1,61 @@
 """Background scanning tasks for detecting data exposures."""
 
 import asyncio
-from datetime import datetime
+from collections import Counter
+from datetime import datetime, timedelta
 
-from sqlalchemy import select, create_engine
-from sqlalchemy.orm import Session
+from celery.signals import task_failure
+from sqlalchemy import or_, select, union, update
 
 from app.tasks import celery_app
 from app.core.config import settings
+from app.core.database import get_sync_db
+from app.core.instrumentation import StatementStats, track_statements
+from app.core.metrics import EXPOSURES_CREATED, PhaseTimer, record_cache_lookup
+from app.core.tracing import queue_wait_seconds
 from app.models.family_member import FamilyMember
+from app.models.archive import ExposureArchive
 from app.models.exposure import Exposure, ExposureSource, ExposureStatus
+from app.models.member_identifier import IdentifierKind
 from app.models.scan import Scan, ScanStatus, ScanType
+from app.services.broker_crawler import BrokerCrawler, ListingCandidate, iter_listings
 from app.services.hibp import check_email_breaches, HIBPError, format_breach_for_exposure
 from app.services.data_brokers import generate_search_urls, parse_address_for_location
-from app.services.notifications import send_new_exposures_alert, send_scan_complete_alert
+from app.services.identifiers import load_identifier_values
+from app.services.live_events import ScanProgress
+from app.services.notifications import ScanAlerts
+from app.tasks.notifications import deliver_notifications
 
 
-# Create sync engine for Celery tasks
-sync_database_url = settings.database_url.replace("+asyncpg", "+psycopg2").replace("postgresql+psycopg2", "postgresql")
-sync_engine = create_engine(sync_database_url)
+def _recorded_exposures(db, member_id: int) -> set[tuple[ExposureSource, str]]:
+    """
+    (source, source_name) of the member's exposures, archived ones included.
+
+    Loaded once per member so scans dedup in memory, and archived exposures
+    aren't re-added.
+    """
+    query = union(*(
+        select(model.source, model.source_name).where(model.family_member_id == member_id)
+        for model in (Exposure, ExposureArchive)
+    ))
+    return {(source, source_name) for source, source_name in db.execute(query)}
+
 
+def _save_timings(db, scan_id: int | None, timer: PhaseTimer, statements: StatementStats) -> None:
+    """
+    Record the task's metrics and store its timing profile on the scan.
 
-def get_sync_db() -> Session:
-    """Get a synchronous database session for Celery tasks."""
-    return Session(sync_engine)
+    The entry also marks the task as ended (see end_failed_scan_task), so
+    call it before publishing "finished".
+    """
+    timer.observe()
+    if not scan_id:
+        return
+    # Row lock: both tasks of a FULL scan add their own entry
+    scan = db.get(Scan, scan_id, with_for_update=True, populate_existing=True)
+    if scan:
+        scan.timings = {**(scan.timings or {}), timer.task: timer.profile(statements)}
+        db.commit()
 
 
 @celery_app.task(bind=True, max_retries=3)
@@ -35,16 +67,22 @@ def run_breach_scan(self, family_member_ids: list[int] | None = None, scan_id: i
         family_member_ids: Optional list of member IDs to scan. If None, scans all.
         scan_id: Optional scan record ID to update with progress.
     """
-    with get_sync_db() as db:
+    timer = PhaseTimer("breach")
+    timer.queue_wait = queue_wait_seconds(self.request)
+    with get_sync_db() as db, track_statements() as statements:
+        db.info["event_actor"] = "scan"  # Recorded on exposure events
+
         # Get family members to scan
         query = select(FamilyMember)
         if family_member_ids:
             query = query.where(FamilyMember.id.in_(family_member_ids))
 
-        members = db.execute(query).scalars().all()
+        with timer.phase("load_members"):
+            members = db.execute(query).scalars().all()
 
         if not members:
             return {"status": "no_members", "message": "No family members to scan"}
+        timer.count("members", len(members))
 
         # Update scan status if tracking
         if scan_id:
@@ -55,36 +93,46 @@ def run_breach_scan(self, family_member_ids: list[int] | None = None, scan_id: i
 
         total_new_exposures = 0
         errors = []
+        alerts = ScanAlerts(db, "breach", digest_key=f"scan:{scan_id or self.request.id}:breach")
+        progress = ScanProgress(scan_id, "breach")
+        progress.started(total_members=len(members))
+
+        # Normalized emails (array field + legacy single field) from the identifier index
+        with timer.phase("load_members"):
+            member_emails = load_identifier_values(
+                db, IdentifierKind.EMAIL, [member.id for member in members]
+            )
+        # Emails shared between members are only looked up once per scan
+        breach_cache: dict[str, list] = {}
 
         for member in members:
-            # Get all emails to check (new array field + legacy single field)
-            emails_to_check = []
-            if member.emails:
-                emails_to_check.extend(member.emails)
-            if member.email and member.email not in emails_to_check:
-                emails_to_check.append(member.email)
+            emails_to_check = member_emails.get(member.id, [])
 
             if not emails_to_check:
+                progress.member_done()
                 continue
 
             member_new_exposures = []  # Track new exposures for this member
+            with timer.phase("dedup"):
+                recorded = _recorded_exposures(db, member.id)
 
             for email in emails_to_check:
                 try:
-                    # Run async HIBP check in sync context
-                    breaches = asyncio.run(check_email_breaches(email))
+                    record_cache_lookup("scan_breaches", hit=email in breach_cache)
+                    if email in breach_cache:
+                        timer.count("breach_cache_hits")
+                    else:
+                        # Run async HIBP check in sync context
+                        timer.count("hibp_calls")
+                        with timer.phase("hibp"):
+                            breach_cache[email] = asyncio.run(check_email_breaches(email))
+                    breaches = breach_cache[email]
 
                     for breach in breaches:
                         # Check if we already have this exposure
-                        existing = db.execute(
-                            select(Exposure).where(
-                                Exposure.family_member_id == member.id,
-                                Exposure.source == ExposureSource.BREACH,
-                                Exposure.source_name == breach.get("Title", breach.get("Name")),
-                            )
-                        ).scalar_one_or_none()
-
-                        if not existing:
+                        key = (ExposureSource.BREACH, breach.get("Title", breach.get("Name")))
+                        if key not in recorded:
+                            recorded.add(key)
                             # Create new exposure
                             breach_data = format_breach_for_exposure(breach, email)
                             exposure = Exposure(
@@ -96,23 +144,22 @@ def run_breach_scan(self, family_member_ids: list[int] | None = None, scan_id: i
                                 status=ExposureStatus.DETECTED,
                             )
                             db.add(exposure)
+                            EXPOSURES_CREATED.labels(source=ExposureSource.BREACH.value).inc()
                             total_new_exposures += 1
                             member_new_exposures.append(breach_data)
 
-                    db.commit()
-
                 except HIBPError as e:
                     errors.append(f"{member.name} ({email}): {str(e)}")
+                    progress.error(errors[-1])
                     # Retry on rate limit
                     if "rate limit" in str(e).lower():
                         raise self.retry(countdown=60 * 2)  # Retry in 2 minutes
 
-            # Send alert if new exposures found for this member
-            if member_new_exposures:
-                try:
-                    send_new_exposures_alert(member_new_exposures, member.name, "breach")
-                except Exception:
-                    pass  # Don't fail scan if notification fails
+            # Queue alert in the same transaction as the member's new exposures
+            with timer.phase("insert"):
+                alerts.add_member(member.name, member_new_exposures)
+                db.commit()
+            progress.member_done(len(member_new_exposures), emails_checked=len(emails_to_check))
 
         # Update scan record
         if scan_id:
@@ -125,17 +172,20 @@ def run_breach_scan(self, family_member_ids: list[int] | None = None, scan_id: i
                     scan.error_message = "; ".join(errors[:3])  # First 3 errors
                 db.commit()
 
-        # Send scan completion alert
-        if total_new_exposures > 0 or errors:
-            try:
-                send_scan_complete_alert(
-                    scan_type="breach",
-                    total_members=len(members),
-                    new_exposures=total_new_exposures,
-                    errors=errors if errors else None,
-                )
-            except Exception:
-                pass  # Don't fail if notification fails
+        # Queue scan summary/completion alert and hand the outbox to the delivery worker
+        with timer.phase("notify"):
+            ready = alerts.finish(
+                total_members=len(members),
+                new_exposures=total_new_exposures,
+                errors=errors if errors else None,
+            )
+            db.commit()
+            if ready:
+                deliver_notifications.delay()
+        _save_timings(db, scan_id, timer, statements)
+        progress.finished(
+            ScanStatus.COMPLETED.value if not errors else ScanStatus.FAILED.value
+        )
 
         return {
             "status": "completed",
@@ -145,8 +195,8 @@ def run_breach_scan(self, family_member_ids: list[int] | None = None, scan_id: i
         }
 
 
-@celery_app.task
-def run_data_broker_scan(family_member_ids: list[int] | None = None, scan_id: int | None = None):
+@celery_app.task(bind=True)
+def run_data_broker_scan(self, family_member_ids: list[int] | None = None, scan_id: int | None = None):
     """
     Generate search URLs for known data broker sites.
 
@@ -157,16 +207,22 @@ def run_data_broker_scan(family_member_ids: list[int] | None = None, scan_id: in
         family_member_ids: Optional list of member IDs to scan. If None, scans all.
         scan_id: Optional scan record ID to update with progress.
     """
-    with get_sync_db() as db:
+    timer = PhaseTimer("data_broker")
+    timer.queue_wait = queue_wait_seconds(self.request)
+    with get_sync_db() as db, track_statements() as statements:
+        db.info["event_actor"] = "scan"  # Recorded on exposure events
+
         # Get family members to scan
         query = select(FamilyMember)
         if family_member_ids:
             query = query.where(FamilyMember.id.in_(family_member_ids))
 
-        members = db.execute(query).scalars().all()
+        with timer.phase("load_members"):
+            members = db.execute(query).scalars().all()
 
         if not members:
             return {"status": "no_members", "message": "No family members to scan"}
+        timer.count("members", len(members))
 
         # Update scan status if tracking
         if scan_id:
@@ -176,6 +232,17 @@ def run_data_broker_scan(family_member_ids: list[int] | None = None, scan_id: in
                 db.commit()
 
         total_new_exposures = 0
+        alerts = ScanAlerts(
+            db, "data broker", digest_key=f"scan:{scan_id or self.request.id}:data_broker"
+        )
+        progress = ScanProgress(scan_id, "data_broker")
+        progress.started(total_members=len(members))
+
+        # Normalized addresses (array field + legacy single field) from the identifier index
+        with timer.phase("load_members"):
+            member_addresses = load_identifier_values(
+                db, IdentifierKind.ADDRESS, [member.id for member in members]
+            )
 
         for member in members:
             # Use new name fields, fall back to parsing legacy name
@@ -187,6 +254,7 @@ def run_data_broker_scan(family_member_ids: list[int] | None = None, scan_id: in
                 # Parse legacy name field
                 name_parts = member.name.strip().split()
                 if len(name_parts) < 2:
+                    progress.member_done()
                     continue
                 first_name = name_parts[0]
                 last_name = name_parts[-1]
@@ -201,17 +269,15 @@ def run_data_broker_scan(family_member_ids: list[int] | None = None, scan_id: in
                 name_variations.append((f"{first_name} {middle_initial}", last_name))
 
             # Get all addresses to use for location
-            addresses_to_check = []
-            if member.addresses:
-                addresses_to_check.extend(member.addresses)
-            if member.address and member.address not in addresses_to_check:
-                addresses_to_check.append(member.address)
+            addresses_to_check = list(member_addresses.get(member.id, []))
 
             # If no addresses, still search with just name
             if not addresses_to_check:
                 addresses_to_check = [None]
 
             member_new_exposures = []  # Track new exposures for this member
+            with timer.phase("dedup"):
+                recorded = _recorded_exposures(db, member.id)
 
             # Search for each name variation with each address
             for fname, lname in name_variations:
@@ -228,15 +294,9 @@ def run_data_broker_scan(family_member_ids: list[int] | None = None, scan_id: in
 
                     for result in search_results:
                         # Check if we already have this exposure (by site name only)
-                        existing = db.execute(
-                            select(Exposure).where(
-                                Exposure.family_member_id == member.id,
-                                Exposure.source == ExposureSource.PEOPLE_SEARCH,
-                                Exposure.source_name == result["site_name"],
-                            )
-                        ).scalar_one_or_none()
-
-                        if not existing:
+                        key = (ExposureSource.PEOPLE_SEARCH, result["site_name"])
+                        if key not in recorded:
+                            recorded.add(key)
                             # Create new exposure record
                             notes = result.get("notes") or ""
                             if result.get("opt_out_url"):
@@ -253,6 +313,7 @@ def run_data_broker_scan(family_member_ids: list[int] | None = None, scan_id: in
                                 status=ExposureStatus.DETECTED,
                             )
                             db.add(exposure)
+                            EXPOSURES_CREATED.labels(source=ExposureSource.PEOPLE_SEARCH.value).inc()
                             total_new_exposures += 1
                             member_new_exposures.append({
                                 "source_name": result["site_name"],
@@ -260,14 +321,11 @@ def run_data_broker_scan(family_member_ids: list[int] | None = None, scan_id: in
                                 "data_exposed": data_exposed,
                             })
 
-            db.commit()
-
-            # Send alert if new exposures found for this member
-            if member_new_exposures:
-                try:
-                    send_new_exposures_alert(member_new_exposures, member.name, "data broker")
-                except Exception:
-                    pass  # Don't fail scan if notification fails
+            # Queue alert in the same transaction as the member's new exposures
+            with timer.phase("insert"):
+                alerts.add_member(member.name, member_new_exposures)
+                db.commit()
+            progress.member_done(len(member_new_exposures))
 
         # Update scan record
         if scan_id:
@@ -278,16 +336,16 @@ def run_data_broker_scan(family_member_ids: list[int] | None = None, scan_id: in
                 scan.completed_at = datetime.utcnow()
                 db.commit()
 
-        # Send scan completion alert
-        if total_new_exposures > 0:
-            try:
-                send_scan_complete_alert(
-                    scan_type="data broker",
-                    total_members=len(members),
-                    new_exposures=total_new_exposures,
-                )
-            except Exception:
-                pass  # Don't fail if notification fails
+        # Queue scan summary/completion alert and hand the outbox to the delivery worker
+        with timer.phase("notify"):
+            ready = alerts.finish(total_members=len(members), new_exposures=total_new_exposures)
+            db.commit()
+            if ready:
+                deliver_notifications.delay()
+        if settings.broker_verification_enabled:
+            verify_broker_listings.delay([member.id for member in members])
+        _save_timings(db, scan_id, timer, statements)
+        progress.finished(ScanStatus.COMPLETED.value)
 
         return {
             "status": "completed",
@@ -296,6 +354,110 @@ def run_data_broker_scan(family_member_ids: list[int] | None = None, scan_id: in
         }
 
 
+# Name each scan task publishes its progress under
+SCAN_PROGRESS_TASKS = {
+    run_breach_scan.name: "breach",
+    run_data_broker_scan.name: "data_broker",
+}
+
+
+@task_failure.connect
+def end_failed_scan_task(sender=None, exception=None, args=None, kwargs=None, **extra):
+    """
+    End a scan task that raised: mark the scan FAILED and close its stream.
+
+    Records the task in scan.timings, as a finished task does, so live
+    streams that connect later see it as ended, then publishes "error" and
+    "finished". Retries don't get here, only the final failure.
+    """
+    task = SCAN_PROGRESS_TASKS.get(getattr(sender, "name", None))
+    args = list(args or [])
+    scan_id = (kwargs or {}).get("scan_id") or (args[1] if len(args) > 1 else None)
+    if task is None or not scan_id:
+        return
+
+    message = f"{task} scan failed: {exception}"
+    try:
+        with get_sync_db() as db:
+            scan = db.get(Scan, scan_id, with_for_update=True, populate_existing=True)
+            if scan:
+                scan.status = ScanStatus.FAILED
+                scan.error_message = message[:500]
+                scan.completed_at = datetime.utcnow()
+                scan.timings = {**(scan.timings or {}), task: {"error": message[:500]}}
+                db.commit()
+    finally:
+        progress = ScanProgress(scan_id, task)
+        progress.error(message)
+        progress.finished(ScanStatus.FAILED.value)
+
+
+@celery_app.task
+def verify_broker_listings(family_member_ids: list[int] | None = None):
+    """
+    Check people-search results automatically: is the member listed on the site?
+
+    Fetches the search page of every open people-search exposure that was
+    never checked, or not within broker_recheck_days, and records
+    confirmed / absent / unknown on it (see app.services.broker_crawler).
+
+    Args:
+        family_member_ids: Optional list of member IDs to check. If None, checks all.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=settings.broker_recheck_days)
+    with get_sync_db() as db:
+        query = (
+            select(
+                Exposure.id, Exposure.source_url, FamilyMember.first_name, FamilyMember.last_name
+            )
+            .join(FamilyMember, Exposure.family_member_id == FamilyMember.id)
+            .where(
+                Exposure.source == ExposureSource.PEOPLE_SEARCH,
+                Exposure.status == ExposureStatus.DETECTED,
+                Exposure.source_url.is_not(None),
+                or_(Exposure.verified_at.is_(None), Exposure.verified_at < cutoff),
+            )
+        )
+        if family_member_ids:
+            query = query.where(Exposure.family_member_id.in_(family_member_ids))
+        candidates = [ListingCandidate(*row) for row in db.execute(query).all()]
+    # The crawl takes hours for a big family; no transaction stays open meanwhile
+    if not candidates:
+        return {"checked": 0}
+
+    counts = asyncio.run(_verify_listings(candidates))
+    return {"checked": sum(counts.values()), **counts}
+
+
+def _save_verdicts(verdicts: list[dict]) -> None:
+    with get_sync_db() as db:
+        db.execute(update(Exposure), verdicts)
+        db.commit()
+
+
+async def _verify_listings(candidates: list[ListingCandidate]) -> Counter:
+    """
+    Crawl the candidates' search pages, saving verdicts as they come in.
+
+    Every broker_verification_batch_size verdicts are written in a short
+    transaction of their own, so an interrupted run keeps what it checked.
+    """
+    counts = Counter()
+    batch = []
+    async with BrokerCrawler() as crawler:
+        async for exposure_id, verdict in iter_listings(candidates, crawler):
+            counts[verdict.value] += 1
+            batch.append(
+                {"id": exposure_id, "verification": verdict, "verified_at": datetime.utcnow()}
+            )
+            if len(batch) >= settings.broker_verification_batch_size:
+                await asyncio.to_thread(_save_verdicts, batch)
+                batch = []
+    if batch:
+        await asyncio.to_thread(_save_verdicts, batch)
+    return counts
+
+
 @celery_app.task
 def run_full_scan(family_member_ids: list[int] | None = None):
     """Run a full scan for data exposures (breaches + data brokers)."""
@@ -0,0 +1 @@
+"""Benchmarks; run them from backend/ with ``python -m benchmarks.<name>``."""
@@ -0,0 +1,263 @@
+"""API load benchmark.
+
+Runs dashboard-like traffic against a running API at a set concurrency:
+member and exposure listings, filters by member and status, exposure
+detail and status updates, scan history and scan triggers. Reports
+latency percentiles (p50/p95/p99) and throughput per operation as JSON.
+
+    cd backend
+    python -m benchmarks.seed --members 5000 --exposures-per-member 20 --scans 1000
+    uvicorn app.main:app --workers 4 &
+    python -m benchmarks.api_load --concurrency 20 --duration 60
+
+Scan triggers queue real Celery tasks; leave them out with
+``--mix scans.trigger=0`` when no worker is running. With --revalidate
+each client sends If-None-Match for listings it has seen before, as the
+polling dashboard does.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter, defaultdict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+
+from benchmarks.report import git_commit, percentile, write_report
+
+
+@dataclass
+class Dataset:
+    """Ids the operations pick from, read from the API before the run."""
+    member_ids: list[int]
+    exposure_ids: list[int]
+
+
+@dataclass
+class Client:
+    """One simulated dashboard user."""
+    http: httpx.AsyncClient
+    data: Dataset
+    rng: random.Random
+    revalidate: bool = False
+    etags: dict[str, str] = field(default_factory=dict)
+
+    async def get(self, url: str, **params) -> httpx.Response:
+        key = f"{url}?{sorted(params.items())}"
+        revalidate = self.revalidate and key in self.etags
+        headers = {"If-None-Match": self.etags[key]} if revalidate else {}
+        response = await self.http.get(url, params=params, headers=headers)
+        if "etag" in response.headers:
+            self.etags[key] = response.headers["etag"]
+        return response
+
+
+EXPOSURE_STATUSES = [
+    "detected", "removal_requested", "removal_in_progress", "removed", "removal_failed",
+]
+
+
+async def _list_members(client: Client) -> httpx.Response:
+    return await client.get("/api/family-members/")
+
+
+async def _list_exposures(client: Client) -> httpx.Response:
+    return await client.get("/api/exposures/")
+
+
+async def _exposures_by_member(client: Client) -> httpx.Response:
+    return await client.get("/api/exposures/", member_id=client.rng.choice(client.data.member_ids))
+
+
+async def _exposures_by_status(client: Client) -> httpx.Response:
+    return await client.get("/api/exposures/", status=client.rng.choice(EXPOSURE_STATUSES))
+
+
+async def _get_exposure(client: Client) -> httpx.Response:
+    return await client.get(f"/api/exposures/{client.rng.choice(client.data.exposure_ids)}")
+
+
+async def _update_exposure_status(client: Client) -> httpx.Response:
+    return await client.http.put(
+        f"/api/exposures/{client.rng.choice(client.data.exposure_ids)}",
+        json={"status": client.rng.choice(EXPOSURE_STATUSES)},
+    )
+
+
+async def _list_scans(client: Client) -> httpx.Response:
+    return await client.get("/api/scans/")
+
+
+async def _trigger_scan(client: Client) -> httpx.Response:
+    return await client.http.post("/api/scans/", json={
+        "scan_type": "breach", "family_member_ids": [client.rng.choice(client.data.member_ids)],
+    })
+
+
+# name -> (default weight, operation)
+OPERATIONS: dict[str, tuple[int, Callable[[Client], Awaitable[httpx.Response]]]] = {
+    "members.list": (10, _list_members),
+    "exposures.list": (15, _list_exposures),
+    "exposures.by_member": (25, _exposures_by_member),
+    "exposures.by_status": (15, _exposures_by_status),
+    "exposures.get": (15, _get_exposure),
+    "exposures.update_status": (10, _update_exposure_status),
+    "scans.list": (9, _list_scans),
+    "scans.trigger": (1, _trigger_scan),
+}
+
+
+async def load_dataset(http: httpx.AsyncClient, sample_members: int = 50) -> Dataset:
+    """Read member ids, and exposure ids of a sample of members, from the API."""
+    response = await http.get("/api/family-members/")
+    response.raise_for_status()
+    member_ids = [member["id"] for member in response.json()]
+    if not member_ids:
+        raise RuntimeError("No family members: seed the database first (python -m benchmarks.seed)")
+
+    exposure_ids = []
+    for member_id in random.Random(0).sample(member_ids, min(sample_members, len(member_ids))):
+        response = await http.get("/api/exposures/", params={"member_id": member_id})
+        response.raise_for_status()
+        exposure_ids.extend(exposure["id"] for exposure in response.json())
+    if not exposure_ids:
+        raise RuntimeError("No exposures: seed the database with --exposures-per-member")
+    return Dataset(member_ids, exposure_ids)
+
+
+async def run_load(
+    http: httpx.AsyncClient,
+    data: Dataset,
+    concurrency: int,
+    mix: dict[str, int],
+    duration: float | None = None,
+    requests: int | None = None,
+    warmup: float = 0.0,
+    revalidate: bool = False,
+    seed: int = 0,
+) -> dict[str, Any]:
+    """
+    Run the operation mix with concurrency clients until duration or requests is reached.
+
+    Requests completed during the first warmup seconds are not recorded.
+    """
+    names = [name for name, weight in mix.items() if weight > 0]
+    weights = [mix[name] for name in names]
+    latencies: dict[str, list[float]] = defaultdict(list)
+    statuses: dict[str, Counter] = defaultdict(Counter)
+    issued = 0
+
+    started = time.perf_counter()
+    record_from = started + warmup
+    deadline = record_from + duration if duration else None
+
+    async def worker(index: int) -> None:
+        nonlocal issued
+        client = Client(http, data, random.Random(seed * 1000 + index), revalidate)
+        while (deadline is None or time.perf_counter() < deadline) and (
+            requests is None or issued < requests
+        ):
+            name = client.rng.choices(names, weights)[0]
+            issued += 1
+            request_started = time.perf_counter()
+            try:
+                status = str((await OPERATIONS[name][1](client)).status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            finished = time.perf_counter()
+            if finished >= record_from:
+                latencies[name].append(finished - request_started)
+                statuses[name][status] += 1
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - record_from
+
+    operations = {}
+    for name in names:
+        values = sorted(latencies[name])
+        operations[name] = {
+            "requests": len(values),
+            "errors": sum(
+                n for status, n in statuses[name].items()
+                if not status.isdigit() or int(status) >= 500
+            ),
+            "statuses": dict(statuses[name]),
+            "throughput_rps": round(len(values) / elapsed, 1),
+            "p50_ms": round(percentile(values, 50) * 1000, 1),
+            "p95_ms": round(percentile(values, 95) * 1000, 1),
+            "p99_ms": round(percentile(values, 99) * 1000, 1),
+            "max_ms": round(values[-1] * 1000, 1) if values else 0.0,
+        }
+    total = sum(op["requests"] for op in operations.values())
+    return {
+        "elapsed_seconds": round(elapsed, 2),
+        "requests": total,
+        "throughput_rps": round(total / elapsed, 1),
+        "operations": operations,
+    }
+
+
+def parse_mix(value: str | None) -> dict[str, int]:
+    """Default weights, overridden by "name=weight,name=weight"."""
+    mix = {name: weight for name, (weight, _) in OPERATIONS.items()}
+    for item in filter(None, (value or "").split(",")):
+        name, _, weight = item.partition("=")
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(
+                f"Unknown operation {name!r} (known: {', '.join(OPERATIONS)})"
+            )
+        mix[name] = int(weight)
+    return mix
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds, after the warmup")
+    parser.add_argument("--requests", type=int, help="Stop after this many requests instead")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Seconds not recorded")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(None),
+                        help="Operation weights, e.g. scans.trigger=0,exposures.list=30")
+    parser.add_argument("--revalidate", action="store_true",
+                        help="Send If-None-Match for listings seen before")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON here instead of stdout")
+    return parser.parse_args(argv)
+
+
+async def _main(args: argparse.Namespace) -> dict[str, Any]:
+    limits = httpx.Limits(
+        max_connections=args.concurrency, max_keepalive_connections=args.concurrency
+    )
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as http:
+        data = await load_dataset(http)
+        results = await run_load(
+            http, data, args.concurrency, args.mix,
+            duration=None if args.requests else args.duration,
+            requests=args.requests,
+            warmup=0.0 if args.requests else args.warmup,
+            revalidate=args.revalidate,
+            seed=args.seed,
+        )
+    return {
+        "benchmark": "api_load",
+        "commit": git_commit(),
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "dataset": {"members": len(data.member_ids), "sampled_exposures": len(data.exposure_ids)},
+        **results,
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    write_report(asyncio.run(_main(args)), args.output)
+
+
+if __name__ == "__main__":
+    main()
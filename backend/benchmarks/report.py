@@ -0,0 +1,43 @@
+"""Helpers shared by the benchmarks' JSON reports."""
+
+import json
+import math
+import resource
+import subprocess
+import sys
+from typing import Any
+
+
+def git_commit() -> str | None:
+    """Short hash of the checked-out commit, so reports can be compared across commits."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far."""
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def write_report(report: dict[str, Any], output: str | None) -> None:
+    """Print the report as JSON, or write it to the output file."""
+    text = json.dumps(report, indent=2, default=str)
+    if output:
+        with open(output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
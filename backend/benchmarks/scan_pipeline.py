@@ -0,0 +1,162 @@
+"""Scan pipeline benchmark.
+
+Runs run_breach_scan and run_data_broker_scan end-to-end over N synthetic
+family members, against local stand-ins for HIBP, Microsoft Graph and SMTP
+(tests/fakes), and prints one JSON document: members/sec per task, calls
+made to each fake, SQL statements and peak RSS. Run it on two commits and
+compare the output to see what a change did to scan throughput.
+
+    cd backend
+    python -m benchmarks.scan_pipeline --members 500 --hibp-latency 0.05
+
+Tasks run eagerly in this process (no broker needed), so notification
+delivery is included in the scan that queued it. By default the database
+is a fresh SQLite file; pass --database-url with a throwaway PostgreSQL
+database for numbers closer to production (tables are created there and
+the synthetic members are left behind).
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any
+
+from benchmarks.report import git_commit, peak_rss_mb, write_report
+from benchmarks.seed import seed_members
+
+
+def run_benchmark(args: argparse.Namespace) -> dict[str, Any]:
+    """Seed the members, run both scan tasks and collect the numbers."""
+    # After main() has pointed DATABASE_URL at the benchmark database
+    from app.core.config import settings
+    from app.core.database import Base, get_sync_db, get_sync_engine
+    from app.core.instrumentation import track_statements
+    from app.models.oauth_token import OAuthToken
+    from app.models.scan import Scan, ScanStatus, ScanType
+    from app.tasks import celery_app
+    from app.tasks.scanning import run_breach_scan, run_data_broker_scan
+    from tests.fakes.graph import run_fake_graph
+    from tests.fakes.hibp import run_fake_hibp
+    from tests.fakes.smtp import run_fake_smtp
+
+    celery_app.conf.task_always_eager = True  # .delay() runs inline, no broker
+    settings.notification_digest_mode = args.digest_mode
+
+    with (
+        run_fake_hibp(
+            latency=args.hibp_latency,
+            rate_limit_ratio=args.hibp_rate_limit,
+            max_breaches=args.max_breaches,
+            seed=args.seed,
+        ) as hibp,
+        run_fake_graph() as graph,
+        run_fake_smtp(latency=args.smtp_latency) as smtp,
+    ):
+        settings.hibp_api_key = "benchmark"
+        settings.hibp_api_url = hibp.url
+        settings.microsoft_graph_url = graph.url
+        settings.smtp_host, settings.smtp_port = smtp.host, smtp.port
+        settings.smtp_user = settings.smtp_password = "benchmark"
+        settings.smtp_starttls = False
+        settings.notification_email = "benchmark@example.com"
+
+        Base.metadata.create_all(get_sync_engine())
+        with get_sync_db() as db:
+            member_ids = seed_members(db, args.members, args.shared_email_ratio, args.seed)
+            if args.email == "graph":
+                db.add(OAuthToken(
+                    provider="microsoft",
+                    access_token="benchmark",
+                    expires_at=datetime.utcnow() + timedelta(days=1),
+                    email="benchmark@example.com",
+                ))
+            scan = Scan(scan_type=ScanType.FULL, status=ScanStatus.PENDING)
+            db.add(scan)
+            db.commit()
+            scan_id = scan.id
+        rss_after_seed = peak_rss_mb()
+
+        tasks = {}
+        total_statements = 0
+        for name, task in (("breach", run_breach_scan), ("data_broker", run_data_broker_scan)):
+            with track_statements() as statements:
+                started = time.perf_counter()
+                result = task.apply(args=(member_ids, scan_id))
+                seconds = time.perf_counter() - started
+            total_statements += statements.count
+            tasks[name] = {
+                "state": result.state,
+                "seconds": round(seconds, 3),
+                "members_per_second": round(len(member_ids) / seconds, 1),
+                "db_statements": statements.count,
+                "db_seconds": round(statements.seconds, 3),
+                "result": result.result if result.successful() else repr(result.result),
+            }
+
+        with get_sync_db() as db:
+            timings = db.get(Scan, scan_id).timings
+
+        return {
+            "benchmark": "scan_pipeline",
+            "commit": git_commit(),
+            "database": get_sync_engine().dialect.name,
+            "config": {key: value for key, value in vars(args).items() if key != "database_url"},
+            "members": len(member_ids),
+            "tasks": tasks,
+            "api_calls": {
+                "hibp": hibp.http_requests,
+                "hibp_rate_limited": hibp.rate_limited,
+                "graph": graph.http_requests,
+                "graph_messages": len(graph.sent),
+                "smtp_connections": smtp.connections,
+                "smtp_messages": len(smtp.messages),
+            },
+            "db_statements": total_statements,
+            "peak_rss_mb": {"after_seed": rss_after_seed, "end": peak_rss_mb()},
+            "timings": timings,
+        }
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--members", type=int, default=200)
+    parser.add_argument("--shared-email-ratio", type=float, default=0.1,
+                        help="Share of members that also list another member's email")
+    parser.add_argument("--hibp-latency", type=float, default=0.0, help="Seconds per HIBP lookup")
+    parser.add_argument("--hibp-rate-limit", type=float, default=0.0,
+                        help="Share of HIBP lookups answered with 429")
+    parser.add_argument("--max-breaches", type=int, default=3, help="Breaches per email: 0..N")
+    parser.add_argument("--smtp-latency", type=float, default=0.0, help="Seconds per SMTP message")
+    parser.add_argument("--email", choices=["smtp", "graph"], default="smtp")
+    parser.add_argument("--digest-mode", choices=["immediate", "per_scan", "window"],
+                        default="immediate")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--database-url",
+                        help="Throwaway database (default: a temporary SQLite file)")
+    parser.add_argument("--output", help="Write the JSON here instead of stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    tmpdir = None
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        tmpdir = tempfile.mkdtemp(prefix="fibertap-bench-")
+        os.environ["DATABASE_URL"] = f"sqlite:///{tmpdir}/benchmark.db"
+
+    try:
+        report = run_benchmark(args)
+    finally:
+        if tmpdir:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""Synthetic dataset generator.
+
+Fills a database with family members (and their identifier rows),
+exposures with a configurable breach / people-search mix, and scan
+history, so list endpoints, pagination, caching and indexes can be
+measured at realistic volumes (see benchmarks.api_load).
+
+    cd backend
+    alembic upgrade head
+    python -m benchmarks.seed --members 5000 --exposures-per-member 20 --scans 1000
+
+Rows are added to whatever DATABASE_URL (or --database-url) points at:
+use a scratch database. The same --seed gives the same dataset.
+"""
+
+import argparse
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+FIRST_NAMES = ["Alex", "Jordan", "Sam", "Taylor", "Morgan", "Casey", "Riley", "Jamie"]
+CITIES = ["Springfield, IL 62701", "Portland, OR 97201", "Austin, TX 73301", "Madison, WI 53703"]
+
+# Distinct breach names exposures are drawn from
+BREACH_NAMES = 200
+
+# Rows per INSERT batch
+BATCH_SIZE = 2000
+
+
+def _batches(rows: list, size: int = BATCH_SIZE):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def seed_members(db, count: int, shared_email_ratio: float = 0.1, seed: int = 0) -> list[int]:
+    """
+    Insert synthetic family members (with their identifier rows); returns their ids.
+
+    Every member has one email and one address. A share of them also lists
+    another member's email, as families sharing an address do, so the scan's
+    per-scan breach cache gets hits. Every third member has a middle initial,
+    which adds a name variation to the data broker scan.
+    """
+    from sqlalchemy import insert
+
+    from app.models.family_member import FamilyMember
+    from app.models.member_identifier import MemberIdentifier
+    from app.services.identifiers import identifiers_from_fields
+
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    rows = []
+    for i in range(count):
+        emails = [f"member{i}@example.com"]
+        if i and rng.random() < shared_email_ratio:
+            emails.append(f"member{rng.randrange(i)}@example.com")
+        first_name, last_name = rng.choice(FIRST_NAMES), f"Bench{i}"
+        rows.append({
+            "first_name": first_name,
+            "middle_initial": "Q" if i % 3 == 0 else None,
+            "last_name": last_name,
+            "name": f"{first_name} {last_name}",
+            "emails": emails,
+            "phone_numbers": [],
+            "addresses": [f"{i} Main St, {rng.choice(CITIES)}"],
+            "created_at": now,
+            "updated_at": now,
+        })
+
+    member_ids = []
+    for batch in _batches(rows):
+        ids = db.scalars(
+            insert(FamilyMember).returning(FamilyMember.id, sort_by_parameter_order=True), batch
+        ).all()
+        identifiers = [
+            {"family_member_id": member_id, "kind": kind, "value": value, "created_at": now}
+            for member_id, row in zip(ids, batch)
+            for kind, value in identifiers_from_fields(
+                emails=row["emails"], addresses=row["addresses"]
+            )
+        ]
+        db.execute(insert(MemberIdentifier), identifiers)
+        member_ids.extend(ids)
+    db.commit()
+    return member_ids
+
+
+def seed_exposures(
+    db,
+    member_ids: list[int],
+    per_member: int,
+    breach_share: float = 0.3,
+    seed: int = 0,
+) -> int:
+    """
+    Insert about per_member exposures for each member; returns how many.
+
+    Roughly breach_share of them are breaches, the rest people-search
+    results (at most one per broker site, as the scan records them). Most
+    are still DETECTED; the others are spread over the removal statuses.
+    """
+    from sqlalchemy import insert
+
+    from app.models.exposure import Exposure, ExposureSource, ExposureStatus
+    from app.services.data_brokers import DATA_BROKER_SITES
+
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    statuses = list(ExposureStatus)
+    status_weights = [70, 10, 5, 10, 5]  # detected, requested, in progress, removed, failed
+
+    rows = []
+    for member_id in member_ids:
+        breaches = sum(rng.random() < breach_share for _ in range(per_member))
+        brokers = rng.sample(DATA_BROKER_SITES, min(per_member - breaches, len(DATA_BROKER_SITES)))
+        sources = [
+            (ExposureSource.BREACH, f"Breach {n}", f"https://haveibeenpwned.com/PwnedWebsites#Breach{n}")
+            for n in rng.sample(range(BREACH_NAMES), min(breaches, BREACH_NAMES))
+        ] + [
+            (ExposureSource.PEOPLE_SEARCH, site.name, f"https://{site.domain}/bench-{member_id}")
+            for site in brokers
+        ]
+        for source, source_name, source_url in sources:
+            detected_at = now - timedelta(days=rng.uniform(0, 365))
+            rows.append({
+                "family_member_id": member_id,
+                "source": source,
+                "source_name": source_name,
+                "source_url": source_url,
+                "data_exposed": "Email addresses, Passwords" if source == ExposureSource.BREACH
+                else "Name, address, phone (verify manually)",
+                "status": rng.choices(statuses, status_weights)[0],
+                "detected_at": detected_at,
+                "updated_at": detected_at + timedelta(days=rng.uniform(0, 30)),
+            })
+
+    for batch in _batches(rows):
+        db.execute(insert(Exposure), batch)
+    db.commit()
+    return len(rows)
+
+
+def seed_scans(db, count: int, seed: int = 0) -> int:
+    """Insert count finished scans spread over the last year; returns count."""
+    from sqlalchemy import insert
+
+    from app.models.scan import Scan, ScanStatus, ScanType
+
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    rows = []
+    for _ in range(count):
+        started_at = now - timedelta(days=rng.uniform(0, 365))
+        completed_at = started_at + timedelta(minutes=rng.uniform(1, 30))
+        rows.append({
+            "scan_type": rng.choice(list(ScanType)),
+            "status": ScanStatus.COMPLETED if rng.random() < 0.95 else ScanStatus.FAILED,
+            "exposures_found": rng.randrange(20),
+            "started_at": started_at,
+            "completed_at": completed_at,
+            "updated_at": completed_at,
+        })
+
+    for batch in _batches(rows):
+        db.execute(insert(Scan), batch)
+    db.commit()
+    return count
+
+
+def seed(args: argparse.Namespace) -> dict:
+    """Seed the dataset described by the command-line arguments."""
+    import app.models  # noqa: F401 (registers every table for create_all)
+    from app.core.database import Base, get_sync_db, get_sync_engine
+
+    if args.create_tables:
+        Base.metadata.create_all(get_sync_engine())
+
+    started = time.perf_counter()
+    with get_sync_db() as db:
+        member_ids = seed_members(db, args.members, args.shared_email_ratio, args.seed)
+        exposures = seed_exposures(
+            db, member_ids, args.exposures_per_member, args.breach_share, args.seed
+        )
+        scans = seed_scans(db, args.scans, args.seed)
+    return {
+        "members": len(member_ids),
+        "exposures": exposures,
+        "scans": scans,
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--members", type=int, default=1000)
+    parser.add_argument("--shared-email-ratio", type=float, default=0.1,
+                        help="Share of members that also list another member's email")
+    parser.add_argument("--exposures-per-member", type=int, default=10)
+    parser.add_argument("--breach-share", type=float, default=0.3,
+                        help="Share of exposures that are breaches (the rest are people-search)")
+    parser.add_argument("--scans", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--database-url", help="Default: DATABASE_URL / .env")
+    parser.add_argument("--create-tables", action="store_true",
+                        help="Create missing tables (for a scratch database without migrations)")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    from benchmarks.report import write_report
+
+    args = parse_args(argv)
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url  # Before the app reads its settings
+    write_report(seed(args), None)
+
+
+if __name__ == "__main__":
+    main()
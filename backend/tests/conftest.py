@@ -0,0 +1,31 @@
+from contextlib import contextmanager
+
+import pytest
+
+from app.core.instrumentation import track_statements
+
+
+@pytest.fixture
+def statement_budget():
+    """
+    Fail the test if a block runs more SQL statements than allowed.
+
+        with statement_budget(3):
+            await client.get("/api/family-members/")
+
+    Only statements of engines built by app.core.database (or passed to
+    instrument_engine) count, and only when they run in the test's context:
+    call routes through httpx.ASGITransport rather than TestClient, which
+    runs the app in another thread.
+    """
+    @contextmanager
+    def budget(max_statements: int):
+        with track_statements() as stats:
+            yield stats
+        repeated = stats.most_repeated()
+        assert stats.count <= max_statements, (
+            f"{stats.count} statements ran, budget is {max_statements}"
+            + (f"; ran {repeated[1]}x: {repeated[0]}" if repeated else "")
+        )
+
+    return budget
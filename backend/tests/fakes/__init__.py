@@ -0,0 +1 @@
+"""Local fake servers standing in for external services in tests."""
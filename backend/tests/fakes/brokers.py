@@ -0,0 +1,66 @@
+"""A people-search site stand-in serving recorded result pages (broker_pages/)."""
+
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+PAGES = Path(__file__).parent / "broker_pages"
+
+
+class FakeBroker:
+    """State shared with the request handler; tweak it from tests."""
+
+    def __init__(self):
+        self.url = ""
+        # path -> (status, page file in broker_pages/ or None for an empty body)
+        self.routes: dict[str, tuple[int, str | None]] = {}
+        self.robots_txt: str | None = "User-agent: *\nDisallow: /private/\n"  # None: 404
+        self.requests: list[tuple[float, str]] = []  # (time.monotonic(), path)
+        self.lock = threading.Lock()
+
+    def paths(self) -> list[str]:
+        return [path for _, path in self.requests]
+
+
+def _handler(broker: FakeBroker):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _reply(self, status: int, body: bytes, content_type: str = "text/html"):
+            self.send_response(status)
+            self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            with broker.lock:
+                broker.requests.append((time.monotonic(), self.path))
+            if self.path == "/robots.txt":
+                if broker.robots_txt is None:
+                    self._reply(404, b"")
+                else:
+                    self._reply(200, broker.robots_txt.encode(), "text/plain")
+                return
+            status, page = broker.routes.get(self.path, (404, None))
+            self._reply(status, (PAGES / page).read_bytes() if page else b"")
+
+    return Handler
+
+
+@contextmanager
+def run_fake_broker():
+    """Serve a FakeBroker on a free localhost port for the duration of the block."""
+    broker = FakeBroker()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _handler(broker))
+    broker.url = f"http://127.0.0.1:{server.server_port}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield broker
+    finally:
+        server.shutdown()
+        server.server_close()
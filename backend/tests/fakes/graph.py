@@ -0,0 +1,94 @@
+"""A minimal Microsoft Graph stand-in serving /me, /me/sendMail and /$batch."""
+
+import json
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeGraph:
+    """State shared with the request handler; tweak it from tests."""
+
+    def __init__(self):
+        self.url = ""
+        self.sent: list[dict] = []  # sendMail bodies that were accepted
+        self.http_requests = 0
+        self.throttle_items = 0  # Answer this many upcoming batch items with 429
+        self.retry_after = "0"
+        self.fail_subjects: set[str] = set()  # Reject messages with these subjects
+        self.lock = threading.Lock()
+
+    def send_mail(self, body: dict) -> tuple[int, dict, dict | None]:
+        """Handle one sendMail request; returns (status, headers, body)."""
+        with self.lock:
+            if self.throttle_items > 0:
+                self.throttle_items -= 1
+                return 429, {"Retry-After": self.retry_after}, {
+                    "error": {"code": "TooManyRequests", "message": "Throttled"}
+                }
+            if body["message"]["subject"] in self.fail_subjects:
+                return 400, {}, {"error": {"code": "ErrorInvalidRecipients", "message": "Rejected"}}
+            self.sent.append(body)
+            return 202, {}, None
+
+
+def _handler(graph: FakeGraph):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _reply(self, status: int, body: dict | None = None):
+            data = json.dumps(body).encode() if body is not None else b""
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            graph.http_requests += 1
+            if self.path.endswith("/me"):
+                self._reply(200, {"mail": "me@example.com", "displayName": "Me"})
+            else:
+                self._reply(404, {"error": {"message": "Not found"}})
+
+        def do_POST(self):
+            graph.http_requests += 1
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+
+            if self.path.endswith("/me/sendMail"):
+                status, _, response_body = graph.send_mail(body)
+                self._reply(status, response_body)
+            elif self.path.endswith("/$batch"):
+                if len(body["requests"]) > 20:
+                    self._reply(400, {"error": {"message": "Too many requests in batch"}})
+                    return
+                responses = []
+                for item in body["requests"]:
+                    status, headers, response_body = graph.send_mail(item["body"])
+                    responses.append({
+                        "id": item["id"],
+                        "status": status,
+                        "headers": headers,
+                        "body": response_body,
+                    })
+                self._reply(200, {"responses": responses})
+            else:
+                self._reply(404, {"error": {"message": "Not found"}})
+
+    return Handler
+
+
+@contextmanager
+def run_fake_graph():
+    """Serve a FakeGraph on a free localhost port for the duration of the block."""
+    graph = FakeGraph()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _handler(graph))
+    graph.url = f"http://127.0.0.1:{server.server_port}/v1.0"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield graph
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,93 @@
+"""A minimal Have I Been Pwned stand-in serving /breachedaccount/{email}."""
+
+import json
+import random
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+
+class FakeHIBP:
+    """State shared with the request handler; tweak it from tests."""
+
+    def __init__(self, latency: float = 0.0, rate_limit_ratio: float = 0.0,
+                 max_breaches: int = 3, seed: int = 0):
+        self.url = ""
+        self.latency = latency  # Seconds before each answer
+        self.rate_limit_ratio = rate_limit_ratio  # Share of lookups answered with 429
+        self.max_breaches = max_breaches  # Each email is in 0..max_breaches breaches
+        self.http_requests = 0
+        self.rate_limited = 0
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def breaches(self, email: str) -> list[dict]:
+        """The breaches of an email: always the same ones for the same address."""
+        count = zlib.crc32(email.encode()) % (self.max_breaches + 1)
+        first = zlib.crc32(email[::-1].encode()) % 50
+        return [
+            {
+                "Name": f"Breach{(first + i) % 50}",
+                "Title": f"Breach {(first + i) % 50}",
+                "Domain": f"breach{(first + i) % 50}.example.com",
+                "BreachDate": "2020-01-01",
+                "DataClasses": ["Email addresses", "Passwords"],
+                "Description": "Synthetic breach",
+            }
+            for i in range(count)
+        ]
+
+    def lookup(self, email: str) -> tuple[int, list[dict] | None]:
+        """Handle one breachedaccount request; returns (status, body)."""
+        with self.lock:
+            self.http_requests += 1
+            if self.random.random() < self.rate_limit_ratio:
+                self.rate_limited += 1
+                return 429, {"statusCode": 429, "message": "Rate limit is exceeded."}
+        breaches = self.breaches(email)
+        return (200, breaches) if breaches else (404, None)
+
+
+def _handler(hibp: FakeHIBP):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _reply(self, status: int, body=None):
+            data = json.dumps(body).encode() if body is not None else b""
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if hibp.latency:
+                time.sleep(hibp.latency)
+            path = urlsplit(self.path).path
+            if not self.headers.get("hibp-api-key"):
+                self._reply(401, {"statusCode": 401, "message": "Access denied"})
+            elif "/breachedaccount/" in path:
+                self._reply(*hibp.lookup(unquote(path.rsplit("/", 1)[1])))
+            else:
+                self._reply(404)
+
+    return Handler
+
+
+@contextmanager
+def run_fake_hibp(**options):
+    """Serve a FakeHIBP on a free localhost port for the duration of the block."""
+    hibp = FakeHIBP(**options)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _handler(hibp))
+    hibp.url = f"http://127.0.0.1:{server.server_port}/api/v3"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield hibp
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,72 @@
+"""A minimal SMTP stand-in: accepts any login and keeps the messages (no TLS)."""
+
+import socketserver
+import threading
+import time
+from contextlib import contextmanager
+
+
+class FakeSMTP:
+    """State shared with the connection handler; tweak it from tests."""
+
+    def __init__(self, latency: float = 0.0):
+        self.host = "127.0.0.1"
+        self.port = 0
+        self.latency = latency  # Seconds before accepting each message
+        self.messages: list[str] = []
+        self.connections = 0
+        self.lock = threading.Lock()
+
+
+def _handler(smtp: FakeSMTP):
+    class Handler(socketserver.StreamRequestHandler):
+        def _reply(self, line: str):
+            self.wfile.write(f"{line}\r\n".encode())
+
+        def handle(self):
+            with smtp.lock:
+                smtp.connections += 1
+            self._reply("220 fake-smtp ready")
+            for raw in self.rfile:
+                command = raw.decode().strip()
+                verb = command.split(" ", 1)[0].upper()
+                if verb in ("EHLO", "HELO"):
+                    self._reply("250-fake-smtp")
+                    self._reply("250 AUTH PLAIN")
+                elif verb == "AUTH":
+                    self._reply("235 Authenticated")  # AUTH PLAIN sends credentials inline
+                elif verb == "DATA":
+                    self._reply("354 End data with <CR><LF>.<CR><LF>")
+                    lines = []
+                    for line in self.rfile:
+                        if line.rstrip(b"\r\n") == b".":
+                            break
+                        lines.append(line.decode())
+                    if smtp.latency:
+                        time.sleep(smtp.latency)
+                    with smtp.lock:
+                        smtp.messages.append("".join(lines))
+                    self._reply("250 Queued")
+                elif verb == "QUIT":
+                    self._reply("221 Bye")
+                    return
+                else:  # MAIL, RCPT, RSET, NOOP
+                    self._reply("250 OK")
+
+    return Handler
+
+
+@contextmanager
+def run_fake_smtp(**options):
+    """Serve a FakeSMTP on a free localhost port for the duration of the block."""
+    smtp = FakeSMTP(**options)
+    server = socketserver.ThreadingTCPServer((smtp.host, 0), _handler(smtp))
+    server.daemon_threads = True
+    smtp.port = server.server_address[1]
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield smtp
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,48 @@
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+
+from app.core.database import Base, get_db, get_read_db
+from app.main import app
+from benchmarks.api_load import load_dataset, parse_mix, run_load
+from benchmarks.seed import seed_exposures, seed_members, seed_scans
+
+
+async def test_load_driver_reports_percentiles_per_operation(tmp_path):
+    url = f"sqlite:///{tmp_path}/load.db"
+    sync_engine = create_engine(url)
+    Base.metadata.create_all(sync_engine)
+    with Session(sync_engine) as db:
+        member_ids = seed_members(db, 20)
+        assert seed_exposures(db, member_ids, per_member=5) > 0
+        seed_scans(db, 10)
+    sync_engine.dispose()
+
+    engine = create_async_engine(url.replace("sqlite", "sqlite+aiosqlite"))
+
+    async def sqlite_session():
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            yield session
+
+    app.dependency_overrides[get_db] = app.dependency_overrides[get_read_db] = sqlite_session
+    try:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        ) as http:
+            data = await load_dataset(http, sample_members=5)
+            results = await run_load(
+                http, data, concurrency=4, mix=parse_mix("scans.trigger=0"), requests=60,
+                revalidate=True,
+            )
+    finally:
+        app.dependency_overrides.clear()
+        await engine.dispose()
+
+    assert len(data.member_ids) == 20
+    assert results["requests"] == 60
+    assert "scans.trigger" not in results["operations"]
+    for operation in results["operations"].values():
+        assert operation["errors"] == 0
+        latencies = [operation[f"{name}_ms"] for name in ("p50", "p95", "p99", "max")]
+        assert latencies == sorted(latencies)
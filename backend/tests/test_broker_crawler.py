@@ -0,0 +1,126 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import Base
+from app.models import Exposure, FamilyMember
+from app.models.exposure import ExposureSource, ExposureStatus, ListingVerification
+from app.services.broker_crawler import BrokerCrawler, ListingCandidate, check_listings
+from app.tasks import scanning
+from tests.fakes.brokers import run_fake_broker
+
+
+async def test_recorded_pages_are_classified():
+    with run_fake_broker() as broker:
+        broker.routes = {
+            "/name/jane-doe": (200, "listing.html"),
+            "/name/john-smith": (200, "no_results.html"),
+            "/name/bot-check": (200, "captcha.html"),
+            "/name/gone": (404, None),
+            "/name/broken": (500, None),
+        }
+        paths = [
+            "/name/jane-doe", "/name/john-smith", "/name/bot-check",
+            "/name/gone", "/name/broken", "/private/jane-doe", "/name/jane-doe",
+        ]
+        candidates = [
+            ListingCandidate(i, f"{broker.url}{path}", "Jane", "Doe")
+            for i, path in enumerate(paths)
+        ]
+        async with BrokerCrawler(delay=0) as crawler:
+            verdicts = await check_listings(candidates, crawler)
+
+    assert [verdicts[i] for i in range(len(paths))] == [
+        ListingVerification.CONFIRMED,
+        ListingVerification.ABSENT,
+        ListingVerification.UNKNOWN,  # Captcha
+        ListingVerification.ABSENT,
+        ListingVerification.UNKNOWN,
+        ListingVerification.UNKNOWN,  # Disallowed by robots.txt
+        ListingVerification.CONFIRMED,
+    ]
+    # robots.txt once, the duplicate URL once, nothing under /private/
+    assert sorted(broker.paths()) == sorted({"/robots.txt", *paths} - {"/private/jane-doe"})
+
+
+async def test_robots_crawl_delay_spaces_requests():
+    with run_fake_broker() as broker:
+        broker.robots_txt = "User-agent: *\nCrawl-delay: 1\n"
+        broker.routes = {"/a": (200, "listing.html"), "/b": (200, "listing.html")}
+        async with BrokerCrawler(delay=0, per_domain=2) as crawler:
+            await crawler.fetch(f"{broker.url}/a")
+            await crawler.fetch(f"{broker.url}/b")
+
+    times = [at for at, path in broker.requests if path != "/robots.txt"]
+    assert times[1] - times[0] >= 0.9
+
+
+def test_verify_broker_listings_saves_verdicts_in_batches(tmp_path, monkeypatch):
+    # A file, so the batch writes from worker threads see the same database
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'brokers.db'}", connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(engine)
+    sessions = []
+
+    def get_sync_db():
+        sessions.append(Session(engine))
+        return sessions[-1]
+
+    monkeypatch.setattr(scanning, "get_sync_db", get_sync_db)
+    monkeypatch.setattr(settings, "broker_crawl_delay_seconds", 0)
+    monkeypatch.setattr(settings, "broker_verification_batch_size", 2)
+
+    checked_during_crawl = []
+    iter_listings = scanning.iter_listings
+
+    async def watched_iter_listings(candidates, crawler):
+        async for result in iter_listings(candidates, crawler):
+            checked_during_crawl.append(any(db.in_transaction() for db in sessions))
+            yield result
+
+    monkeypatch.setattr(scanning, "iter_listings", watched_iter_listings)
+
+    with run_fake_broker() as broker:
+        broker.routes = {
+            "/name/jane-doe": (200, "listing.html"),
+            "/name/no-one": (200, "no_results.html"),
+            "/name/bot-check": (200, "captcha.html"),
+        }
+        paths = ["/name/jane-doe", "/name/no-one", "/name/bot-check", "/name/gone", "/recent"]
+        yesterday = datetime.utcnow() - timedelta(days=1)
+        with Session(engine) as db:
+            member = FamilyMember(name="Jane Doe", first_name="Jane", last_name="Doe")
+            db.add(member)
+            db.flush()
+            db.add_all(
+                Exposure(
+                    family_member_id=member.id, source=ExposureSource.PEOPLE_SEARCH,
+                    source_name=path, source_url=f"{broker.url}{path}",
+                    status=ExposureStatus.DETECTED,
+                    # Checked yesterday, so not due yet
+                    verified_at=yesterday if path == "/recent" else None,
+                )
+                for path in paths
+            )
+            db.commit()
+            member_id = member.id
+
+        result = scanning.verify_broker_listings.apply(args=[[member_id]]).get()
+
+    assert result == {"checked": 4, "confirmed": 1, "absent": 2, "unknown": 1}
+    assert "/recent" not in broker.paths()
+    assert checked_during_crawl == [False] * 4
+    assert len(sessions) == 3  # The candidate query, then two batches of two
+    with Session(engine) as db:
+        verdicts = dict(db.execute(select(Exposure.source_name, Exposure.verification)).all())
+    assert verdicts == {
+        "/name/jane-doe": ListingVerification.CONFIRMED,
+        "/name/no-one": ListingVerification.ABSENT,
+        "/name/bot-check": ListingVerification.UNKNOWN,
+        "/name/gone": ListingVerification.ABSENT,
+        "/recent": None,
+    }
+    engine.dispose()
@@ -0,0 +1,49 @@
+from datetime import datetime
+
+from fastapi import Request, Response
+
+from app.api.conditional import check_not_modified
+
+ETAG = 'W/"abc123"'
+LAST_MODIFIED = datetime(2024, 2, 1, 12, 30, 15, 500000)
+
+
+def make_request(headers: dict[str, str]) -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/api/exposures/",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+    })
+
+
+def test_sets_validator_headers():
+    response = Response()
+    result = check_not_modified(make_request({}), response, ETAG, LAST_MODIFIED)
+    assert result is None
+    assert response.headers["etag"] == ETAG
+    assert response.headers["last-modified"] == "Thu, 01 Feb 2024 12:30:15 GMT"
+
+
+def test_if_none_match_returns_304():
+    request = make_request({"If-None-Match": '"other", W/"abc123"'})
+    result = check_not_modified(request, Response(), ETAG, LAST_MODIFIED)
+    assert result is not None
+    assert result.status_code == 304
+    assert result.headers["etag"] == ETAG
+
+
+def test_if_none_match_takes_precedence_over_if_modified_since():
+    request = make_request({
+        "If-None-Match": 'W/"stale"',
+        "If-Modified-Since": "Thu, 01 Feb 2024 12:30:15 GMT",
+    })
+    assert check_not_modified(request, Response(), ETAG, LAST_MODIFIED) is None
+
+
+def test_if_modified_since():
+    current = make_request({"If-Modified-Since": "Thu, 01 Feb 2024 12:30:15 GMT"})
+    assert check_not_modified(current, Response(), ETAG, LAST_MODIFIED).status_code == 304
+
+    stale = make_request({"If-Modified-Since": "Thu, 01 Feb 2024 12:30:14 GMT"})
+    assert check_not_modified(stale, Response(), ETAG, LAST_MODIFIED) is None
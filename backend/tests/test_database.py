@@ -0,0 +1,53 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core import database
+from app.core.database import TimedQueuePool
+
+
+def test_pool_counts_checkouts_and_timeouts(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=TimedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+
+    with engine.connect() as conn:
+        conn.execute(text("select 1"))
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+
+    stats = engine.pool.stats()
+    assert stats["checkouts"] == 2
+    assert stats["timeouts"] == 1
+    assert stats["checked_out"] == 0
+    assert stats["wait_seconds_max"] >= 0.05
+
+
+@pytest.fixture
+def replica(monkeypatch, tmp_path):
+    replica_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+    monkeypatch.setattr(database, "get_replica_engine", lambda: replica_engine)
+    monkeypatch.setattr(database, "_replica_state", None)
+    return replica_engine
+
+
+@pytest.mark.parametrize("lag, expected", [(0, True), (45, False)])
+async def test_replica_used_only_within_lag(replica, monkeypatch, lag, expected):
+    monkeypatch.setattr(database, "REPLICA_LAG_QUERY", text(f"SELECT {lag}"))
+
+    assert await database.replica_is_usable() is expected
+
+    session = await database.read_session_maker()
+    assert (session.bind is replica) is expected
+    await session.close()
+
+
+async def test_unreachable_replica_falls_back(replica, monkeypatch):
+    monkeypatch.setattr(database, "REPLICA_LAG_QUERY", text("SELECT pg_is_in_recovery()"))
+
+    assert await database.replica_is_usable() is False
@@ -0,0 +1,47 @@
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core.database import Base
+from app.models import Exposure, ExposureEvent, ExposureEventType, FamilyMember
+from app.models.exposure import ExposureSource, ExposureStatus
+
+
+@pytest.fixture
+async def db():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        yield session
+    await engine.dispose()
+
+
+async def test_orm_writes_are_logged(db):
+    member = FamilyMember(name="Jane Doe", first_name="Jane", last_name="Doe")
+    db.add(member)
+    await db.flush()
+    exposure = Exposure(family_member_id=member.id, source=ExposureSource.BREACH, source_name="A")
+    db.add(exposure)
+    await db.commit()
+
+    exposure.status = ExposureStatus.REMOVAL_REQUESTED
+    await db.commit()
+    exposure.data_exposed = "Email"  # Not a status change
+    await db.commit()
+    db.info["event_actor"] = "scan"
+    await db.delete(exposure)
+    await db.commit()
+
+    events = (await db.execute(select(ExposureEvent).order_by(ExposureEvent.id))).scalars().all()
+    assert [(e.event_type, e.old_status, e.new_status, e.actor) for e in events] == [
+        (ExposureEventType.DETECTED, None, ExposureStatus.DETECTED, "api"),
+        (
+            ExposureEventType.STATUS_CHANGED,
+            ExposureStatus.DETECTED,
+            ExposureStatus.REMOVAL_REQUESTED,
+            "api",
+        ),
+        (ExposureEventType.DELETED, ExposureStatus.REMOVAL_REQUESTED, None, "scan"),
+    ]
+    assert {e.exposure_id for e in events} == {exposure.id}
@@ -0,0 +1,130 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.api.responses import json_list_response
+from app.api.routes import exposures as exposure_routes
+from app.core.database import Base
+from app.main import app
+from app.models import Exposure, FamilyMember
+from app.models.exposure import ExposureSource, ExposureStatus
+from app.schemas.exposure import ExposureResponse
+
+
+@pytest.fixture
+async def engine(monkeypatch):
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async def sqlite_session():
+        return AsyncSession(engine, expire_on_commit=False)
+
+    monkeypatch.setattr(exposure_routes, "read_session_maker", sqlite_session)
+    yield engine
+    await engine.dispose()
+
+
+async def add_exposures(engine, *source_names: str) -> None:
+    async with AsyncSession(engine) as db:
+        member = FamilyMember(name="Jane Doe", first_name="Jane", last_name="Doe")
+        db.add(member)
+        await db.flush()
+        db.add_all(
+            Exposure(
+                family_member_id=member.id,
+                source=ExposureSource.BREACH,
+                source_name=name,
+                data_exposed="Email addresses, Passwords",
+                detected_at=datetime(2024, 1, i + 1),
+            )
+            for i, name in enumerate(source_names)
+        )
+        await db.commit()
+
+
+async def export(fmt: str) -> httpx.Response:
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        return await client.get("/api/exposures/export", params={"format": fmt})
+
+
+async def test_ndjson_export(engine, monkeypatch):
+    monkeypatch.setattr(exposure_routes, "EXPORT_BATCH_SIZE", 2)  # More than one batch
+    await add_exposures(engine, "A", "B", "C")
+
+    response = await export("ndjson")
+
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["source_name"] for row in rows] == ["C", "B", "A"]  # Newest first
+    assert rows[0]["status"] == "detected"
+    assert rows[0]["detected_at"] == "2024-01-03T00:00:00"
+
+
+async def test_csv_export_escapes_values(engine):
+    await add_exposures(engine, 'Acme, Inc. "Data" breach', "Line\nbreak")
+
+    response = await export("csv")
+
+    assert response.headers["content-type"].startswith("text/csv")
+    assert 'filename="exposures.csv"' in response.headers["content-disposition"]
+    assert response.text.splitlines()[0] == ",".join(ExposureResponse.model_fields)
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["source_name"] for row in rows] == ["Line\nbreak", 'Acme, Inc. "Data" breach']
+    assert rows[0]["data_exposed"] == "Email addresses, Passwords"
+    assert rows[0]["incogni_request_id"] == ""
+
+
+@pytest.mark.parametrize("fmt, body", [
+    ("ndjson", ""),
+    ("csv", ",".join(ExposureResponse.model_fields) + "\r\n"),
+])
+async def test_empty_export(engine, fmt, body):
+    response = await export(fmt)
+    assert response.status_code == 200
+    assert response.text == body
+
+
+async def test_json_list_response_matches_response_model():
+    rows = [
+        Exposure(
+            id=i,
+            family_member_id=1,
+            source=ExposureSource.PEOPLE_SEARCH,
+            source_name=f"Site {i}",
+            source_url=None,
+            data_exposed="Name, address",
+            status=ExposureStatus.REMOVED,
+            incogni_request_id=None,
+            detected_at=datetime(2024, 2, 1, 12, 30, 15, 500000),
+            updated_at=datetime(2024, 2, 2),
+        )
+        for i in range(3)
+    ]
+    test_app = FastAPI()
+
+    @test_app.get("/default", response_model=list[ExposureResponse])
+    async def default():
+        return rows
+
+    @test_app.get("/bulk", response_model=list[ExposureResponse])
+    async def bulk():
+        return json_list_response(exposure_routes.exposure_list_adapter, rows, {"ETag": 'W/"1"'})
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=test_app), base_url="http://test"
+    ) as client:
+        expected = await client.get("/default")
+        actual = await client.get("/bulk")
+
+    assert actual.headers["content-type"] == "application/json"
+    assert actual.headers["etag"] == 'W/"1"'
+    assert actual.json() == expected.json()
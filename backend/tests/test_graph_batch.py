@@ -0,0 +1,63 @@
+import pytest
+
+from app.core.config import settings
+from app.services import microsoft_oauth
+from app.services.microsoft_oauth import MicrosoftOAuthError, send_email_batch
+from tests.fakes.graph import run_fake_graph
+
+
+@pytest.fixture
+def graph(monkeypatch):
+    with run_fake_graph() as fake:
+        monkeypatch.setattr(settings, "microsoft_graph_url", fake.url)
+        yield fake
+
+
+def messages(count: int) -> list[dict]:
+    return [
+        {"to_email": "alerts@example.com", "subject": f"Alert {i}", "body_text": "body"}
+        for i in range(count)
+    ]
+
+
+async def test_batches_twenty_messages_per_request(graph):
+    results = await send_email_batch("token", messages(45))
+
+    assert results == [None] * 45
+    assert len(graph.sent) == 45
+    assert graph.http_requests == 3
+
+
+async def test_throttled_items_are_retried(graph):
+    graph.throttle_items = 3
+
+    results = await send_email_batch("token", messages(5))
+
+    assert results == [None] * 5
+    assert sorted(m["message"]["subject"] for m in graph.sent) == [f"Alert {i}" for i in range(5)]
+    assert graph.http_requests == 2
+
+
+async def test_gives_up_after_retries(graph, monkeypatch):
+    monkeypatch.setattr(microsoft_oauth, "GRAPH_BATCH_RETRIES", 1)
+    graph.throttle_items = 100
+
+    results = await send_email_batch("token", messages(2))
+
+    assert results == ["Throttled by Microsoft Graph"] * 2
+    assert graph.http_requests == 2
+
+
+async def test_per_item_errors_are_reported(graph):
+    graph.fail_subjects = {"Alert 1"}
+
+    results = await send_email_batch("token", messages(3))
+
+    assert results == [None, "Rejected", None]
+
+
+async def test_rejected_batch_raises(graph, monkeypatch):
+    monkeypatch.setattr(microsoft_oauth, "GRAPH_BATCH_LIMIT", 25)
+
+    with pytest.raises(MicrosoftOAuthError, match="Too many requests in batch"):
+        await send_email_batch("token", messages(25))
@@ -0,0 +1,23 @@
+from app.models.member_identifier import IdentifierKind
+from app.services.identifiers import identifiers_from_fields, normalize_identifier
+
+
+def test_normalize_identifier():
+    email, phone, address = IdentifierKind.EMAIL, IdentifierKind.PHONE, IdentifierKind.ADDRESS
+    assert normalize_identifier(email, "  Jane.Doe@Example.COM ") == "jane.doe@example.com"
+    assert normalize_identifier(phone, "+1 (555) 010-0199") == "15550100199"
+    assert normalize_identifier(address, " 12  Main St,\tSpringfield ") == "12 main st, springfield"
+    assert normalize_identifier(IdentifierKind.PHONE, "n/a") is None
+
+
+def test_identifiers_merge_legacy_fields_without_duplicates():
+    pairs = identifiers_from_fields(
+        emails=["jane@example.com", "JD@example.com"],
+        email="Jane@Example.com",
+        phone="555-0100",
+    )
+    assert pairs == [
+        (IdentifierKind.EMAIL, "jane@example.com"),
+        (IdentifierKind.EMAIL, "jd@example.com"),
+        (IdentifierKind.PHONE, "5550100"),
+    ]
@@ -0,0 +1,38 @@
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent
+
+# Cumulative import time of app.main, in seconds. Generous, to stay stable
+# on slow CI machines; what the test really guards is the list below.
+IMPORT_BUDGET_SECONDS = 3.0
+
+# The API publishes tasks by name (app.core.task_client) and never needs these
+WORKER_ONLY_MODULES = ("celery", "app.tasks")
+
+
+def test_api_import_time_and_worker_stack():
+    result = subprocess.run(
+        [
+            sys.executable, "-X", "importtime", "-c",
+            "import app.main, app.core.database as db; assert not db._engines, 'engine at import'",
+        ],
+        cwd=BACKEND, capture_output=True, text=True, timeout=60,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    # "import time: self [us] | cumulative | imported package" lines
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, total, name = line.split("|")
+            if total.strip().isdigit():
+                cumulative[name.strip()] = int(total)
+
+    worker_modules = [
+        name for name in cumulative
+        if any(name == module or name.startswith(f"{module}.") for module in WORKER_ONLY_MODULES)
+    ]
+    assert worker_modules == []
+    assert cumulative["app.main"] / 1e6 < IMPORT_BUDGET_SECONDS
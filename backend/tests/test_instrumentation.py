@@ -0,0 +1,102 @@
+import httpx
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core import slow_queries
+from app.core.config import settings
+from app.core.database import Base, get_read_db
+from app.core.instrumentation import instrument_engine, track_statements
+from app.main import app
+from app.models import FamilyMember
+
+
+def test_nested_trackers_count_statements():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))  # Not tracked
+        with track_statements() as outer:
+            conn.execute(text("SELECT 1"))
+            with track_statements() as inner:
+                conn.execute(text("SELECT 2"))
+                conn.execute(text("SELECT 3"))
+
+    assert (outer.count, inner.count) == (3, 2)
+    assert outer.seconds >= inner.seconds > 0
+
+
+async def test_route_statement_budget(statement_budget, monkeypatch):
+    engine = create_async_engine("sqlite+aiosqlite://")
+    instrument_engine(engine.sync_engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async def sqlite_session():
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            yield session
+
+    async with AsyncSession(engine) as db:
+        db.add_all(
+            FamilyMember(name=f"Member {i}", first_name="M", last_name=str(i)) for i in range(5)
+        )
+        await db.commit()
+
+    app.dependency_overrides[get_read_db] = sqlite_session
+    monkeypatch.setattr(settings, "debug", True)
+    try:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            # Validators plus the list itself, however many members there are
+            with statement_budget(2):
+                response = await client.get("/api/family-members/")
+    finally:
+        app.dependency_overrides.clear()
+        await engine.dispose()
+
+    assert len(response.json()) == 5
+    assert response.headers["x-db-statements"] == "2"
+
+
+def test_budget_reports_the_repeated_statement(statement_budget):
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+
+    with pytest.raises(AssertionError, match="ran 3x: SELECT 1"):
+        with statement_budget(2), engine.connect() as conn:
+            for _ in range(3):
+                conn.execute(text("SELECT 1"))
+
+
+def test_slow_query_is_logged_with_parameter_types_only(monkeypatch):
+    monkeypatch.setattr(settings, "slow_query_threshold_ms", 0.001)
+    monkeypatch.setattr(slow_queries, "_local", slow_queries.deque(maxlen=10))
+    monkeypatch.setattr(slow_queries, "_store", slow_queries._local.appendleft)
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+
+    with engine.connect() as conn, track_statements():
+        conn.execute(text("SELECT :email"), {"email": "someone@example.com"})
+    slow_queries._background().submit(lambda: None).result()  # Wait for the entry
+
+    entry = slow_queries._local[0]
+    assert entry["statement"] == "SELECT ?"
+    assert entry["parameters"] == ["str"]
+    assert entry["plan"] is None  # EXPLAIN ANALYZE is PostgreSQL-only
+    assert "someone@example.com" not in str(entry)
+
+
+@pytest.mark.parametrize("statement, explainable", [
+    ("SELECT * FROM exposures WHERE family_member_id = $1", True),
+    ("  select id from scans", True),
+    ("SELECT * FROM notification_outbox LIMIT 20 FOR UPDATE SKIP LOCKED", False),
+    ("SELECT * FROM oauth_tokens WHERE provider = $1 FOR UPDATE", False),
+    ("SELECT * FROM scans WHERE id = $1\nFOR NO KEY UPDATE", False),
+    ("SELECT * FROM scans FOR SHARE", False),
+    ("SELECT * FROM scans for key share nowait", False),
+    ("UPDATE scans SET status = $1", False),
+])
+def test_only_plain_selects_are_explained(statement, explainable):
+    assert slow_queries._explainable(statement) is explainable
@@ -0,0 +1,92 @@
+import asyncio
+import json
+
+import pytest
+import redis
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.api.sse import format_sse
+from app.core.database import Base
+from app.models import Exposure, FamilyMember
+from app.models.exposure import ExposureSource
+from app.services import live_events
+
+
+def test_format_sse():
+    assert format_sse({"a": 1}, "progress") == b'event: progress\ndata: {"a": 1}\n\n'
+    assert format_sse({"a": 1}) == b'data: {"a": 1}\n\n'
+
+
+def test_publish_backs_off_while_redis_is_down(monkeypatch):
+    calls = []
+
+    def unavailable():
+        calls.append(1)
+        raise redis.ConnectionError("down")
+
+    monkeypatch.setattr(live_events, "_sync_redis", unavailable)
+    monkeypatch.setattr(live_events, "_publish_failed_at", None)
+
+    live_events.publish("channel", {"type": "started"})  # Swallowed
+    live_events.publish("channel", {"type": "progress"})  # Skipped during backoff
+    assert len(calls) == 1
+
+
+def test_scan_progress_without_scan_id_publishes_nothing(monkeypatch):
+    published = []
+    monkeypatch.setattr(live_events, "publish", lambda *args: published.append(args))
+
+    progress = live_events.ScanProgress(None, "breach")
+    progress.started(total_members=2)
+    progress.member_done(new_exposures=1)
+    assert published == []
+    assert progress.members_done == 1 and progress.new_exposures == 1
+
+
+class FakeAsyncRedis:
+    def __init__(self):
+        self.published = []
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis_client):
+        self.redis = redis_client
+        self.queued = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    def publish(self, channel, data):
+        self.queued.append((channel, json.loads(data)))
+
+    async def execute(self):
+        self.redis.published.extend(self.queued)
+
+
+async def test_async_session_commit_publishes_without_blocking(monkeypatch):
+    fake = FakeAsyncRedis()
+    monkeypatch.setattr(live_events, "_sync_redis", lambda: pytest.fail("Sync Redis on the loop"))
+    monkeypatch.setattr(live_events, "_async_redis", lambda: fake)
+    monkeypatch.setattr(live_events, "_publish_failed_at", None)
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with AsyncSession(engine) as db:
+        member = FamilyMember(name="Jane Doe", first_name="Jane", last_name="Doe")
+        db.add(member)
+        await db.flush()
+        db.add(Exposure(family_member_id=member.id, source=ExposureSource.BREACH, source_name="A"))
+        await db.commit()  # Schedules the publish on this loop
+
+    await asyncio.gather(*live_events._pending)
+    await engine.dispose()
+    [(channel, event)] = fake.published
+    assert channel == live_events.EXPOSURES_CHANNEL
+    assert event["event_type"] == "detected"
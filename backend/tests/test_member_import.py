@@ -0,0 +1,90 @@
+import io
+import threading
+
+import httpx
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.api.routes import family_members as member_routes
+from app.core.database import Base, get_db
+from app.main import app
+from app.models import FamilyMember
+from app.services.member_import import iter_csv_rows, iter_ndjson_rows, validate_chunks
+
+
+def test_csv_rows_split_multi_value_columns():
+    upload = io.BytesIO(
+        b"first_name,last_name,emails,phone\n"
+        b"Jane,Doe,jane@example.com; jd@example.com,555-0100\n"
+    )
+    [(row, data, error)] = list(iter_csv_rows(upload))
+    assert row == 2
+    assert error is None
+    assert data == {
+        "first_name": "Jane",
+        "last_name": "Doe",
+        "emails": ["jane@example.com", "jd@example.com"],
+        "phone_numbers": ["555-0100"],
+    }
+
+
+def test_validate_chunks_reports_row_errors():
+    upload = io.BytesIO(
+        b'{"first_name": "Jane", "last_name": "Doe"}\n'
+        b"not json\n"
+        b'{"first_name": "John"}\n'
+    )
+    chunks = list(validate_chunks(iter_ndjson_rows(upload), chunk_size=2))
+    assert len(chunks) == 2
+
+    valid = [member for members, _ in chunks for member in members]
+    errors = [error for _, chunk_errors in chunks for error in chunk_errors]
+    assert [member.first_name for member in valid] == ["Jane"]
+    assert [error["row"] for error in errors] == [2, 3]
+    assert errors[1]["errors"] == ["last_name: Field required"]
+
+
+async def test_import_validates_off_the_event_loop(monkeypatch):
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async def sqlite_session():
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            yield session
+
+    loop_thread = threading.get_ident()
+    chunk_threads = []
+
+    def watched_validate_chunks(rows):
+        for chunk in validate_chunks(rows, chunk_size=1):
+            chunk_threads.append(threading.get_ident())
+            yield chunk
+
+    monkeypatch.setattr(member_routes, "validate_chunks", watched_validate_chunks)
+    app.dependency_overrides[get_db] = sqlite_session
+    upload = (
+        b'{"first_name": "Jane", "last_name": "Doe", "emails": ["jane@example.com"]}\n'
+        b'{"first_name": "John"}\n'
+        b'{"first_name": "Ann", "last_name": "Doe"}\n'
+    )
+    try:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            response = await client.post(
+                "/api/family-members/import",
+                files={"file": ("members.ndjson", upload, "application/x-ndjson")},
+            )
+        async with AsyncSession(engine) as db:
+            names = (await db.scalars(select(FamilyMember.first_name))).all()
+    finally:
+        app.dependency_overrides.clear()
+        await engine.dispose()
+
+    assert response.status_code == 200
+    assert response.json()["imported"] == 2
+    assert response.json()["failed"] == 1
+    assert sorted(names) == ["Ann", "Jane"]
+    assert len(chunk_threads) == 3
+    assert loop_thread not in chunk_threads
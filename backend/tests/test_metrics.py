@@ -0,0 +1,87 @@
+import os
+
+from fastapi.testclient import TestClient
+from prometheus_client import generate_latest
+from prometheus_client.parser import text_string_to_metric_families
+
+from app.core import database, metrics
+from app.core.instrumentation import StatementStats
+from app.core.metrics import SCAN_PHASE_SECONDS, PhaseTimer
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_metrics_label_requests_by_route_template():
+    client.get("/api/scans/123456/events/unknown")  # No such route
+    client.get("/health")
+
+    body = client.get("/metrics").text
+    assert (
+        'fibertap_http_request_duration_seconds_count{method="GET",route="/health",status="200"}'
+        in body
+    )
+    assert 'route="unmatched",status="404"' in body
+    assert "fibertap_celery_queue_length" in body
+
+
+def test_phase_timer_observes_totals_per_phase():
+    timer = PhaseTimer("test_task")
+    for _ in range(3):
+        with timer.phase("dedup"):
+            pass
+    timer.observe()
+
+    def count(phase):
+        for metric in SCAN_PHASE_SECONDS.collect():
+            for sample in metric.samples:
+                labels = {"task": "test_task", "phase": phase}
+                if sample.name.endswith("_count") and sample.labels == labels:
+                    return sample.value
+
+    # One observation per scan, however often the phase was entered
+    assert count("dedup") == 1
+    assert count("total") == 1
+
+
+def test_phase_timer_profile():
+    timer = PhaseTimer("test_profile")
+    timer.queue_wait = 1.5
+    with timer.phase("hibp"):
+        pass
+    timer.count("hibp_calls")
+    timer.count("hibp_calls")
+
+    profile = timer.profile(StatementStats(count=7, seconds=0.25))
+    assert profile["queue_wait_seconds"] == 1.5
+    assert set(profile["phases"]) == {"hibp"}
+    assert profile["counts"] == {"hibp_calls": 2, "db_statements": 7}
+    assert profile["db_seconds"] == 0.25
+
+
+def test_worker_registry_reports_pool_usage(monkeypatch):
+    engine = database.create_sync_db_engine("sqlite://")
+    monkeypatch.setitem(database._engines, "worker-test", (os.getpid(), engine))
+    monkeypatch.setattr(metrics, "_pool_totals", {})
+    engine.pool.timeouts = 2
+
+    def scrape() -> dict[str, float]:
+        # What start_worker_exporter serves
+        text = generate_latest(metrics._process_registry()).decode()
+        return {
+            sample.name: sample.value
+            for family in text_string_to_metric_families(text)
+            for sample in family.samples
+            if sample.name.startswith("fibertap_worker_db_pool")
+            and sample.labels.get("engine") == "worker-test"
+        }
+
+    with engine.connect():
+        metrics.record_worker_pool_usage()
+        assert scrape()["fibertap_worker_db_pool_checked_out"] == 1
+    metrics.record_worker_pool_usage()
+    samples = scrape()
+    assert samples["fibertap_worker_db_pool_checked_out"] == 0
+    assert samples["fibertap_worker_db_pool_size"] == engine.pool.size()
+    assert samples["fibertap_worker_db_pool_timeouts_total"] == 2  # Counted once
+    engine.dispose()
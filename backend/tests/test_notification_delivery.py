@@ -0,0 +1,192 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import Base
+from app.models.notification import NotificationOutbox, NotificationStatus
+from app.models.scan import Scan, ScanStatus, ScanType
+from app.services.notifications import DIGEST_ITEM_KIND, NotificationError
+from app.tasks import notifications as notification_tasks
+
+
+class FakeTransport:
+    def __init__(self, errors=None, raises=None):
+        self.errors = errors or {}  # subject -> error
+        self.raises = raises
+        self.sent = []
+        self.closed = False
+
+    def send_many(self, messages):
+        if self.raises:
+            raise self.raises
+        self.sent.extend(subject for subject, _, _ in messages)
+        return [self.errors.get(subject) for subject, _, _ in messages]
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    monkeypatch.setattr(notification_tasks, "get_sync_db", lambda: Session(engine))
+    yield engine
+    engine.dispose()
+
+
+def queue(engine, *subjects: str, **columns) -> None:
+    with Session(engine) as db:
+        db.add_all(
+            NotificationOutbox(kind="new_exposures", subject=subject, body_text="", **columns)
+            for subject in subjects
+        )
+        db.commit()
+
+
+def outbox(engine) -> dict[str, NotificationOutbox]:
+    with Session(engine, expire_on_commit=False) as db:
+        return {n.subject: n for n in db.scalars(select(NotificationOutbox))}
+
+
+def test_claim_batch_takes_due_rows_with_skip_locked(engine, monkeypatch):
+    monkeypatch.setattr(settings, "notification_batch_size", 2)
+    queue(engine, "due 1", "due 2", "due 3")
+    queue(engine, "later", next_attempt_at=datetime.utcnow() + timedelta(hours=1))
+    queue(engine, "sent", status=NotificationStatus.SENT)
+    with Session(engine) as db:
+        db.add(NotificationOutbox(kind=DIGEST_ITEM_KIND, subject="digest item", body_text=""))
+        db.commit()
+
+    statements = []
+    with Session(engine) as db:
+        event.listen(db, "do_orm_execute", lambda state: statements.append(state.statement))
+        claimed = notification_tasks._claim_batch(db)
+
+    assert [n.subject for n in claimed] == ["due 1", "due 2"]
+    sql = str(statements[0].compile(dialect=postgresql.dialect()))
+    assert sql.endswith("FOR UPDATE SKIP LOCKED")
+
+
+def test_retry_delay_doubles_up_to_the_cap(monkeypatch):
+    monkeypatch.setattr(settings, "notification_retry_base_seconds", 60)
+    delays = [notification_tasks._retry_delay(attempts) for attempts in (1, 2, 3, 20)]
+    assert delays == [
+        timedelta(seconds=60),
+        timedelta(seconds=120),
+        timedelta(seconds=240),
+        notification_tasks.MAX_RETRY_DELAY,
+    ]
+
+
+def test_partial_send_failure_is_retried(engine, monkeypatch):
+    monkeypatch.setattr(settings, "notification_max_attempts", 3)
+    queue(engine, "ok", "rejected")
+    queue(engine, "last try", attempts=2)
+    transport = FakeTransport(errors={"rejected": "550 rejected", "last try": "550 rejected"})
+    monkeypatch.setattr(notification_tasks, "open_transport", lambda: transport)
+
+    result = notification_tasks.deliver_notifications()
+
+    assert result == {"sent": 1, "failed": 2, "deferred": 0}
+    assert transport.closed
+    rows = outbox(engine)
+    assert rows["ok"].status == NotificationStatus.SENT
+    assert rows["ok"].sent_at is not None
+    assert rows["rejected"].status == NotificationStatus.PENDING
+    assert rows["rejected"].attempts == 1
+    assert rows["rejected"].last_error == "550 rejected"
+    assert rows["rejected"].next_attempt_at > datetime.utcnow()
+    assert rows["last try"].status == NotificationStatus.FAILED
+
+
+def test_transport_error_fails_the_whole_batch(engine, monkeypatch):
+    queue(engine, "a", "b")
+    transport = FakeTransport(raises=NotificationError("Connection refused"))
+    monkeypatch.setattr(notification_tasks, "open_transport", lambda: transport)
+
+    assert notification_tasks.deliver_notifications()["failed"] == 2
+    assert {n.attempts for n in outbox(engine).values()} == {1}
+
+
+def test_rows_wait_while_email_is_not_configured(engine, monkeypatch):
+    queue(engine, "a", "b")
+    monkeypatch.setattr(notification_tasks, "open_transport", lambda: None)
+
+    assert notification_tasks.deliver_notifications() == {"sent": 0, "failed": 0, "deferred": 2}
+    rows = outbox(engine).values()
+    assert {n.status for n in rows} == {NotificationStatus.PENDING}
+    assert {n.attempts for n in rows} == {0}
+    assert min(n.next_attempt_at for n in rows) > datetime.utcnow()
+
+    # Once email is set up, they go out
+    due = datetime.utcnow() - timedelta(seconds=1)
+    with Session(engine) as db:
+        for n in db.scalars(select(NotificationOutbox)):
+            n.next_attempt_at = due
+        db.commit()
+    monkeypatch.setattr(notification_tasks, "open_transport", FakeTransport)
+    assert notification_tasks.deliver_notifications()["sent"] == 2
+
+
+def queue_digest_item(db, digest_key: str, member_name: str, age: timedelta) -> None:
+    db.add(NotificationOutbox(
+        kind=DIGEST_ITEM_KIND,
+        subject=f"Digest item: {member_name}",
+        body_text="",
+        digest_key=digest_key,
+        payload={
+            "scan_type": "data broker",
+            "member_name": member_name,
+            "exposures": [{"source_name": "Spokeo"}],
+        },
+        created_at=datetime.utcnow() - age,
+    ))
+
+
+def digests(engine) -> list[NotificationOutbox]:
+    with Session(engine, expire_on_commit=False) as db:
+        query = select(NotificationOutbox).where(NotificationOutbox.kind == "digest")
+        return db.scalars(query.order_by(NotificationOutbox.id)).all()
+
+
+def pending_digest_items(engine) -> list[str]:
+    with Session(engine) as db:
+        return db.scalars(select(NotificationOutbox.subject).where(
+            NotificationOutbox.kind == DIGEST_ITEM_KIND,
+            NotificationOutbox.status == NotificationStatus.PENDING,
+        )).all()
+
+
+def test_orphaned_digest_items_wait_for_their_scan_task(engine, monkeypatch):
+    monkeypatch.setattr(notification_tasks.deliver_notifications, "delay", lambda: None)
+    old = notification_tasks.ORPHANED_DIGEST_AGE + timedelta(minutes=5)
+    with Session(engine) as db:
+        # The breach task of this FULL scan is done; the data broker task still runs
+        scan = Scan(
+            scan_type=ScanType.FULL, status=ScanStatus.COMPLETED,
+            completed_at=datetime.utcnow(), timings={"breach": {}},
+        )
+        db.add(scan)
+        db.flush()
+        scan_id = scan.id
+        queue_digest_item(db, f"scan:{scan_id}:data_broker", "Jane Doe", old)
+        queue_digest_item(db, f"scan:{scan_id + 1}:breach", "John Doe", old)  # Scan row gone
+        db.commit()
+
+    assert notification_tasks.flush_notification_digests() == {"queued": True}
+    [digest] = digests(engine)
+    assert "John Doe" in digest.body_text
+    assert pending_digest_items(engine) == ["Digest item: Jane Doe"]
+
+    with Session(engine) as db:
+        db.get(Scan, scan_id).timings = {"breach": {}, "data_broker": {"error": "Worker lost"}}
+        db.commit()
+
+    assert notification_tasks.flush_notification_digests() == {"queued": True}
+    assert "Jane Doe" in digests(engine)[1].body_text
+    assert pending_digest_items(engine) == []
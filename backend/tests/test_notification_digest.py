@@ -0,0 +1,41 @@
+from app.services.notifications import DIGEST_MAX_MEMBERS, render_exposure_digest
+
+
+def exposure(name: str) -> dict:
+    return {
+        "source_name": name, "source_url": f"https://example.com/{name}", "data_exposed": "Email",
+    }
+
+
+def test_digest_groups_by_member_and_deduplicates():
+    payloads = [
+        {
+            "scan_type": "breach", "member_name": "Jane Doe",
+            "exposures": [exposure("A"), exposure("B")],
+        },
+        # Same exposure reported again, e.g. by a retried scan
+        {"scan_type": "breach", "member_name": "Jane Doe", "exposures": [exposure("A")]},
+        {"scan_type": "breach", "member_name": "John Doe", "exposures": [exposure("A")]},
+        {"scan_type": "breach", "errors": ["HIBP timeout"]},
+    ]
+    subject, body_text, body_html = render_exposure_digest(payloads, total_members=3)
+
+    assert subject == "[Fibertap] 3 new exposure(s) for 2 family member(s)"
+    assert "Jane Doe: 2 new" in body_text
+    assert "John Doe: 1 new" in body_text
+    assert "- HIBP timeout" in body_text
+    assert "<td style=\"padding: 8px; border-bottom: 1px solid #eee;\">Jane Doe</td>" in body_html
+
+
+def test_digest_size_is_bounded():
+    payloads = [
+        {"scan_type": "breach", "member_name": f"Member {i}", "exposures": [exposure("A")]}
+        for i in range(DIGEST_MAX_MEMBERS + 10)
+    ]
+    _, body_text, _ = render_exposure_digest(payloads)
+    assert "... and 10 more family member(s)." in body_text
+
+
+def test_empty_digest():
+    payloads = [{"scan_type": "breach", "member_name": "Jane", "exposures": []}]
+    assert render_exposure_digest(payloads) is None
@@ -0,0 +1,68 @@
+import pytest
+
+from app.core.config import settings
+from app.services import notifications
+from app.services.notifications import NotificationError, send_email_async
+from app.services.settings_store import SmtpConfig, settings_store
+from tests.fakes.smtp import run_fake_smtp
+
+
+@pytest.fixture
+def smtp_config(monkeypatch):
+    """Stored SMTP settings, no Microsoft account; set .port before sending."""
+    config = {"host": "127.0.0.1", "port": 0}
+
+    async def asmtp_config():
+        return SmtpConfig(
+            host=config["host"],
+            port=config["port"],
+            user="alerts@example.com",
+            password="secret",
+            notification_email="family@example.com",
+        )
+
+    monkeypatch.setattr(notifications, "_get_microsoft_token", lambda: None)
+    monkeypatch.setattr(settings_store, "asmtp_config", asmtp_config)
+    monkeypatch.setattr(settings, "smtp_starttls", False)
+    return config
+
+
+async def test_send_email_async_over_smtp(smtp_config):
+    with run_fake_smtp() as smtp:
+        smtp_config["port"] = smtp.port
+        assert await send_email_async("New exposures", "Details", "<p>Details</p>")
+
+    [message] = smtp.messages
+    assert "Subject: New exposures" in message
+    assert "From: alerts@example.com" in message
+    assert "To: family@example.com" in message
+    assert "text/html" in message
+
+
+async def test_send_email_async_failure(smtp_config):
+    with run_fake_smtp() as smtp:
+        smtp_config["port"] = smtp.port
+    # Server is gone
+    with pytest.raises(NotificationError, match="Failed to send email"):
+        await send_email_async("New exposures", "Details")
+
+
+async def test_send_email_async_not_configured(monkeypatch):
+    async def no_config():
+        return None
+
+    monkeypatch.setattr(notifications, "_get_microsoft_token", lambda: None)
+    monkeypatch.setattr(settings_store, "asmtp_config", no_config)
+    monkeypatch.setattr(settings, "smtp_user", None)
+    assert await send_email_async("New exposures", "Details") is False
+
+
+def test_smtp_settings_fall_back_to_the_environment(monkeypatch):
+    monkeypatch.setattr(settings, "smtp_host", "smtp.example.com")
+    monkeypatch.setattr(settings, "smtp_user", "env@example.com")
+    monkeypatch.setattr(settings, "smtp_password", "secret")
+    monkeypatch.setattr(settings, "notification_email", None)
+
+    assert notifications._smtp_settings(None)["host"] == "smtp.example.com"
+    stored = SmtpConfig("smtp.stored.com", 465, "db@example.com", "secret", "db@example.com")
+    assert notifications._smtp_settings(stored)["host"] == "smtp.stored.com"
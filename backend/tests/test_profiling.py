@@ -0,0 +1,60 @@
+import pstats
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import profiling
+from app.core.config import settings
+from app.main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def profiles_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "profiling_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "profiling_token", "secret")
+    yield tmp_path
+    profiling.arm_requests(0)
+
+
+def test_armed_requests_are_profiled_once(profiles_dir):
+    assert client.post("/api/admin/profiling", json={"requests": 1}).json() == {"armed": 1}
+
+    client.get("/health")
+    client.get("/health")  # Not armed any more
+
+    profiles = client.get("/api/admin/profiles").json()
+    assert [p["kind"] for p in profiles] == ["request"]
+    assert profiles[0]["name"].endswith("-GET_health.prof")
+
+    response = client.get(f"/api/admin/profiles/{profiles[0]['name']}")
+    assert response.status_code == 200
+    stats = pstats.Stats(str(profiles_dir / profiles[0]["name"]))
+    assert stats.total_calls > 0
+
+
+def test_profile_header_needs_the_token():
+    client.get("/health", headers={"X-Profile": "wrong"})
+    assert profiling.list_profiles() == []
+
+    client.get("/health", headers={"X-Profile": "secret"})
+    assert len(profiling.list_profiles()) == 1
+
+
+def test_task_profile_only_when_requested():
+    profiling.start_task_profile("t1", SimpleNamespace())
+    profiling.finish_task_profile("t1", "app.tasks.scanning.run_breach_scan")
+    assert profiling.list_profiles() == []
+
+    profiling.start_task_profile("t2", SimpleNamespace(**{profiling.TASK_PROFILE_HEADER: True}))
+    sum(range(1000))
+    profiling.finish_task_profile("t2", "app.tasks.scanning.run_breach_scan")
+    [profile] = profiling.list_profiles()
+    assert profile["kind"] == "task" and profile["name"].endswith("-run_breach_scan.prof")
+
+
+def test_unknown_profile_is_404():
+    assert client.get("/api/admin/profiles/..%2Fsecrets.prof").status_code == 404
+    assert client.get("/api/admin/profiles/missing.prof").status_code == 404
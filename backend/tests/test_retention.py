@@ -0,0 +1,209 @@
+import os
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import Base, get_read_db
+from app.main import app
+from app.models import Exposure, ExposureEvent, ExposureEventType, FamilyMember, Scan
+from app.models.archive import ExposureArchive, ScanArchive
+from app.models.exposure import ExposureSource, ExposureStatus
+from app.models.scan import ScanStatus, ScanType
+from app.tasks import retention
+from app.tasks.scanning import _recorded_exposures
+
+NOW = datetime.utcnow()
+
+
+def archived_exposure(member_id: int, **columns) -> ExposureArchive:
+    return ExposureArchive(
+        family_member_id=member_id,
+        source=ExposureSource.PEOPLE_SEARCH,
+        status=ExposureStatus.REMOVED,
+        detected_at=NOW - timedelta(days=90),
+        updated_at=NOW - timedelta(days=60),
+        archived_at=NOW,
+        **columns,
+    )
+
+
+@pytest.fixture
+async def api_db():
+    """SQLite behind the read routes, with one hot and one archived exposure and scan."""
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with AsyncSession(engine) as db:
+        member = FamilyMember(name="Jane Doe", first_name="Jane", last_name="Doe")
+        db.add(member)
+        await db.flush()
+        db.add(Exposure(
+            family_member_id=member.id, source=ExposureSource.BREACH, source_name="Hot",
+            detected_at=NOW - timedelta(days=1),
+        ))
+        db.add(archived_exposure(member.id, id=100, source_name="Archived"))
+        db.add(Scan(scan_type=ScanType.BREACH, status=ScanStatus.COMPLETED, started_at=NOW))
+        db.add(ScanArchive(
+            id=100, scan_type=ScanType.FULL, status=ScanStatus.COMPLETED,
+            started_at=NOW - timedelta(days=90), updated_at=NOW - timedelta(days=90),
+        ))
+        await db.commit()
+
+    async def sqlite_session():
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            yield session
+
+    app.dependency_overrides[get_read_db] = sqlite_session
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        yield client
+    app.dependency_overrides.clear()
+    await engine.dispose()
+
+
+async def test_exposure_reads_include_archived_on_request(api_db):
+    names = [e["source_name"] for e in (await api_db.get("/api/exposures/")).json()]
+    assert names == ["Hot"]
+
+    response = await api_db.get("/api/exposures/", params={"include_archived": True})
+    exposures = response.json()
+    assert [e["source_name"] for e in exposures] == ["Hot", "Archived"]
+    assert exposures[0]["archived_at"] is None
+    assert exposures[1]["archived_at"] is not None
+
+    assert (await api_db.get("/api/exposures/100")).status_code == 404
+    response = await api_db.get("/api/exposures/100", params={"include_archived": True})
+    assert response.json()["source_name"] == "Archived"
+
+
+async def test_scan_reads_include_archived_on_request(api_db):
+    assert [s["scan_type"] for s in (await api_db.get("/api/scans/")).json()] == ["breach"]
+
+    response = await api_db.get("/api/scans/", params={"include_archived": True})
+    assert [s["scan_type"] for s in response.json()] == ["breach", "full"]
+
+    assert (await api_db.get("/api/scans/100")).status_code == 404
+    response = await api_db.get("/api/scans/100", params={"include_archived": True})
+    assert response.json()["id"] == 100
+
+
+def test_archived_exposures_count_as_recorded():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        member = FamilyMember(name="Jane Doe", first_name="Jane", last_name="Doe")
+        db.add(member)
+        db.flush()
+        db.add(Exposure(family_member_id=member.id, source=ExposureSource.BREACH, source_name="A"))
+        db.add(archived_exposure(member.id, id=100, source_name="Spokeo"))
+        db.commit()
+
+        assert _recorded_exposures(db, member.id) == {
+            (ExposureSource.BREACH, "A"),
+            (ExposureSource.PEOPLE_SEARCH, "Spokeo"),
+        }
+
+
+# Moving rows relies on PostgreSQL: DELETE ... RETURNING in a CTE, SKIP
+# LOCKED and partitioned tables. Point TEST_DATABASE_URL at a scratch
+# database (its tables are dropped and recreated) to run these.
+
+@pytest.fixture
+def pg(monkeypatch):
+    url = os.environ.get("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("TEST_DATABASE_URL (a scratch PostgreSQL database) is not set")
+    engine = create_engine(url.replace("+asyncpg", ""))
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    monkeypatch.setattr(retention, "get_sync_db", lambda: Session(engine))
+    monkeypatch.setattr(settings, "retention_batch_size", 2)  # Several batches
+    monkeypatch.setattr(settings, "retention_removed_exposure_days", 30)
+    monkeypatch.setattr(settings, "retention_scan_days", 30)
+    monkeypatch.setattr(settings, "retention_stale_broker_days", 0)
+    monkeypatch.setattr(settings, "retention_scan_archive_months", 0)
+    yield engine
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+
+def partitions(db) -> list[str]:
+    return sorted(db.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = 'scans_archive'::regclass"
+    )).scalars())
+
+
+def test_apply_retention_moves_old_exposures(pg):
+    with Session(pg) as db:
+        member = FamilyMember(name="Jane Doe", first_name="Jane", last_name="Doe")
+        db.add(member)
+        db.flush()
+        for i in range(5):
+            db.add(Exposure(
+                family_member_id=member.id, source=ExposureSource.BREACH, source_name=f"Old {i}",
+                status=ExposureStatus.REMOVED, updated_at=NOW - timedelta(days=31),
+            ))
+        db.add(Exposure(
+            family_member_id=member.id, source=ExposureSource.BREACH, source_name="Recent",
+            status=ExposureStatus.REMOVED, updated_at=NOW - timedelta(days=1),
+        ))
+        db.add(Exposure(
+            family_member_id=member.id, source=ExposureSource.BREACH, source_name="Open",
+            status=ExposureStatus.DETECTED, updated_at=NOW - timedelta(days=31),
+        ))
+        db.commit()
+
+    assert retention.apply_retention()["exposures_archived"] == 5
+
+    with Session(pg) as db:
+        assert sorted(db.scalars(select(Exposure.source_name))) == ["Open", "Recent"]
+        archived = db.scalars(select(ExposureArchive)).all()
+        assert sorted(e.source_name for e in archived) == [f"Old {i}" for i in range(5)]
+        assert {e.status for e in archived} == {ExposureStatus.REMOVED}
+        events = db.scalars(
+            select(ExposureEvent).where(ExposureEvent.event_type == ExposureEventType.ARCHIVED)
+        ).all()
+        assert sorted(e.exposure_id for e in events) == sorted(e.id for e in archived)
+        assert {(e.actor, e.old_status) for e in events} == {("retention", ExposureStatus.REMOVED)}
+
+
+def test_apply_retention_moves_scans_into_monthly_partitions(pg):
+    old = [NOW - timedelta(days=days) for days in (40, 75, 100)]
+    with Session(pg) as db:
+        db.add_all(
+            Scan(scan_type=ScanType.BREACH, status=ScanStatus.COMPLETED, started_at=started_at)
+            for started_at in [*old, NOW]
+        )
+        db.commit()
+
+    assert retention.apply_retention()["scans_archived"] == 3
+
+    with Session(pg) as db:
+        assert db.scalar(select(func.count()).select_from(Scan)) == 1
+        assert sorted(db.scalars(select(ScanArchive.started_at))) == sorted(old)
+        expected = {f"scans_archive_{started_at:%Y_%m}" for started_at in old}
+        assert expected <= set(partitions(db))
+
+
+def test_old_scan_archive_partitions_are_dropped(pg, monkeypatch):
+    this_month = retention._month_start(NOW)
+    with Session(pg) as db:
+        retention.ensure_scan_archive_partitions(db, this_month - timedelta(days=80), NOW)
+        months = partitions(db)
+    assert len(months) == 4
+
+    monkeypatch.setattr(settings, "retention_scan_archive_months", 1)
+    dropped = retention.apply_retention()["partitions_dropped"]
+
+    with Session(pg) as db:
+        remaining = partitions(db)
+    assert dropped == months[:2]
+    assert remaining == months[2:]
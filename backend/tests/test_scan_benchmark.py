@@ -0,0 +1,26 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent
+
+
+def test_scan_pipeline_benchmark_reports_json(tmp_path):
+    # Own process: the benchmark points DATABASE_URL at its SQLite file before importing the app
+    output = tmp_path / "result.json"
+    subprocess.run(
+        [
+            sys.executable, "-m", "benchmarks.scan_pipeline",
+            "--members", "5", "--output", str(output),
+        ],
+        cwd=BACKEND, check=True, capture_output=True, timeout=120,
+    )
+
+    report = json.loads(output.read_text())
+    assert report["members"] == 5
+    assert {task["state"] for task in report["tasks"].values()} == {"SUCCESS"}
+    assert report["api_calls"]["hibp"] == 5
+    assert report["api_calls"]["smtp_messages"] > 0
+    assert report["db_statements"] > 0
+    assert set(report["timings"]) == {"breach", "data_broker"}
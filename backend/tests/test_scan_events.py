@@ -0,0 +1,180 @@
+import json
+from contextlib import asynccontextmanager
+
+import httpx
+import pytest
+from sqlalchemy import create_engine, update
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+
+from app.api.routes import scans as scan_routes
+from app.core.database import Base
+from app.main import app
+from app.models import FamilyMember, Scan
+from app.models.scan import ScanStatus, ScanType
+from app.services import live_events
+from app.tasks import scanning
+
+
+class FakeSubscription:
+    """
+    Stands in for live_events.subscription.
+
+    Yields the queued items in order (None: an idle second; a coroutine
+    function: run it, then idle), then idles until the stream stops reading.
+    """
+
+    def __init__(self):
+        self.items = []
+        self.channels = []
+
+    async def _events(self):
+        for item in self.items:
+            if callable(item):
+                await item()
+                item = None
+            yield item
+        for _ in range(100):
+            yield None
+        raise AssertionError("The stream did not end")
+
+    @asynccontextmanager
+    async def __call__(self, *channels):
+        self.channels.extend(channels)
+        yield self._events()
+
+
+@pytest.fixture
+async def engine(monkeypatch):
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    def session():
+        return AsyncSession(engine, expire_on_commit=False)
+
+    monkeypatch.setattr(scan_routes, "async_session_maker", session)
+    monkeypatch.setattr(scan_routes, "SCAN_RECHECK_SECONDS", 2)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def pubsub(monkeypatch):
+    fake = FakeSubscription()
+    monkeypatch.setattr(scan_routes, "subscription", fake)
+    return fake
+
+
+async def add_scan(engine, **columns) -> int:
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        scan = Scan(scan_type=ScanType.FULL, **columns)
+        db.add(scan)
+        await db.commit()
+        return scan.id
+
+
+async def get_events(scan_id: int) -> httpx.Response:
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        return await client.get(f"/api/scans/{scan_id}/events")
+
+
+async def stream(scan_id: int) -> list[tuple[str, dict]]:
+    """(event, data) of every SSE message, once the stream has ended."""
+    response = await get_events(scan_id)
+    messages = []
+    for block in response.text.split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if ": " in line)
+        if "data" in fields:
+            messages.append((fields.get("event"), json.loads(fields["data"])))
+    return messages
+
+
+def event(event_type: str, task: str, **data) -> dict:
+    return {"type": event_type, "task": task, **data}
+
+
+async def test_full_scan_stream_waits_for_the_second_task(engine, pubsub):
+    # The breach task is done and set COMPLETED; the data broker task still runs
+    scan_id = await add_scan(engine, status=ScanStatus.COMPLETED, timings={"breach": {}})
+    pubsub.items = [
+        event("progress", "data_broker", members_done=1),
+        event("finished", "data_broker", status="completed"),
+    ]
+
+    messages = await stream(scan_id)
+
+    assert pubsub.channels == [live_events.scan_channel(scan_id)]
+    assert [name for name, _ in messages] == ["snapshot", "progress", "finished", "snapshot"]
+    assert messages[0][1]["status"] == "completed"
+
+
+async def test_finished_scan_ends_after_the_snapshot(engine, pubsub):
+    scan_id = await add_scan(
+        engine, status=ScanStatus.COMPLETED, timings={"breach": {}, "data_broker": {}}
+    )
+    pubsub.items = [event("progress", "breach")]  # Never read
+
+    assert [name for name, _ in await stream(scan_id)] == ["snapshot"]
+
+
+async def test_unknown_scan_is_not_found(engine, pubsub):
+    assert (await get_events(404)).status_code == 404
+    assert pubsub.channels == []
+
+
+async def test_stream_ends_when_a_task_ended_without_finished_event(engine, pubsub):
+    scan_id = await add_scan(engine, status=ScanStatus.RUNNING)
+
+    async def tasks_end_silently():
+        async with AsyncSession(engine) as db:
+            await db.execute(update(Scan).values(
+                status=ScanStatus.FAILED, timings={"breach": {}, "data_broker": {"error": "boom"}}
+            ))
+            await db.commit()
+
+    pubsub.items = [event("progress", "breach"), tasks_end_silently]
+
+    messages = await stream(scan_id)
+
+    assert [name for name, _ in messages] == ["snapshot", "progress", "snapshot"]
+    assert messages[-1][1]["status"] == "failed"
+
+
+def test_failed_scan_task_ends_its_stream(monkeypatch):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    monkeypatch.setattr(scanning, "get_sync_db", lambda: Session(engine))
+    published = []
+    monkeypatch.setattr(live_events, "publish", lambda channel, data: published.append(data))
+    with Session(engine) as db:
+        scan = Scan(scan_type=ScanType.FULL, status=ScanStatus.RUNNING, timings={"breach": {}})
+        db.add_all([scan, FamilyMember(name="Jane Doe", first_name="Jane", last_name="Doe")])
+        db.commit()
+        scan_id = scan.id
+
+    def broken(**kwargs):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(scanning, "generate_search_urls", broken)
+    result = scanning.run_data_broker_scan.apply(args=[None, scan_id])
+
+    assert result.failed()
+
+    with Session(engine) as db:
+        scan = db.get(Scan, scan_id)
+        assert scan.status == ScanStatus.FAILED
+        assert set(scan.timings) == {"breach", "data_broker"}
+        assert scan.error_message == "data_broker scan failed: boom"
+    assert [(e["type"], e["task"]) for e in published] == [
+        ("started", "data_broker"), ("error", "data_broker"), ("finished", "data_broker"),
+    ]
+    assert published[-1]["status"] == "failed"
+
+
+def test_other_task_failures_are_ignored(monkeypatch):
+    monkeypatch.setattr(scanning, "get_sync_db", lambda: pytest.fail("No scan to update"))
+    scanning.end_failed_scan_task(sender=scanning.verify_broker_listings, args=[[1]])
+    scanning.end_failed_scan_task(sender=scanning.run_breach_scan, args=[[1], None])
@@ -0,0 +1,125 @@
+import pytest
+import redis
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+
+from app.core import database
+from app.core.config import settings
+from app.core.database import Base
+from app.services.settings_store import VERSION_KEY, SettingsStore
+
+
+class FakeRedis:
+    """The GET/INCR subset the store uses, shared by its sync and async clients."""
+
+    def __init__(self):
+        self.values: dict[str, int] = {}
+        self.down = False
+
+    def get(self, key):
+        if self.down:
+            raise redis.ConnectionError("down")
+        return self.values.get(key)
+
+    def incr(self, key):
+        if self.down:
+            raise redis.ConnectionError("down")
+        self.values[key] = self.values.get(key, 0) + 1
+        return self.values[key]
+
+
+class AsyncFakeRedis:
+    def __init__(self, fake: FakeRedis):
+        self.fake = fake
+
+    async def get(self, key):
+        return self.fake.get(key)
+
+    async def incr(self, key):
+        return self.fake.incr(key)
+
+
+@pytest.fixture
+def redis_server():
+    return FakeRedis()
+
+
+@pytest.fixture
+async def loads(tmp_path, monkeypatch):
+    """Database shared by every store; returns a list that grows by one per sync reload."""
+    url = f"sqlite:///{tmp_path / 'settings.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    async_engine = create_async_engine(url.replace("sqlite", "sqlite+aiosqlite"))
+
+    loads = []
+
+    def sync_session():
+        loads.append(1)
+        return Session(engine)
+
+    monkeypatch.setattr(database, "get_sync_db", sync_session)
+    monkeypatch.setattr(
+        database, "async_session_maker", lambda: AsyncSession(async_engine, expire_on_commit=False)
+    )
+    monkeypatch.setattr(settings, "app_settings_cache_seconds", 0)  # Check the version every read
+    yield loads
+    await async_engine.dispose()
+    engine.dispose()
+
+
+def make_store(redis_server: FakeRedis) -> SettingsStore:
+    store = SettingsStore()
+    store._redis = redis_server
+    store._aredis = AsyncFakeRedis(redis_server)
+    return store
+
+
+async def test_write_in_one_store_is_seen_by_another(redis_server, loads):
+    api, worker = make_store(redis_server), make_store(redis_server)
+    assert worker.smtp_config() is None
+
+    await api.aset_many({"smtp_user": "alerts@example.com", "smtp_password": "secret"})
+    assert redis_server.values[VERSION_KEY] == 1
+    assert worker.smtp_config().user == "alerts@example.com"
+
+    await api.adelete_many(["smtp_password"])
+    assert worker.smtp_config() is None
+
+
+async def test_unchanged_version_is_not_reloaded(redis_server, loads):
+    api, worker = make_store(redis_server), make_store(redis_server)
+    await api.aset_many({"smtp_host": "smtp.example.com"})
+
+    for _ in range(3):
+        assert worker.get_many(["smtp_host"]) == {"smtp_host": "smtp.example.com"}
+    assert len(loads) == 1
+
+    await api.aset_many({"smtp_host": "mail.example.com"})
+    assert worker.get_many(["smtp_host"]) == {"smtp_host": "mail.example.com"}
+    assert len(loads) == 2
+
+
+async def test_reads_the_database_while_redis_is_down(redis_server, loads):
+    api, worker = make_store(redis_server), make_store(redis_server)
+    await api.aset_many({"smtp_host": "smtp.example.com"})
+    worker.get_all()
+
+    redis_server.down = True
+    await api.aset_many({"smtp_host": "mail.example.com"})  # Version bump is lost
+
+    # No version to compare, so every check reloads
+    assert worker.get_many(["smtp_host"]) == {"smtp_host": "mail.example.com"}
+    worker.get_all()
+    assert len(loads) == 3
+
+
+async def test_cached_values_are_used_between_checks(redis_server, loads, monkeypatch):
+    monkeypatch.setattr(settings, "app_settings_cache_seconds", 60)
+    api, worker = make_store(redis_server), make_store(redis_server)
+    worker.get_all()
+
+    await api.aset_many({"smtp_host": "smtp.example.com"})
+    assert worker.get_all() == {}  # Not checked again yet
+    assert len(loads) == 1
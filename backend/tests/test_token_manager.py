@@ -0,0 +1,115 @@
+import asyncio
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import Session
+
+from app.core import database
+from app.core.database import Base
+from app.models.oauth_token import OAuthToken
+from app.services import microsoft_oauth
+from app.services.token_manager import MAX_CACHE_AGE, MicrosoftTokenManager
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    # A file, so the refresh threads share it; SQLite ignores FOR UPDATE
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'tokens.db'}", connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(engine)
+    monkeypatch.setattr(database, "get_sync_db", lambda: Session(engine))
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def refreshes(monkeypatch):
+    """Fake Microsoft token endpoint; returns the refresh tokens it was called with."""
+    calls = []
+
+    async def refresh_access_token(refresh_token):
+        calls.append(refresh_token)
+        await asyncio.sleep(0.05)  # Long enough for concurrent callers to pile up
+        return {"access_token": f"access-{len(calls)}", "expires_in": 3600}
+
+    monkeypatch.setattr(microsoft_oauth, "refresh_access_token", refresh_access_token)
+    return calls
+
+
+def connect(engine, expires_in: timedelta) -> None:
+    with Session(engine) as db:
+        db.add(OAuthToken(
+            provider="microsoft",
+            access_token="access-0",
+            refresh_token="refresh",
+            email="alerts@example.com",
+            expires_at=datetime.utcnow() + expires_in,
+        ))
+        db.commit()
+
+
+def get_tokens_concurrently(manager: MicrosoftTokenManager, callers: int = 8) -> list:
+    results = [None] * callers
+    start = threading.Barrier(callers)
+
+    def call(i):
+        start.wait()
+        results[i] = manager.get_token()
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_expired_token_is_refreshed_once(engine, refreshes):
+    connect(engine, expires_in=timedelta(minutes=-1))
+    manager = MicrosoftTokenManager()
+
+    results = get_tokens_concurrently(manager)
+
+    assert refreshes == ["refresh"]
+    assert set(results) == {("access-1", "alerts@example.com")}
+    assert manager.get_token() == ("access-1", "alerts@example.com")  # From memory
+    assert len(refreshes) == 1
+
+
+def test_token_near_expiry_is_refreshed_in_the_background(engine, refreshes):
+    connect(engine, expires_in=timedelta(minutes=2))  # Inside REFRESH_MARGIN
+    manager = MicrosoftTokenManager()
+    with manager._lock:
+        manager._sync(refresh=False)
+
+    # Callers keep getting the current token while one background refresh runs
+    results = get_tokens_concurrently(manager)
+    assert set(results) == {("access-0", "alerts@example.com")}
+    with manager._lock:  # Held by the refresh thread until it is done
+        pass
+    assert refreshes == ["refresh"]
+    assert manager.get_token() == ("access-1", "alerts@example.com")
+
+
+def test_token_row_is_reread_after_max_cache_age(engine, refreshes):
+    connect(engine, expires_in=timedelta(hours=1))
+    manager = MicrosoftTokenManager()
+    assert manager.get_token() == ("access-0", "alerts@example.com")
+
+    with Session(engine) as db:  # Reconnected from another process
+        db.execute(update(OAuthToken).values(access_token="reconnected"))
+        db.commit()
+    assert manager.get_token() == ("access-0", "alerts@example.com")
+
+    manager._loaded_at -= MAX_CACHE_AGE + 1
+    assert manager.get_token() == ("reconnected", "alerts@example.com")
+    assert refreshes == []
+
+
+def test_no_account_connected(engine, refreshes):
+    manager = MicrosoftTokenManager()
+    assert manager.get_token() is None
+    assert not manager.is_connected()
@@ -0,0 +1,64 @@
+from types import SimpleNamespace
+
+import pytest
+from opentelemetry import trace
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+from app.core import task_client, tracing
+from app.core.profiling import TASK_PROFILE_HEADER
+
+exporter = InMemorySpanExporter()
+
+
+@pytest.fixture(scope="module", autouse=True)
+def tracer_provider():
+    # The global provider can only be installed once per process
+    tracing.configure_tracing("test", exporter=exporter)
+
+
+def finished_spans():
+    trace.get_tracer_provider().force_flush()
+    return {span.name: span for span in exporter.get_finished_spans()}
+
+
+def test_task_span_continues_publisher_trace():
+    exporter.clear()
+    headers = {}
+    with tracing.tracer.start_as_current_span("POST /api/scans"):
+        tracing.inject_task_headers(headers)
+
+    # Celery exposes custom message headers as task request attributes
+    tracing.start_task_span(
+        "task-1", "app.tasks.scanning.run_breach_scan", SimpleNamespace(**headers)
+    )
+    with tracing.tracer.start_as_current_span("scan.hibp"):
+        pass
+    tracing.end_task_span("task-1", "SUCCESS")
+
+    spans = finished_spans()
+    publisher = spans["POST /api/scans"]
+    task = spans["celery.task app.tasks.scanning.run_breach_scan"]
+    assert task.context.trace_id == publisher.context.trace_id
+    assert task.parent.span_id == publisher.context.span_id
+    assert spans["scan.hibp"].parent.span_id == task.context.span_id
+    assert task.attributes["celery.queue_wait_seconds"] >= 0
+    assert trace.get_current_span() is trace.INVALID_SPAN
+
+
+def test_task_client_sends_trace_and_profile_headers(monkeypatch):
+    sent = []
+    monkeypatch.setattr(task_client, "_celery", SimpleNamespace(
+        send_task=lambda name, args, headers: sent.append((name, args, headers))
+    ))
+    with tracing.tracer.start_as_current_span("POST /api/scans"):
+        task_client.send_task(task_client.RUN_BREACH_SCAN, ([1], 7), profile=True)
+
+    [(name, args, headers)] = sent
+    assert (name, args) == ("app.tasks.scanning.run_breach_scan", ([1], 7))
+    assert "traceparent" in headers and tracing.PUBLISHED_AT_HEADER in headers
+    assert headers[TASK_PROFILE_HEADER] is True
+
+
+def test_build_exporter_rejects_unknown_names():
+    with pytest.raises(ValueError):
+        tracing.build_exporter("carrier-pigeon")